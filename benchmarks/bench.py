@@ -0,0 +1,529 @@
+# -*- coding: UTF-8 -*-
+"""
+Benchmarks for the public functions of ``clj``.
+
+For each function and each kind of input (a list, a generator, an infinite iterator), measure:
+
+* the cost per element (or per call for functions like ``first``), compared to the equivalent ``itertools``/builtin
+  idiom when there is one. For infinite inputs, ``n`` elements of the result are consumed, so the cost is per element
+  of the result;
+* the time to get the first element of the result, for lazy functions;
+* the peak memory allocated while consuming the result.
+
+Usage:
+
+    python benchmarks/bench.py                        # run everything
+    python benchmarks/bench.py distinct take          # run only some functions
+    python benchmarks/bench.py --save results.json    # save the results
+    python benchmarks/bench.py --compare results.json # compare with previously saved results
+
+Run ``python benchmarks/bench.py --help`` for all the options.
+"""
+import argparse
+import atexit
+import bisect
+import collections
+import functools
+import itertools
+import json
+import operator
+import os
+import platform
+import re
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Callable, Iterable, Iterator, NamedTuple, Union, cast
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import clj as c  # noqa: E402
+from clj import chunked as ch  # noqa: E402
+from clj import transducers as xf  # noqa: E402
+from clj.sketches import BloomFilter, LRUWindow, SpaceSaving  # noqa: E402
+
+MakeInput = Callable[[], Iterable[Any]]
+
+LIST = "list"
+GENERATOR = "generator"
+INFINITE = "infinite"
+
+FINITE = (LIST, GENERATOR)
+ALL = (LIST, GENERATOR, INFINITE)
+
+
+class Case(NamedTuple):
+    # Name of the public function
+    name: str
+    # Takes a function that returns a fresh input, returns the result of the function (consumed by the benchmark if
+    # it's an iterator)
+    run: Callable[[MakeInput], Any]
+    # Equivalent idiom in plain Python, if any
+    baseline: Union[Callable[[MakeInput], Any], None] = None
+    inputs: tuple[str, ...] = FINITE
+    # Returns the elements of the input, given its size
+    data: Callable[[int], list[Any]] = lambda n: list(range(n))
+    # Use a smaller input for slow functions
+    size_factor: float = 1.0
+    # The result is lazy: measure the time to the first element
+    lazy: bool = True
+    # The time is reported per element of the input; otherwise it's reported per call, for functions that don't walk
+    # their whole input, like first.
+    per_element: bool = True
+
+
+def _nested(n: int) -> list[Any]:
+    return [[i, [i + 1, (i + 2,)]] for i in range(0, n, 3)]
+
+
+def _chunks(n: int) -> list[Any]:
+    return [list(range(i, i + 10)) for i in range(0, n, 10)]
+
+
+def _tree(n: int) -> list[Any]:
+    # A list of small trees
+    return [[i, [i + 1, i + 2]] for i in range(0, n, 3)]
+
+
+def _shuffled(n: int) -> list[int]:
+    return [(i * 7919) % n for i in range(n)]
+
+
+def _insort_all(coll: Iterable[Any]) -> list[Any]:
+    # Keep a plain list sorted on each insert
+    items: list[Any] = []
+    for e in coll:
+        bisect.insort(items, e)
+    return items
+
+
+def _pairs(coll: Iterable[Any]) -> list[Any]:
+    return list(itertools.chain.from_iterable(zip(coll, coll)))
+
+
+def _assoc_all(coll: Iterable[Any]) -> "c.PersistentHashMap[Any, Any]":
+    # Keep every version of the map
+    m: c.PersistentHashMap[Any, Any] = c.hash_map()
+    for e in coll:
+        m = m.assoc(e, e)
+    return m
+
+
+def _copy_all(coll: Iterable[Any]) -> dict[Any, Any]:
+    # Copy the dict on each update to keep every version
+    d: dict[Any, Any] = {}
+    for e in coll:
+        d = {**d, e: e}
+    return d
+
+
+def _lines_file(n: int) -> list[str]:
+    # A file of n lines, deleted at exit
+    fd, path = tempfile.mkstemp(suffix=".txt")
+    with os.fdopen(fd, "wb") as f:
+        f.writelines(b"line %d of the file\n" % i for i in range(n))
+    atexit.register(os.remove, path)
+    return [path]
+
+
+def _read_lines(path: str) -> Iterator[bytes]:
+    with open(path, "rb") as f:
+        for line in f:
+            yield line.rstrip(b"\n")
+
+
+def _search_file(path: str) -> Iterator[bytes]:
+    with open(path, "rb") as f:
+        yield from c.re_seq(rb"line \d+", f)
+
+
+def _search_whole_file(path: str) -> Iterator[bytes]:
+    # Read the whole file in memory to use re.finditer
+    with open(path, "rb") as f:
+        return (m.group() for m in re.finditer(rb"line \d+", f.read()))
+
+
+def _blocking_inc(x: int) -> int:
+    # Simulate some blocking I/O
+    time.sleep(0.0001)
+    return x + 1
+
+
+def _unique_first(coll: Iterable[Any]) -> Iterator[Any]:
+    seen: set[Any] = set()
+    add = seen.add
+    return (e for e in coll if not (e in seen or add(e)))
+
+
+CASES: list[Case] = [
+    # Sequences
+    # Not on infinite inputs: cycling over the input would yield no new distinct element after the first cycle
+    Case("distinct", lambda m: c.distinct(m()), lambda m: _unique_first(m()),
+         data=lambda n: [i % 1000 for i in range(n)]),
+    Case("distinct_lru", lambda m: c.distinct(m(), seen=LRUWindow(100)), None, ALL,
+         data=lambda n: [i % 1000 for i in range(n)]),
+    Case("distinct_bloom", lambda m: c.distinct(m(), seen=BloomFilter(10 ** 6)), None,
+         data=lambda n: [i % 1000 for i in range(n)]),
+    Case("filter", lambda m: c.filter(c.is_even, m()), lambda m: (x for x in m() if not x & 1), ALL),
+    Case("remove", lambda m: c.remove(c.is_even, m()), lambda m: itertools.filterfalse(c.is_even, m()), ALL),
+    Case("keep", lambda m: c.keep(c.identity, m()), lambda m: (x for x in m() if x is not None), ALL),
+    Case("keep_indexed", lambda m: c.keep_indexed(operator.add, m()),
+         lambda m: (r for r in itertools.starmap(operator.add, enumerate(m())) if r is not None), ALL),
+    Case("cons", lambda m: c.cons(-1, m()), lambda m: itertools.chain((-1,), m()), ALL),
+    Case("concat", lambda m: c.concat(m(), m()), lambda m: itertools.chain(m(), m()), ALL),
+    Case("map", lambda m: c.map(c.inc, m()), lambda m: (x + 1 for x in m()), ALL),
+    Case("mapcat", lambda m: c.mapcat(c.identity, m()), lambda m: itertools.chain.from_iterable(m()), ALL,
+         data=_chunks),
+    Case("cycle", lambda m: c.cycle(m()), lambda m: itertools.cycle(m()), ALL, data=lambda n: list(range(100))),
+    Case("interleave", lambda m: c.interleave(m(), m()),
+         lambda m: itertools.chain.from_iterable(zip(m(), m())), ALL),
+    Case("interleave_longest", lambda m: c.interleave_longest(m(), range(100), m()), None, ALL),
+    Case("interpose", lambda m: c.interpose(0, m()),
+         lambda m: itertools.islice(itertools.chain.from_iterable(zip(itertools.repeat(0), m())), 1, None), ALL),
+    Case("rest", lambda m: c.rest(m()), lambda m: itertools.islice(m(), 1, None), ALL),
+    Case("drop", lambda m: c.drop(100, m()), lambda m: itertools.islice(m(), 100, None), ALL),
+    # The input goes past 100 whatever --size, so that the infinite one doesn't cycle below it forever
+    Case("drop_while", lambda m: c.drop_while(lambda x: x < 100, m()),
+         lambda m: itertools.dropwhile(lambda x: x < 100, m()), ALL, data=lambda n: list(range(max(n, 101)))),
+    Case("take", lambda m: c.take(10 ** 9, m()), lambda m: itertools.islice(m(), 10 ** 9), ALL),
+    Case("take_nth", lambda m: c.take_nth(3, m()), lambda m: itertools.islice(m(), 0, None, 3), ALL),
+    Case("take_while", lambda m: c.take_while(lambda x: x >= 0, m()),
+         lambda m: itertools.takewhile(lambda x: x >= 0, m()), ALL),
+    Case("butlast", lambda m: c.butlast(m()), lambda m: _drop_last_idiom(1, m()), ALL),
+    Case("drop_last", lambda m: c.drop_last(10, m()), lambda m: _drop_last_idiom(10, m()), ALL),
+    Case("flatten", lambda m: c.flatten(m()), None, ALL, data=_nested),
+    Case("flatten_chunks", lambda m: c.flatten(m()), lambda m: itertools.chain.from_iterable(m()), ALL, data=_chunks),
+    Case("reverse", lambda m: c.reverse(m()), lambda m: reversed(list(m()))),
+    Case("shuffle", lambda m: c.shuffle(m()), None, lazy=False),
+    Case("split_at", lambda m: itertools.chain(*c.split_at(100, cast(Any, m()))),
+         lambda m: itertools.chain(*_split_at_idiom(100, m())), ALL),
+    Case("split_with", lambda m: itertools.chain(*c.split_with(lambda x: x < 100, cast(Any, m()))), None, ALL),
+    Case("replace", lambda m: c.replace({1: 2}, m()), lambda m: ({1: 2}.get(x, x) for x in m()), ALL),
+    Case("reductions", lambda m: c.reductions(operator.add, m()), lambda m: itertools.accumulate(m()), ALL),
+    Case("map_indexed", lambda m: c.map_indexed(operator.add, m()),
+         lambda m: itertools.starmap(operator.add, enumerate(m())), ALL),
+    Case("first", lambda m: c.first(m()), lambda m: next(iter(m()), None), ALL, lazy=False, per_element=False),
+    Case("ffirst", lambda m: c.ffirst(m()), None, ALL, data=_chunks, lazy=False, per_element=False),
+    Case("nfirst", lambda m: c.nfirst(m()), None, ALL, data=_chunks),
+    Case("second", lambda m: c.second(m()), None, ALL, lazy=False, per_element=False),
+    # The input has at least 1001 items whatever --size, so that the 1000th one exists
+    Case("nth", lambda m: c.nth(m(), 1000), lambda m: next(itertools.islice(m(), 1000, None)), ALL,
+         data=lambda n: list(range(max(n, 1001))), lazy=False, per_element=False),
+    Case("last", lambda m: c.last(m()), lambda m: collections.deque(m(), maxlen=1).pop(), lazy=False),
+    Case("zipmap", lambda m: c.zipmap(m(), m()), lambda m: dict(zip(m(), m())), lazy=False),
+    Case("group_by", lambda m: c.group_by(c.is_even, m()), None, lazy=False),
+    Case("frequencies", lambda m: c.frequencies(m()), lambda m: collections.Counter(m()), lazy=False),
+    Case("frequencies_top", lambda m: c.frequencies(m(), sketch=SpaceSaving(100)), None, lazy=False,
+         data=lambda n: [i % 1000 for i in range(n)]),
+    Case("group_by_spill", lambda m: c.group_by(lambda x: x % 100, m(), 1000).close(), None, lazy=False),
+    Case("some", lambda m: c.some(lambda x: x < 0, m()), lambda m: next((x for x in m() if x < 0), None),
+         lazy=False),
+    Case("is_seq", lambda m: c.is_seq(m()), None, lazy=False, per_element=False),
+    Case("every", lambda m: c.every(lambda x: x >= 0, m()), lambda m: all(x >= 0 for x in m()), lazy=False),
+    Case("not_every", lambda m: c.not_every(lambda x: x >= 0, m()), lambda m: not all(x >= 0 for x in m()),
+         lazy=False),
+    Case("not_any", lambda m: c.not_any(lambda x: x < 0, m()), lambda m: not any(x < 0 for x in m()), lazy=False),
+    Case("dorun", lambda m: c.dorun(m()), lambda m: collections.deque(m(), maxlen=0), lazy=False),
+    Case("repeatedly", lambda m: c.repeatedly(int), lambda m: iter(int, None), (INFINITE,)),
+    Case("iterate", lambda m: c.iterate(c.inc, 0), lambda m: itertools.count(), (INFINITE,)),
+    Case("repeat", lambda m: c.repeat(1), lambda m: itertools.repeat(1), (INFINITE,)),
+    Case("range", lambda m: c.range(), lambda m: itertools.count(), (INFINITE,)),
+    Case("tree_seq", lambda m: c.tree_seq(c.is_seq, c.identity, m()), None, data=_tree),
+    Case("dedupe", lambda m: c.dedupe(m()), lambda m: (k for k, _ in itertools.groupby(m())), ALL,
+         data=lambda n: [i // 3 for i in range(n)]),
+    Case("empty", lambda m: c.empty(m()), None, lazy=False, per_element=False),
+    Case("count", lambda m: c.count(m()), lambda m: sum(1 for _ in m()), lazy=False),
+    Case("partition", lambda m: c.partition(m(), 10), lambda m: zip(*[iter(m())] * 10), ALL),
+    Case("partition_step", lambda m: c.partition(m(), 10, 1), lambda m: _sliding_window_idiom(10, m()), ALL),
+    Case("partition_all", lambda m: c.partition_all(m(), 10, 3), None, ALL),
+    Case("partition_by", lambda m: c.partition_by(lambda x: x // 10, m()),
+         lambda m: (list(g) for _, g in itertools.groupby(m(), lambda x: x // 10)), ALL),
+    Case("seq_gen", lambda m: c.seq_gen(m()), None, ALL),
+    Case("LazySeq", lambda m: c.LazySeq(m()), lambda m: iter(list(m()))),
+    Case("is_realized", lambda m: c.is_realized(m()), None, ALL, lazy=False, per_element=False),
+    Case("pmap", lambda m: c.pmap(_blocking_inc, m()), lambda m: map(_blocking_inc, m()), ALL, size_factor=0.01),
+    Case("seque", lambda m: c.seque(m()), None, ALL, size_factor=0.1),
+    Case("fold", lambda m: c.fold(operator.add, operator.add, m(), init=0, processes=False),
+         lambda m: functools.reduce(operator.add, m(), 0), lazy=False),
+    Case("transduce", lambda m: c.transduce(c.comp(xf.map(c.inc), xf.filter(c.is_even)), operator.add, m(), 0),
+         lambda m: sum(x for x in (y + 1 for y in m()) if not x & 1), lazy=False),
+    Case("eduction", lambda m: c.eduction(c.comp(xf.map(c.inc), xf.filter(c.is_even)), m()),
+         lambda m: (x for x in (y + 1 for y in m()) if not x & 1), ALL),
+    Case("into", lambda m: c.into([], m()), lambda m: list(m()), lazy=False),
+    Case("Pipeline", lambda m: c.Pipeline(m()).map(c.inc).keep(c.identity).remove(c.is_odd).dedupe(),
+         lambda m: c.dedupe(c.remove(c.is_odd, c.keep(c.identity, map(c.inc, m())))), ALL),
+    Case("thread_last", lambda m: c.thread_last(m(), (map, c.inc), (filter, c.is_even), c.distinct, c.count),
+         lambda m: c.count(c.distinct(filter(c.is_even, map(c.inc, m())))), lazy=False),
+    # Chunked sequences
+    Case("chunked.ChunkedSeq", lambda m: ch.ChunkedSeq(m()), lambda m: itertools.chain.from_iterable(m()), ALL,
+         data=_chunks),
+    Case("chunked.is_chunked_seq", lambda m: ch.is_chunked_seq(m()), None, ALL, lazy=False, per_element=False),
+    Case("chunked.chunked_seq", lambda m: ch.chunked_seq(m()), lambda m: iter(m()), ALL),
+    Case("chunked.range", lambda m: ch.range(), lambda m: itertools.count(), (INFINITE,)),
+    Case("chunked.repeat", lambda m: ch.repeat(1), lambda m: itertools.repeat(1), (INFINITE,)),
+    Case("chunked.iterate", lambda m: ch.iterate(c.inc, 0), lambda m: itertools.count(), (INFINITE,)),
+    Case("chunked.map", lambda m: ch.map(c.inc, m()), lambda m: (x + 1 for x in m()), ALL),
+    Case("chunked.filter", lambda m: ch.filter(c.is_even, m()), lambda m: (x for x in m() if not x & 1), ALL),
+    Case("chunked.remove", lambda m: ch.remove(c.is_even, m()), lambda m: itertools.filterfalse(c.is_even, m()),
+         ALL),
+    Case("chunked.keep", lambda m: ch.keep(c.identity, m()), lambda m: (x for x in m() if x is not None), ALL),
+    Case("chunked.take", lambda m: ch.take(10 ** 9, m()), lambda m: itertools.islice(m(), 10 ** 9), ALL),
+    Case("chunked.drop", lambda m: ch.drop(100, m()), lambda m: itertools.islice(m(), 100, None), ALL),
+    # Files
+    Case("line_seq", lambda m: c.line_seq(next(iter(m()))), lambda m: _read_lines(next(iter(m()))), (LIST,),
+         data=_lines_file),
+    Case("re_seq", lambda m: _search_file(next(iter(m()))), lambda m: _search_whole_file(next(iter(m()))), (LIST,),
+         data=_lines_file),
+    # Sorted collections
+    Case("SortedSet", lambda m: c.SortedSet(m()), lambda m: _insort_all(m()), data=_shuffled, lazy=False),
+    Case("SortedMap", lambda m: c.SortedMap(zip(m(), m())), None, data=_shuffled, lazy=False),
+    Case("sorted_set", lambda m: c.sorted_set(*m()), None, data=_shuffled, lazy=False),
+    Case("sorted_set_by", lambda m: c.sorted_set_by(operator.neg, *m()), None, data=_shuffled, lazy=False),
+    Case("sorted_map", lambda m: c.sorted_map(*_pairs(m())), None, data=_shuffled, lazy=False),
+    Case("sorted_map_by", lambda m: c.sorted_map_by(operator.neg, *_pairs(m())), None, data=_shuffled, lazy=False),
+    Case("subseq", lambda m: c.subseq(next(iter(m())), operator.ge, 1000, operator.lt, 2000), None, (LIST,),
+         data=lambda n: [c.sorted_set(*range(n))], per_element=False),
+    Case("rsubseq", lambda m: c.rsubseq(next(iter(m())), operator.lt, 2000), None, (LIST,),
+         data=lambda n: [c.sorted_set(*range(n))], per_element=False),
+    # Persistent collections
+    Case("PersistentHashMap", lambda m: _assoc_all(m()), lambda m: _copy_all(m()), lazy=False, size_factor=0.1),
+    Case("PersistentVector", lambda m: c.PersistentVector(m()), lambda m: list(m()), lazy=False),
+    Case("PersistentHashSet", lambda m: c.PersistentHashSet(m()), lambda m: set(m()), lazy=False),
+    Case("vec", lambda m: c.vec(m()).transient().extend(m()).persistent(), lambda m: list(m()) + list(m()),
+         lazy=False),
+    Case("vector", lambda m: c.vector(*m()), lambda m: list(m()), lazy=False),
+    Case("hash_map", lambda m: c.hash_map(*_pairs(m())), lambda m: dict(zip(m(), m())), lazy=False),
+    Case("hash_set", lambda m: c.hash_set(*m()), lambda m: set(m()), lazy=False),
+    # Functions
+    Case("identity", lambda m: collections.deque(map(c.identity, m()), 0),
+         lambda m: collections.deque(map(lambda x: x, m()), 0), lazy=False),
+    Case("inc", lambda m: collections.deque(map(c.inc, m()), 0),
+         lambda m: collections.deque(map(lambda x: x + 1, m()), 0), lazy=False),
+    Case("dec", lambda m: collections.deque(map(c.dec, m()), 0),
+         lambda m: collections.deque(map(lambda x: x - 1, m()), 0), lazy=False),
+    Case("is_even", lambda m: collections.deque(map(c.is_even, m()), 0),
+         lambda m: collections.deque(map(lambda x: x % 2 == 0, m()), 0), lazy=False),
+    Case("is_odd", lambda m: collections.deque(map(c.is_odd, m()), 0),
+         lambda m: collections.deque(map(lambda x: x % 2 == 1, m()), 0), lazy=False),
+    Case("comp", lambda m: collections.deque(map(c.comp(c.inc, c.dec), m()), 0),
+         lambda m: collections.deque(map(lambda x: (x - 1) + 1, m()), 0), lazy=False),
+    Case("complement", lambda m: collections.deque(map(c.complement(c.is_even), m()), 0),
+         lambda m: collections.deque(map(lambda x: not c.is_even(x), m()), 0), lazy=False),
+    Case("constantly", lambda m: collections.deque(map(c.constantly(1), m()), 0),
+         lambda m: collections.deque(map(lambda _: 1, m()), 0), lazy=False),
+    Case("juxt", lambda m: collections.deque(map(c.juxt(c.inc, c.dec), m()), 0),
+         lambda m: collections.deque(map(lambda x: [x + 1, x - 1], m()), 0), lazy=False),
+    Case("is_distinct", lambda m: c.is_distinct(*m()), lambda m: len(set(m())) == len(list(m())), lazy=False),
+]
+
+
+def _drop_last_idiom(n: int, coll: Iterable[Any]) -> Iterator[Any]:
+    a, b = itertools.tee(coll)
+    return (x for x, _ in zip(a, itertools.islice(b, n, None)))
+
+
+def _sliding_window_idiom(n: int, coll: Iterable[Any]) -> Iterator[Any]:
+    it = iter(coll)
+    window = collections.deque(itertools.islice(it, n), maxlen=n)
+    if len(window) == n:
+        yield tuple(window)
+    for x in it:
+        window.append(x)
+        yield tuple(window)
+
+
+def _split_at_idiom(n: int, coll: Iterable[Any]) -> tuple[list[Any], Iterator[Any]]:
+    it = iter(coll)
+    return list(itertools.islice(it, n)), it
+
+
+class Result(NamedTuple):
+    name: str
+    input: str
+    size: int
+    # "element" or "call"
+    per: str
+    ns: float
+    baseline_ns: Union[float, None]
+    first_element_us: Union[float, None]
+    peak_bytes: int
+
+
+def _make_input_fn(kind: str, data: list[Any]) -> MakeInput:
+    if kind == LIST:
+        return lambda: data
+    if kind == GENERATOR:
+        return lambda: (e for e in data)
+    return lambda: itertools.cycle(data)
+
+
+def _consume(result: Any, limit: int) -> None:
+    if isinstance(result, collections.abc.Iterator) or (
+            isinstance(result, collections.abc.Iterable)
+            and not isinstance(result, (str, bytes, collections.abc.Sized))):
+        collections.deque(itertools.islice(result, limit), maxlen=0)
+
+
+def _time_run(run: Callable[[MakeInput], Any], make: MakeInput, limit: int, repeat: int, number: int = 1) -> float:
+    """
+    Return the best time of ``repeat`` runs of ``number`` calls, divided by ``number``.
+    """
+    # warm up
+    _consume(run(make), limit)
+
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            _consume(run(make), limit)
+        best = min(best, time.perf_counter() - start)
+    return best / number
+
+
+def _time_first(run: Callable[[MakeInput], Any], make: MakeInput, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        next(iter(run(make)), None)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _peak_memory(run: Callable[[MakeInput], Any], make: MakeInput, limit: int) -> int:
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        _consume(run(make), limit)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def run_case(case: Case, kind: str, size: int, repeat: int) -> Result:
+    size = max(int(size * case.size_factor), 10)
+    data = case.data(size)
+    make = _make_input_fn(kind, data)
+
+    # Calls that don't walk the input are too fast to be timed one by one
+    per, number = (size, 1) if case.per_element else (1, 1000)
+    elapsed = _time_run(case.run, make, size, repeat, number)
+    baseline = None
+    if case.baseline is not None:
+        baseline = _time_run(case.baseline, make, size, repeat, number) / per * 1e9
+
+    first_element = None
+    if case.lazy:
+        first_element = _time_first(case.run, make, repeat) * 1e6
+
+    return Result(
+        name=case.name,
+        input=kind,
+        size=size,
+        per="element" if case.per_element else "call",
+        ns=elapsed / per * 1e9,
+        baseline_ns=baseline,
+        first_element_us=first_element,
+        peak_bytes=_peak_memory(case.run, make, size),
+    )
+
+
+def missing_cases() -> list[str]:
+    """
+    Return the public names of ``clj`` that don't have a benchmark.
+    """
+    names = {case.name for case in CASES}
+    return sorted(name for name in c.__all__ if name not in names and not name.startswith("__"))
+
+
+def _format_table(results: list[Result], previous: dict[tuple[str, str], dict[str, Any]]) -> str:
+    header = ["function", "input", "ns", "per", "baseline (ns)", "ratio", "first (µs)", "peak (KiB)"]
+    if previous:
+        header.append("vs saved")
+
+    rows = [header]
+    for r in results:
+        row = [
+            r.name,
+            r.input,
+            "%.1f" % r.ns,
+            r.per,
+            "-" if r.baseline_ns is None else "%.1f" % r.baseline_ns,
+            "-" if not r.baseline_ns else "%.2fx" % (r.ns / r.baseline_ns),
+            "-" if r.first_element_us is None else "%.2f" % r.first_element_us,
+            "%.1f" % (r.peak_bytes / 1024),
+        ]
+        if previous:
+            old = previous.get((r.name, r.input))
+            row.append("-" if old is None else "%.2fx" % (r.ns / old["ns"]))
+        rows.append(row)
+
+    widths = [max(len(row[i]) for row in rows) for i in range(len(header))]
+    return "\n".join("  ".join(cell.ljust(width) for cell, width in zip(row, widths)) for row in rows)
+
+
+def main(argv: Union[list[str], None] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the public functions of clj.")
+    parser.add_argument("functions", nargs="*", help="Functions to benchmark (default: all).")
+    parser.add_argument("-n", "--size", type=int, default=100_000, help="Number of elements per input.")
+    parser.add_argument("-r", "--repeat", type=int, default=5, help="Number of runs; the best one is kept.")
+    parser.add_argument("-i", "--input", action="append", choices=ALL, help="Kinds of input (default: all).")
+    parser.add_argument("--save", metavar="PATH", help="Save the results as JSON.")
+    parser.add_argument("--compare", metavar="PATH", help="Compare with results saved with --save.")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="Relative slowdown reported as a regression by --compare (default: 0.2).")
+    args = parser.parse_args(argv)
+
+    missing = missing_cases()
+    if missing:
+        print("warning: no benchmark for %s" % ", ".join(missing), file=sys.stderr)
+
+    cases = CASES
+    if args.functions:
+        unknown = set(args.functions) - {case.name for case in CASES}
+        if unknown:
+            parser.error("unknown functions: %s" % ", ".join(sorted(unknown)))
+        cases = [case for case in CASES if case.name in args.functions]
+
+    kinds = args.input or ALL
+
+    previous: dict[tuple[str, str], dict[str, Any]] = {}
+    if args.compare:
+        with open(args.compare) as f:
+            previous = {(r["name"], r["input"]): r for r in json.load(f)["results"]}
+
+    results = []
+    for case in cases:
+        for kind in case.inputs:
+            if kind in kinds:
+                results.append(run_case(case, kind, args.size, args.repeat))
+
+    print(_format_table(results, previous))
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump({
+                "clj": c.__version__,
+                "python": platform.python_version(),
+                "implementation": platform.python_implementation(),
+                "machine": platform.machine(),
+                "size": args.size,
+                "results": [r._asdict() for r in results],
+            }, f, indent=2)
+
+    regressions = [
+        r for r in results
+        if (r.name, r.input) in previous
+        and r.ns > previous[(r.name, r.input)]["ns"] * (1 + args.threshold)
+    ]
+    if regressions:
+        print("\nRegressions:", file=sys.stderr)
+        for r in regressions:
+            print("  %s (%s)" % (r.name, r.input), file=sys.stderr)
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,15 +3,28 @@ __version__ = "0.5.0"
 from clj.fns import comp, complement, constantly, dec, identity, inc, juxt, is_distinct, is_odd, is_even
 from clj.seqs import (
     butlast, concat, cons, count, cycle, dedupe, distinct, dorun, drop, drop_last, drop_while, empty, every, ffirst,
-    filter, first, flatten, group_by, interleave, interpose, is_seq, iterate, keep, keep_indexed, last, map_indexed,
-    map, mapcat, nfirst, not_any, not_every, nth, partition, partition_by, range, reductions, remove, repeat,
-    repeatedly, replace,
+    filter, first, flatten, frequencies, group_by, interleave, interleave_longest, interpose, is_realized, is_seq,
+    iterate, keep, keep_indexed, last, map_indexed, map, mapcat, nfirst, not_any, not_every, nth, partition,
+    partition_all, partition_by, range, reductions, remove, repeat, repeatedly, replace,
     rest, reverse, second, shuffle, some, split_at, split_with, take, take_nth, take_while, tree_seq, zipmap,
-    seq_gen,
+    seq_gen, LazySeq,
 )
+from clj.files import line_seq, re_seq
+from clj.parallel import fold, pmap, seque
+from clj.persistent import PersistentHashMap, PersistentHashSet, PersistentVector, hash_map, hash_set, vec, vector
+from clj.pipeline import Pipeline, thread_last
+from clj.sorted import SortedMap, SortedSet, rsubseq, sorted_map, sorted_map_by, sorted_set, sorted_set_by, subseq
+from clj.transducers import eduction, into, transduce
 
 __all__ = [
     "__version__",
+    "LazySeq",
+    "PersistentHashMap",
+    "PersistentHashSet",
+    "PersistentVector",
+    "Pipeline",
+    "SortedMap",
+    "SortedSet",
     "butlast",
     "comp",
     "complement",
@@ -27,26 +40,35 @@ __all__ = [
     "drop",
     "drop_last",
     "drop_while",
+    "eduction",
     "empty",
     "every",
     "ffirst",
     "filter",
     "first",
     "flatten",
+    "fold",
+    "frequencies",
     "group_by",
+    "hash_map",
+    "hash_set",
     "identity",
     "inc",
     "interleave",
+    "interleave_longest",
     "interpose",
+    "into",
     "is_distinct",
     "is_even",
     "is_odd",
+    "is_realized",
     "is_seq",
     "iterate",
     "juxt",
     "keep",
     "keep_indexed",
     "last",
+    "line_seq",
     "map",
     "map_indexed",
     "mapcat",
@@ -55,8 +77,11 @@ __all__ = [
     "not_every",
     "nth",
     "partition",
+    "partition_all",
     "partition_by",
+    "pmap",
     "range",
+    "re_seq",
     "reductions",
     "remove",
     "repeat",
@@ -64,15 +89,26 @@ __all__ = [
     "replace",
     "rest",
     "reverse",
+    "rsubseq",
     "second",
+    "seque",
     "seq_gen",
     "shuffle",
     "some",
+    "sorted_map",
+    "sorted_map_by",
+    "sorted_set",
+    "sorted_set_by",
     "split_at",
     "split_with",
+    "subseq",
     "take",
     "take_nth",
     "take_while",
+    "thread_last",
+    "transduce",
     "tree_seq",
+    "vec",
+    "vector",
     "zipmap",
 ]
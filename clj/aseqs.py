@@ -0,0 +1,975 @@
+# -*- coding: UTF-8 -*-
+"""
+Async counterparts of the functions of ``clj.seqs``, for use with ``async for``.
+
+The functions have the same names and arguments as their synchronous counterparts. They accept both async and regular
+iterables, and the functions passed to them (``f``, ``pred``, …) may be either regular functions or coroutine
+functions. Functions that return a generator in ``clj.seqs`` return an async generator here, with the same laziness:
+an item is pulled from the source only when it’s needed. Functions that return a value are coroutines:
+
+    from clj import aseqs
+
+    async def consume(stream):
+        async for batch in aseqs.partition_all(aseqs.distinct(stream), 100):
+            await store(batch)
+
+``split_at``, ``split_with`` and ``nfirst`` are coroutines that return async iterators. ``is_seq``, ``empty``,
+``LazySeq`` and ``is_realized`` have no async counterpart.
+"""
+import collections
+import collections.abc as collections_abc
+import inspect
+import itertools
+import os
+import random
+from typing import Any, AsyncIterable, AsyncIterator, Callable, Deque, Iterable, Literal, Sequence, TypeVar, Union, \
+    cast, overload
+
+from clj import spill
+from clj.seqs import _nil, _Nil, _range
+
+T = TypeVar('T')
+T2 = TypeVar('T2')
+
+AnyIterable = Union[Iterable[T], AsyncIterable[T]]
+
+_isawaitable = inspect.isawaitable
+
+
+def _aiter(coll: AnyIterable[T]) -> AsyncIterator[T]:
+    if isinstance(coll, collections_abc.AsyncIterable):
+        return coll.__aiter__()
+    return _from_iterable(coll)
+
+
+async def _from_iterable(coll: Iterable[T]) -> AsyncIterator[T]:
+    for e in coll:
+        yield e
+
+
+async def _await(x: Any) -> Any:
+    if _isawaitable(x):
+        return await x
+    return x
+
+
+def _make_pred(pred: Union[Callable[[T], Any], set[T]]) -> Callable[[T], Any]:
+    if isinstance(pred, set):
+        return pred.__contains__
+    return pred
+
+
+async def _first(coll: AnyIterable[T]) -> tuple[Union[T, None], bool]:
+    """
+    Like ``first(coll)``, but return a tuple of ``(first, is_empty)``.
+    """
+    if coll is None:
+        return None, True
+
+    async for e in _aiter(coll):
+        return e, False
+    return None, True
+
+
+async def distinct(coll: AnyIterable[T], key: Union[Callable[[T], Any], None] = None, seen: Any = None) \
+        -> AsyncIterator[T]:
+    """
+    Return an async generator of the elements of ``coll`` with duplicates removed. If ``key`` is given, two elements
+    are duplicates if they have the same ``key(element)``; the first one is kept. The keys are kept in ``seen``, a
+    ``set`` by default; see ``clj.distinct`` to bound its memory.
+    """
+    if seen is None:
+        seen = set()
+    add = seen.add
+
+    if key is None:
+        async for e in _aiter(coll):
+            if e not in seen:
+                add(e)
+                yield e
+        return
+
+    async for e in _aiter(coll):
+        k = key(e)
+        if _isawaitable(k):
+            k = await k
+        if k not in seen:
+            add(k)
+            yield e
+
+
+# noinspection PyShadowingBuiltins
+async def filter(pred: Callable[[T], Any], coll: AnyIterable[T]) -> AsyncIterator[T]:
+    """
+    Return an async generator of the items in ``coll`` for which ``pred(item)`` returns a truthy value.
+    """
+    async for e in _aiter(coll):
+        ok = pred(e)
+        if _isawaitable(ok):
+            ok = await ok
+        if ok:
+            yield e
+
+
+async def remove(pred: Callable[[T], Any], coll: AnyIterable[T]) -> AsyncIterator[T]:
+    """
+    Return an async generator of the items in ``coll`` for which ``pred(item)`` returns a falsy value.
+    """
+    async for e in _aiter(coll):
+        ok = pred(e)
+        if _isawaitable(ok):
+            ok = await ok
+        if not ok:
+            yield e
+
+
+async def keep(f: Callable[[T], Any], coll: AnyIterable[T]) -> AsyncIterator[Any]:
+    """
+    Returns an async generator of the non-``None`` results of ``f(item)``.
+    """
+    async for e in _aiter(coll):
+        res = f(e)
+        if _isawaitable(res):
+            res = await res
+        if res is not None:
+            yield res
+
+
+async def keep_indexed(f: Callable[[int, T], Any], coll: AnyIterable[T]) -> AsyncIterator[Any]:
+    """
+    Returns an async generator of the non-``None`` results of ``f(index, item)``.
+    """
+    i = 0
+    async for e in _aiter(coll):
+        res = f(i, e)
+        if _isawaitable(res):
+            res = await res
+        if res is not None:
+            yield res
+        i += 1
+
+
+async def cons(x: T2, seq: AnyIterable[T]) -> AsyncIterator[Union[T, T2]]:
+    """
+    Return an async generator where ``x`` is the first element and ``seq`` is the rest.
+    """
+    yield x
+    async for e in _aiter(seq):
+        yield e
+
+
+async def concat(*xs: AnyIterable[T]) -> AsyncIterator[T]:
+    """
+    Returns an async generator representing the concatenation of the elements in the supplied collections.
+    """
+    for coll in xs:
+        async for e in _aiter(coll):
+            yield e
+
+
+# noinspection PyShadowingBuiltins
+async def map(f: Callable[..., Any], *colls: AnyIterable[Any]) -> AsyncIterator[Any]:
+    """
+    Returns an async generator of the results of ``f`` applied to the first items of each collection, then the second
+    items, etc., until any of the collections is exhausted.
+    """
+    if len(colls) == 1:
+        async for e in _aiter(colls[0]):
+            res = f(e)
+            if _isawaitable(res):
+                res = await res
+            yield res
+        return
+
+    iterators = [_aiter(coll) for coll in colls]
+    while True:
+        try:
+            args = [await it.__anext__() for it in iterators]
+        except StopAsyncIteration:
+            return
+        res = f(*args)
+        if _isawaitable(res):
+            res = await res
+        yield res
+
+
+async def mapcat(f: Callable[..., Any], *colls: AnyIterable[Any]) -> AsyncIterator[Any]:
+    """
+    Returns an async generator of the concatenation of the results of ``map(f, *colls)``. Thus function ``f`` should
+    return a collection, either regular or async.
+    """
+    async for coll in map(f, *colls):
+        async for e in _aiter(coll):
+            yield e
+
+
+async def cycle(coll: AnyIterable[T]) -> AsyncIterator[T]:
+    """
+    Returns an (infinite!) async generator which yields repetitions of the items in ``coll``.
+    """
+    els = []
+    async for e in _aiter(coll):
+        yield e
+        els.append(e)
+
+    if not els:
+        return
+
+    while True:
+        for e in els:
+            yield e
+
+
+async def interleave(*colls: AnyIterable[T]) -> AsyncIterator[T]:
+    """
+    Returns an async generator of the first item in each coll, then the second etc.
+    """
+    iterators = [_aiter(coll) for coll in colls]
+    if not iterators:
+        return
+
+    while True:
+        try:
+            values = [await it.__anext__() for it in iterators]
+        except StopAsyncIteration:
+            return
+        for v in values:
+            yield v
+
+
+async def interleave_longest(*colls: AnyIterable[T], fill: Any = _nil) -> AsyncIterator[T]:
+    """
+    Like ``interleave``, but continues until all colls are exhausted, dropping the exhausted ones or replacing their
+    items with ``fill`` if it’s given. See ``clj.interleave_longest``.
+    """
+    iterators = [_aiter(coll) for coll in colls]
+
+    if fill is _nil:
+        while iterators:
+            active = []
+            for it in iterators:
+                try:
+                    v = await it.__anext__()
+                except StopAsyncIteration:
+                    continue
+                active.append(it)
+                yield v
+            iterators = active
+        return
+
+    exhausted = [False] * len(iterators)
+    while True:
+        values = []
+        for i, it in enumerate(iterators):
+            if not exhausted[i]:
+                try:
+                    values.append(await it.__anext__())
+                    continue
+                except StopAsyncIteration:
+                    exhausted[i] = True
+            values.append(fill)
+
+        if all(exhausted):
+            return
+        for v in values:
+            yield v
+
+
+async def interpose(sep: T2, coll: AnyIterable[T]) -> AsyncIterator[Union[T, T2]]:
+    """
+    Returns an async generator of the elements of ``coll`` separated by ``sep``.
+    """
+    first_ = True
+    async for e in _aiter(coll):
+        if first_:
+            first_ = False
+        else:
+            yield sep
+
+        yield e
+
+
+def rest(coll: AnyIterable[T]) -> AsyncIterator[T]:
+    """
+    Returns a possibly empty async generator of the items after the first.
+    """
+    return drop(1, coll)
+
+
+async def drop(n: int, coll: AnyIterable[T]) -> AsyncIterator[T]:
+    """
+    Returns an async generator of all but the first ``n`` items in ``coll``.
+    """
+    if coll is None:
+        return
+
+    async for e in _aiter(coll):
+        if n > 0:
+            n -= 1
+            continue
+        yield e
+
+
+async def drop_while(pred: Callable[[T], Any], coll: AnyIterable[T]) -> AsyncIterator[T]:
+    """
+    Returns an async generator of the items in ``coll`` starting from the first item for which ``pred(item)`` returns
+    a falsy value.
+    """
+    dropping = True
+    async for e in _aiter(coll):
+        if dropping:
+            ok = pred(e)
+            if _isawaitable(ok):
+                ok = await ok
+            if ok:
+                continue
+            dropping = False
+        yield e
+
+
+async def take(n: int, coll: AnyIterable[T]) -> AsyncIterator[T]:
+    """
+    Returns an async generator of the first ``n`` items in ``coll``, or all items if there are fewer than ``n``.
+    """
+    if n <= 0:
+        return
+
+    async for e in _aiter(coll):
+        yield e
+        n -= 1
+        # Don't pull another item from coll
+        if n <= 0:
+            return
+
+
+async def take_nth(n: int, coll: AnyIterable[T]) -> AsyncIterator[T]:
+    """
+    Returns an async generator of every ``n``th item in ``coll``.
+
+    If ``n`` is not positive, returns an infinite async generator of the first item in ``coll`` (or an empty one if
+    ``coll`` is empty).
+    """
+    if n <= 0:
+        async for e in _aiter(coll):
+            while True:
+                yield e
+
+    i = 0
+    async for e in _aiter(coll):
+        if i == 0:
+            yield e
+            i = n
+        i -= 1
+
+
+async def take_while(pred: Callable[[T], Any], coll: AnyIterable[T]) -> AsyncIterator[T]:
+    """
+    Returns an async generator of successive items from ``coll`` while ``pred(item)`` returns a truthy value.
+    """
+    async for e in _aiter(coll):
+        ok = pred(e)
+        if _isawaitable(ok):
+            ok = await ok
+        if not ok:
+            return
+        yield e
+
+
+def butlast(coll: AnyIterable[T]) -> AsyncIterator[T]:
+    """
+    Return an async generator of all but the last item in ``coll``.
+    """
+    return drop_last(1, coll)
+
+
+async def drop_last(n: int, coll: AnyIterable[T]) -> AsyncIterator[T]:
+    """
+    Return an async generator of all but the last ``n`` items in ``coll``.
+    """
+    queue: Deque[T] = collections.deque()
+    async for e in _aiter(coll):
+        queue.append(e)
+        if len(queue) > n:
+            yield queue.popleft()
+
+
+async def flatten(x: AnyIterable[Any], depth: Union[int, None] = None,
+                  atomic: Union[type, tuple[type, ...]] = (str, bytes)) -> AsyncIterator[Any]:
+    """
+    Takes any nested combination of sequential things (``list``s, ``tuple``s, async iterables, etc.) and returns
+    their contents as a single, flat async generator. See ``clj.flatten`` for ``depth`` and ``atomic``.
+    """
+    # Use a stack to support deeply-nested iterables
+    xs = [_aiter(x)]
+
+    while xs:
+        async for e in xs[-1]:
+            if (depth is None or len(xs) <= depth) and (
+                    isinstance(e, collections_abc.AsyncIterable) or
+                    (isinstance(e, collections_abc.Iterable) and not isinstance(e, str) and not isinstance(e, atomic))):
+                xs.append(_aiter(e))
+                break
+
+            yield e
+        else:
+            xs.pop()
+
+
+async def reverse(coll: AnyIterable[T]) -> AsyncIterator[T]:
+    """
+    Return an async generator of the items in ``coll`` in reverse order. Not lazy.
+    """
+    for e in reversed(await _list(coll)):
+        yield e
+
+
+async def _list(coll: AnyIterable[T]) -> list[T]:
+    if isinstance(coll, collections_abc.Iterable):
+        return list(coll)
+    return [e async for e in _aiter(coll)]
+
+
+async def shuffle(coll: AnyIterable[T]) -> list[T]:
+    """
+    Return a random permutation of ``coll``. Not lazy.
+    """
+    items = await _list(coll)
+    random.shuffle(items)
+    return items
+
+
+async def split_at(n: int, coll: AnyIterable[T]) -> tuple[list[T], AsyncIterator[T]]:
+    """
+    Returns a tuple of ``(take(n, coll), drop(n coll))``. The first element is a list: the items are realized by the
+    coroutine.
+    """
+    it = _aiter(coll if coll is not None else ())
+    taken = [e async for e in take(n, it)]
+    return taken, it
+
+
+async def split_with(pred: Callable[[T], Any], coll: AnyIterable[T]) -> tuple[list[T], AsyncIterator[T]]:
+    """
+    Returns a tuple of ``(take_while(pred, coll), drop_while(pred, coll))``. The first element is a list: the items are
+    realized by the coroutine.
+    """
+    it = _aiter(coll)
+    taken: list[T] = []
+    async for e in it:
+        ok = pred(e)
+        if _isawaitable(ok):
+            ok = await ok
+        if not ok:
+            return taken, cons(e, it)
+        taken.append(e)
+
+    return taken, it
+
+
+async def replace(smap: dict[T, T2], coll: AnyIterable[T]) -> AsyncIterator[Union[T, T2]]:
+    """
+    Given a map of replacement pairs and a collection, yield a sequence where any element = a key in ``smap`` is
+    replaced with the corresponding val in ``smap``.
+    """
+    async for e in _aiter(coll):
+        yield smap.get(e, e)
+
+
+async def reductions(f: Callable[[Any, T], Any], coll: AnyIterable[T], init: Union[Any, _Nil] = _nil) \
+        -> AsyncIterator[Any]:
+    """
+    Yield the intermediate values of the reduction of ``coll`` by ``f``, starting with ``init``.
+    """
+    it = _aiter(coll)
+    if isinstance(init, _Nil):
+        try:
+            acc = await it.__anext__()
+        except StopAsyncIteration:
+            yield None
+            return
+    else:
+        acc = init
+
+    yield acc
+
+    async for e in it:
+        acc = f(acc, e)
+        if _isawaitable(acc):
+            acc = await acc
+        yield acc
+
+
+async def map_indexed(f: Callable[[int, T], Any], coll: AnyIterable[T]) -> AsyncIterator[Any]:
+    """
+    Returns an async generator of the results of ``f(index, item)``.
+    """
+    i = 0
+    async for e in _aiter(coll):
+        res = f(i, e)
+        if _isawaitable(res):
+            res = await res
+        yield res
+        i += 1
+
+
+async def first(coll: AnyIterable[T]) -> Union[T, None]:
+    """
+    Returns the first item in the collection. If ``coll`` is empty, returns ``None``.
+    """
+    return (await _first(coll))[0]
+
+
+async def ffirst(x: AnyIterable[AnyIterable[T]]) -> Union[T, None]:
+    """
+    Same as ``first(first(x))``
+    """
+    f = await first(x)
+    if f is None:
+        return None
+    return await first(f)
+
+
+async def nfirst(x: AnyIterable[AnyIterable[T]]) -> AsyncIterator[T]:
+    """
+    Same as ``rest(first(x))``
+    """
+    f = await first(x)
+    return rest(f if f is not None else ())
+
+
+async def second(coll: AnyIterable[T]) -> Union[T, None]:
+    """
+    Same as ``first(rest(coll))``.
+    """
+    return await first(rest(coll))
+
+
+async def nth(coll: AnyIterable[T], n: int, not_found: Union[T2, _Nil] = _nil) -> Union[T, T2]:
+    """
+    Returns the value at the index. Raises an ``IndexError`` if the index is out of bounds, unless ``not_found`` is
+    supplied.
+    """
+    if n >= 0:
+        async for e in _aiter(coll):
+            if n == 0:
+                return e
+            n -= 1
+
+    if isinstance(not_found, _Nil):
+        raise IndexError("%s index out of range" % type(coll))
+
+    return not_found
+
+
+async def last(coll: AnyIterable[T]) -> Union[T, None]:
+    """
+    Return the last item in ``coll``. Return ``None`` if ``coll`` is empty.
+    """
+    last_e = None
+    async for e in _aiter(coll):
+        last_e = e
+    return last_e
+
+
+async def zipmap(keys: AnyIterable[T], vals: AnyIterable[T2]) -> dict[T, T2]:
+    """
+    Return a ``dict`` with the keys mapped to the corresponding ``vals``.
+    """
+    d: dict[T, T2] = {}
+    vals_it = _aiter(vals)
+    async for k in _aiter(keys):
+        try:
+            d[k] = await vals_it.__anext__()
+        except StopAsyncIteration:
+            break
+    return d
+
+
+async def frequencies(coll: AnyIterable[T], key: Union[Callable[[T], Any], None] = None, sketch: Any = None) -> Any:
+    """
+    Returns a ``collections.Counter`` of the number of times each element (or ``key(element)``) appears in ``coll``, or
+    adds them to ``sketch`` and returns it. See ``clj.frequencies``.
+    """
+    counts: Any = collections.Counter() if sketch is None else sketch
+    add = counts.update
+    async for e in _aiter(coll):
+        if key is not None:
+            e = key(e)
+            if _isawaitable(e):
+                e = await e
+        add((e,))
+
+    return counts
+
+
+@overload
+async def group_by(f: Callable[[T], Any], coll: AnyIterable[T]) -> dict[Any, list[T]]:
+    ...
+
+
+@overload
+async def group_by(f: Callable[[T], Any], coll: AnyIterable[T], max_items: int,
+                   spill_dir: Union[str, "os.PathLike[str]", None] = None) -> "spill.SpilledGroups[Any, T]":
+    ...
+
+
+async def group_by(f: Callable[[T], Any], coll: AnyIterable[T], max_items: Union[int, None] = None,
+                   spill_dir: Union[str, "os.PathLike[str]", None] = None) \
+        -> Union[dict[Any, list[T]], "spill.SpilledGroups[Any, T]"]:
+    """
+    Returns a ``dict`` of the elements of ``coll`` keyed by the result of ``f`` on each element. The value at each key
+    will be a list of the corresponding elements, in the order they appeared in ``coll``.
+
+    If ``max_items`` is given, at most that many elements are kept in memory and a ``clj.spill.SpilledGroups`` mapping
+    is returned instead; see ``clj.group_by``. The elements are written to the disk without yielding to the event loop.
+    """
+    if max_items is not None:
+        groups: spill.SpilledGroups[Any, T] = spill.SpilledGroups(max_items, spill_dir)
+        try:
+            async for e in _aiter(coll):
+                k = f(e)
+                if _isawaitable(k):
+                    k = await k
+                groups.add(k, e)
+        except BaseException:
+            groups.close()
+            raise
+        return groups
+
+    buffers = collections.defaultdict(list)
+    async for e in _aiter(coll):
+        k = f(e)
+        if _isawaitable(k):
+            k = await k
+        buffers[k].append(e)
+
+    return dict(buffers)
+
+
+async def some(pred: Union[Callable[[T], Any], set[T]], coll: AnyIterable[T]) -> Union[T, None]:
+    """
+    Returns the first item ``x`` of ``coll`` for which ``pred(x)`` is truthy, else ``None``. ``pred`` can also be a
+    set.
+    """
+    pred = _make_pred(pred)
+    async for e in _aiter(coll):
+        ok = pred(e)
+        if _isawaitable(ok):
+            ok = await ok
+        if ok:
+            return e
+    return None
+
+
+async def every(pred: Union[Callable[[T], Any], set[T]], coll: AnyIterable[T]) -> bool:
+    """
+    Returns ``True`` if ``pred(x)`` is logical true for every ``x`` in ``coll``, else ``False``.
+    """
+    pred = _make_pred(pred)
+    async for e in _aiter(coll):
+        ok = pred(e)
+        if _isawaitable(ok):
+            ok = await ok
+        if not ok:
+            return False
+    return True
+
+
+async def not_every(pred: Union[Callable[[T], Any], set[T]], coll: AnyIterable[T]) -> bool:
+    """
+    Returns ``False`` if ``pred(x)`` is logical true for every ``x`` in ``coll``, else ``True``.
+    """
+    return not await every(pred, coll)
+
+
+async def not_any(pred: Union[Callable[[T], Any], set[T]], coll: AnyIterable[T]) -> bool:
+    """
+    Return ``False`` if ``pred(x)`` is logical true for any ``x`` in ``coll``, else ``True``.
+    """
+    pred2 = _make_pred(pred)
+
+    async def _not_pred(e: T) -> bool:
+        return not await _await(pred2(e))
+
+    return await every(_not_pred, coll)
+
+
+async def dorun(coll: AnyIterable[Any]) -> None:
+    """
+    Walks through ``coll`` to force any side effect, without retaining the head. Returns ``None``.
+    """
+    async for _ in _aiter(coll):
+        pass
+
+
+async def repeatedly(f: Union[Callable[[], Any], int], n: Union[int, Callable[[], Any], None] = None) \
+        -> AsyncIterator[Any]:
+    """
+    Takes a function of no args, presumably with side effects, and returns an infinite (or length ``n`` if supplied)
+    async generator of calls to it.
+    """
+    # Accept Clojure-like calls of [repeatedly(n, f)]
+    if callable(n) and isinstance(f, int):
+        f, n = n, f
+
+    if n is None:
+        n = -1
+
+    f = cast(Callable[[], Any], f)
+    n = cast(int, n)
+
+    while n != 0:
+        res = f()
+        if _isawaitable(res):
+            res = await res
+        yield res
+        n -= 1
+
+
+async def iterate(f: Callable[[Any], Any], x: Any) -> AsyncIterator[Any]:
+    """
+    Returns an async generator of ``x``, ``f(x)``, ``f(f(x))``, etc.
+    """
+    while True:
+        yield x
+        x = f(x)
+        if _isawaitable(x):
+            x = await x
+
+
+async def repeat(x: T, n: Union[int, None] = None) -> AsyncIterator[T]:
+    """
+    Returns an async generator that indefinitely yields ``x`` (or ``n`` times if ``n`` is supplied).
+    """
+    it = itertools.repeat(x) if n is None else itertools.repeat(x, n)
+    for e in it:
+        yield e
+
+
+# noinspection PyShadowingBuiltins
+async def range(*args: int) -> AsyncIterator[int]:
+    """
+    Returns an async generator of numbers from ``start`` (inclusive) to ``end`` (exclusive), by ``step``. See
+    ``clj.range``.
+    """
+    it = _range(*args) if args else itertools.count()
+    for e in it:
+        yield e
+
+
+def tree_seq(has_branch: Callable[[T], Any],
+             get_children: Callable[[T], Any],
+             root: T,
+             order: Literal["pre", "post", "breadth"] = "pre",
+             max_depth: Union[int, None] = None) -> AsyncIterator[T]:
+    """
+    Returns an async generator of the nodes in a tree, via a depth-first walk. ``get_children`` may return a regular
+    or an async iterable. ``order`` and ``max_depth`` select the walk; see ``clj.tree_seq``.
+    """
+    if order == "pre":
+        return _tree_seq_pre(has_branch, get_children, root, max_depth)
+    if order == "post":
+        return _tree_seq_post(has_branch, get_children, root, max_depth)
+    if order == "breadth":
+        return _tree_seq_breadth(has_branch, get_children, root, max_depth)
+    raise ValueError("order must be 'pre', 'post' or 'breadth', not %r" % (order,))
+
+
+async def _children(get_children: Callable[[T], Any], node: T) -> AsyncIterator[T]:
+    return _aiter(await _await(get_children(node)))
+
+
+async def _tree_seq_pre(has_branch: Callable[[T], Any], get_children: Callable[[T], Any], root: T,
+                        max_depth: Union[int, None]) -> AsyncIterator[T]:
+    yield root
+    if (max_depth is not None and max_depth <= 0) or not await _await(has_branch(root)):
+        return
+
+    # Iterators of the children of the ancestors of the current node; the depth of the nodes of stack[-1] is
+    # len(stack)
+    stack = [await _children(get_children, root)]
+    while stack:
+        async for node in stack[-1]:
+            yield node
+            if (max_depth is None or len(stack) < max_depth) and await _await(has_branch(node)):
+                stack.append(await _children(get_children, node))
+                break
+        else:
+            stack.pop()
+
+
+async def _tree_seq_post(has_branch: Callable[[T], Any], get_children: Callable[[T], Any], root: T,
+                         max_depth: Union[int, None]) -> AsyncIterator[T]:
+    if (max_depth is not None and max_depth <= 0) or not await _await(has_branch(root)):
+        yield root
+        return
+
+    # Pairs of nodes and iterators of their remaining children
+    stack = [(root, await _children(get_children, root))]
+    while stack:
+        async for node in stack[-1][1]:
+            if (max_depth is None or len(stack) < max_depth) and await _await(has_branch(node)):
+                stack.append((node, await _children(get_children, node)))
+                break
+            yield node
+        else:
+            yield stack.pop()[0]
+
+
+async def _tree_seq_breadth(has_branch: Callable[[T], Any], get_children: Callable[[T], Any], root: T,
+                            max_depth: Union[int, None]) -> AsyncIterator[T]:
+    yield root
+    if (max_depth is not None and max_depth <= 0) or not await _await(has_branch(root)):
+        return
+
+    # Pairs of iterators of children and their depth
+    queue = collections.deque([(await _children(get_children, root), 1)])
+    while queue:
+        children, depth = queue.popleft()
+        explore = max_depth is None or depth < max_depth
+        async for node in children:
+            yield node
+            if explore and await _await(has_branch(node)):
+                queue.append((await _children(get_children, node), depth + 1))
+
+
+async def dedupe(coll: AnyIterable[T]) -> AsyncIterator[T]:
+    """
+    Returns an async generator of the elements of coll with consecutive duplicates removed.
+    """
+    initial = True
+    prev = None
+    async for e in _aiter(coll):
+        if initial or e != prev:
+            initial = False
+            yield e
+        prev = e
+
+
+async def count(coll: AnyIterable[Any]) -> int:
+    """
+    Returns the number of items in the collection.
+    """
+    if hasattr(coll, "__len__"):
+        return len(cast(list[Any], coll))
+
+    n = 0
+    async for _ in _aiter(coll):
+        n += 1
+    return n
+
+
+@overload
+def partition(coll: AnyIterable[T], n: int, step: Union[int, None] = None, pad: Union[Iterable[T2], None] = None,
+              views: Literal[False] = False) -> AsyncIterator[list[Union[T, T2]]]:
+    ...
+
+
+@overload
+def partition(coll: AnyIterable[T], n: int, step: Union[int, None] = None, pad: Union[Iterable[T2], None] = None, *,
+              views: Literal[True]) -> AsyncIterator[Sequence[Union[T, T2]]]:
+    ...
+
+
+def partition(coll: AnyIterable[T], n: int, step: Union[int, None] = None, pad: Union[Iterable[T2], None] = None,
+              views: bool = False) -> AsyncIterator[Sequence[Union[T, T2]]]:
+    """
+    Returns an async generator of lists of ``n`` items each, at offsets ``step`` apart. See ``clj.partition``.
+
+    If ``views`` is ``True``, yield read-only tuples instead of lists. The items come one by one from an async
+    generator, so unlike ``clj.partition`` there are no ``memoryview`` partitions.
+    """
+    return _partition(coll, n, step, pad, False, views)
+
+
+@overload
+def partition_all(coll: AnyIterable[T], n: int, step: Union[int, None] = None,
+                  views: Literal[False] = False) -> AsyncIterator[list[T]]:
+    ...
+
+
+@overload
+def partition_all(coll: AnyIterable[T], n: int, step: Union[int, None] = None, *,
+                  views: Literal[True]) -> AsyncIterator[Sequence[T]]:
+    ...
+
+
+def partition_all(coll: AnyIterable[T], n: int, step: Union[int, None] = None,
+                  views: bool = False) -> AsyncIterator[Sequence[T]]:
+    """
+    Like ``partition``, but the async generator may include partitions with fewer than ``n`` items at the end.
+    """
+    return _partition(coll, n, step, None, True, views)
+
+
+async def _partition(coll: AnyIterable[Any], n: int, step: Union[int, None], pad: Union[Iterable[Any], None],
+                     all_: bool, views: bool) -> AsyncIterator[Sequence[Any]]:
+    if n <= 0:
+        return
+
+    if step is None:
+        step = n
+    elif step <= 0:
+        raise ValueError("step must be positive")
+
+    copy: Callable[[Iterable[Any]], Sequence[Any]] = tuple if views else list
+    window: Deque[Any] = collections.deque()
+    skip = 0
+    async for e in _aiter(coll):
+        if skip:
+            skip -= 1
+            continue
+
+        window.append(e)
+        if len(window) == n:
+            yield copy(window)
+            if step >= n:
+                window.clear()
+                skip = step - n
+            else:
+                for _ in _range(step):
+                    window.popleft()
+
+    if all_:
+        while window:
+            yield copy(window)
+            for _ in _range(min(step, len(window))):
+                window.popleft()
+    elif window and pad is not None:
+        yield copy(itertools.chain(window, itertools.islice(pad, n - len(window))))
+
+
+async def partition_by(f: Callable[[T], Any], coll: AnyIterable[T]) -> AsyncIterator[list[T]]:
+    """
+    Applies ``f`` to each value in ``coll``, splitting it each time ``f`` returns a new value.
+    """
+    current: list[T] = []
+    current_value = None
+    async for element in _aiter(coll):
+        value = f(element)
+        if _isawaitable(value):
+            value = await value
+
+        if current and value != current_value:
+            yield current
+            current = []
+
+        current.append(element)
+        current_value = value
+
+    if current:
+        yield current
+
+
+async def seq_gen(coll: AnyIterable[T]) -> Union[AsyncIterator[T], None]:
+    """
+    Like Clojure’s ``seq``: return ``None`` if ``coll`` is empty, or an async iterator equivalent to ``coll``.
+    """
+    it = _aiter(coll)
+    try:
+        first_element = await it.__anext__()
+    except StopAsyncIteration:
+        return None
+
+    return cons(first_element, it)
+
@@ -0,0 +1,204 @@
+# -*- coding: UTF-8 -*-
+"""
+Chunked sequences, realized 32 items at a time like Clojure’s.
+
+Every generator of ``clj.seqs`` is resumed once per item, which dominates the cost of cheap functions such as ``inc``.
+In a chunked sequence, sources produce lists of items and ``map``/``filter``/``keep``/``remove``/``take``/``drop``
+process whole chunks at once with builtins, so no Python code runs per item besides the functions themselves:
+
+    >>> from clj import chunked as ch, inc, is_even
+    >>> s = ch.take(5, ch.filter(is_even, ch.map(inc, ch.range())))
+    >>> list(s)
+    [2, 4, 6, 8, 10]
+
+A ``ChunkedSeq`` is a regular iterable of its items, so it can be passed to any other function. The functions of this
+module also accept regular iterables, which they chunk with ``chunked_seq``.
+
+Builtin ``map`` and ``filter`` already run without any Python code per item, so chunking pays off mostly for stages
+that are Python generators in ``clj.seqs``, such as ``keep``, ``range`` or ``iterate``, and for long chains of them.
+
+Since a whole chunk is realized at once, functions may be called on up to ``size - 1`` items that are never consumed.
+Don’t use chunked sequences with functions that have side effects or on slow streams.
+"""
+import functools
+import itertools
+import operator
+from typing import Any, Callable, Generic, Iterable, Iterator, Sequence, TypeVar, Union
+
+T = TypeVar('T')
+T2 = TypeVar('T2')
+
+# We redefine these below so keep a reference to the original ones here
+_range = range
+_map = map
+_filter = filter
+
+CHUNK_SIZE = 32
+
+_repeat = itertools.repeat
+_is_not_none = functools.partial(operator.is_not, None)
+
+
+class ChunkedSeq(Generic[T]):
+    """
+    A lazy iterable of items, realized by chunks. Iterating over it yields the items; use ``chunks()`` to get the
+    chunks themselves. Like a generator, it can be consumed only once.
+    """
+
+    def __init__(self, chunks: Iterable[list[T]]):
+        self._chunks = iter(chunks)
+
+    def chunks(self) -> Iterator[list[T]]:
+        """
+        Return an iterator of the chunks of the sequence. They are lists, which may be empty.
+        """
+        return self._chunks
+
+    def __iter__(self) -> Iterator[T]:
+        return itertools.chain.from_iterable(self._chunks)
+
+
+def is_chunked_seq(x: Any) -> bool:
+    """
+    Return ``True`` if ``x`` is a ``ChunkedSeq``.
+    """
+    return isinstance(x, ChunkedSeq)
+
+
+def chunked_seq(coll: Iterable[T], size: int = CHUNK_SIZE) -> ChunkedSeq[T]:
+    """
+    Return a ``ChunkedSeq`` of the items of ``coll``, realized by chunks of ``size`` items. If ``coll`` is already a
+    ``ChunkedSeq``, it’s returned as-is.
+    """
+    if isinstance(coll, ChunkedSeq):
+        return coll
+
+    size = max(size, 1)
+    if isinstance(coll, (list, tuple, _range)):
+        return ChunkedSeq(_map(list, _slices(coll, size)))
+
+    it = iter(coll)
+    return ChunkedSeq(iter(lambda: list(itertools.islice(it, size)), []))
+
+
+def _chunks(coll: Iterable[T]) -> Iterator[list[T]]:
+    return chunked_seq(coll).chunks()
+
+
+def _slices(coll: Sequence[T], size: int) -> Iterator[Sequence[T]]:
+    # Chunks are built with builtins only so that no Python code runs per chunk
+    return _map(coll.__getitem__, _map(slice, _range(0, len(coll), size), itertools.count(size, size)))
+
+
+# Sources
+
+# noinspection PyShadowingBuiltins
+def range(*args: int, size: int = CHUNK_SIZE) -> ChunkedSeq[int]:
+    """
+    Chunked counterpart of ``clj.range``: with no argument, the sequence is infinite.
+    """
+    size = max(size, 1)
+    if args:
+        return ChunkedSeq(_map(list, _slices(_range(*args), size)))
+
+    return ChunkedSeq(_map(list, _map(_range, itertools.count(0, size), itertools.count(size, size))))
+
+
+def repeat(x: T, n: Union[int, None] = None, size: int = CHUNK_SIZE) -> ChunkedSeq[T]:
+    """
+    Chunked counterpart of ``clj.repeat``.
+    """
+    size = max(size, 1)
+    # Copy the chunk each time, so that a consumer of chunks() can modify one without changing the others
+    chunk = [x] * size
+    if n is None:
+        return ChunkedSeq(_map(list, _repeat(chunk)))
+
+    full, last = divmod(max(n, 0), size)
+    chunks = _map(list, _repeat(chunk, full))
+    if last:
+        return ChunkedSeq(itertools.chain(chunks, ([x] * last,)))
+    return ChunkedSeq(chunks)
+
+
+def iterate(f: Callable[[T], T], x: T, size: int = CHUNK_SIZE) -> ChunkedSeq[T]:
+    """
+    Chunked counterpart of ``clj.iterate``. Note ``f`` is called on up to ``size`` items ahead of the consumer.
+    """
+    def _iterate_chunks(x: T) -> Iterator[list[T]]:
+        while True:
+            chunk = [x]
+            for _ in _range(size - 1):
+                x = f(x)
+                chunk.append(x)
+            yield chunk
+            x = f(x)
+
+    return ChunkedSeq(_iterate_chunks(x))
+
+
+# Transformations
+
+# noinspection PyShadowingBuiltins
+def map(f: Callable[[T], T2], coll: Iterable[T]) -> ChunkedSeq[T2]:
+    """
+    Chunked counterpart of ``map``, for a single collection.
+    """
+    return ChunkedSeq(_map(list, _map(_map, _repeat(f), _chunks(coll))))
+
+
+# noinspection PyShadowingBuiltins
+def filter(pred: Callable[[T], Any], coll: Iterable[T]) -> ChunkedSeq[T]:
+    """
+    Chunked counterpart of ``filter``.
+    """
+    return ChunkedSeq(_map(list, _map(_filter, _repeat(pred), _chunks(coll))))
+
+
+def remove(pred: Callable[[T], Any], coll: Iterable[T]) -> ChunkedSeq[T]:
+    """
+    Chunked counterpart of ``clj.remove``.
+    """
+    return ChunkedSeq(_map(list, _map(itertools.filterfalse, _repeat(pred), _chunks(coll))))
+
+
+def keep(f: Callable[[T], Any], coll: Iterable[T]) -> ChunkedSeq[Any]:
+    """
+    Chunked counterpart of ``clj.keep``.
+    """
+    results = _map(_map, _repeat(f), _chunks(coll))
+    return ChunkedSeq(_map(list, _map(_filter, _repeat(_is_not_none), results)))
+
+
+def take(n: int, coll: Iterable[T]) -> ChunkedSeq[T]:
+    """
+    Chunked counterpart of ``clj.take``. No chunk is realized after the one that contains the ``n``-th item.
+    """
+    def _take_chunks(n: int) -> Iterator[list[T]]:
+        if n <= 0:
+            return
+        for chunk in _chunks(coll):
+            if len(chunk) >= n:
+                yield chunk[:n]
+                return
+            yield chunk
+            n -= len(chunk)
+
+    return ChunkedSeq(_take_chunks(n))
+
+
+def drop(n: int, coll: Iterable[T]) -> ChunkedSeq[T]:
+    """
+    Chunked counterpart of ``clj.drop``.
+    """
+    def _drop_chunks(n: int) -> Iterator[list[T]]:
+        chunks = _chunks(coll)
+        for chunk in chunks:
+            if len(chunk) > n:
+                yield chunk[n:] if n > 0 else chunk
+                break
+            n -= len(chunk)
+        yield from chunks
+
+    return ChunkedSeq(_drop_chunks(n))
+
@@ -0,0 +1,276 @@
+# -*- coding: UTF-8 -*-
+"""
+Sequences read from files: ``line_seq`` and ``re_seq``.
+
+Files are memory-mapped, so reading them doesn’t copy their content in an intermediate buffer. Lines are split and
+decoded in bulk, a block of about 64 KiB at a time, or yielded as ``memoryview`` slices of the mapped file without
+copying anything.
+
+Byte ranges (``start`` and ``end``) select the lines that *start* in the range, so that consecutive ranges split a file
+into disjoint sets of lines, whatever the offsets. Several workers can read one file in parallel this way:
+
+    size = os.path.getsize(path)
+    ranges = [(size * i // workers, size * (i + 1) // workers) for i in range(workers)]
+    # worker i:
+    for line in line_seq(path, start=ranges[i][0], end=ranges[i][1]):
+        ...
+
+``re_seq`` reads file objects a block at a time, and only keeps the end of the previous block that may be part of a
+match spanning several blocks.
+"""
+import io
+import mmap
+import os
+import re
+import stat
+from typing import IO, Any, AnyStr, Iterator, Literal, Pattern, Union, overload
+
+# Approximate number of bytes split and decoded at once
+BLOCK_SIZE = 1 << 16
+
+Source = Union[str, "os.PathLike[str]", IO[Any]]
+
+
+def _open(source: Source) -> tuple[Union[IO[Any], None], Union[mmap.mmap, bytes]]:
+    """
+    Return the file to close, if any, and the content of ``source``: a memory map if it’s a regular file, or the bytes
+    read from its current position otherwise.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        f: IO[Any] = open(source, "rb")
+        to_close: Union[IO[Any], None] = f
+    else:
+        f = source
+        to_close = None
+
+    try:
+        fileno: Union[int, None] = f.fileno()
+    except (AttributeError, io.UnsupportedOperation):
+        # e.g. io.BytesIO
+        fileno = None
+
+    try:
+        if fileno is None or not stat.S_ISREG(os.fstat(fileno).st_mode):
+            # Pipes and in-memory files can’t be mapped
+            content = f.read()
+            return to_close, content.encode() if isinstance(content, str) else content
+        if os.fstat(fileno).st_size == 0:
+            # Empty files can’t be mapped either
+            return to_close, b""
+        buffer = mmap.mmap(fileno, 0, access=mmap.ACCESS_READ)
+    except BaseException:
+        if to_close is not None:
+            to_close.close()
+        raise
+    if hasattr(buffer, "madvise") and hasattr(mmap, "MADV_SEQUENTIAL"):
+        buffer.madvise(mmap.MADV_SEQUENTIAL)
+    return to_close, buffer
+
+
+def _bounds(buffer: Union[mmap.mmap, bytes], start: int, end: Union[int, None]) -> tuple[int, int]:
+    """
+    Return the offsets of the first line that starts at or after ``start`` and of the end of the last line that starts
+    before ``end``.
+    """
+    size = len(buffer)
+    if start <= 0:
+        begin = 0
+    elif start >= size:
+        begin = size
+    elif buffer[start - 1] == 0x0A:
+        begin = start
+    else:
+        i = buffer.find(b"\n", start)
+        begin = size if i < 0 else i + 1
+
+    if end is None or end >= size:
+        return begin, size
+    if end <= begin:
+        return begin, begin
+    i = buffer.find(b"\n", end - 1)
+    return begin, size if i < 0 else i + 1
+
+
+def _blocks(buffer: Union[mmap.mmap, bytes], begin: int, stop: int) -> Iterator[tuple[int, int]]:
+    """
+    Split ``buffer[begin:stop]`` into blocks of whole lines of about ``BLOCK_SIZE`` bytes.
+    """
+    pos = begin
+    while pos < stop:
+        block_end = pos + BLOCK_SIZE
+        if block_end >= stop:
+            block_end = stop
+        else:
+            i = buffer.rfind(b"\n", pos, block_end)
+            if i < 0:
+                # A line longer than a block
+                i = buffer.find(b"\n", block_end, stop)
+            block_end = stop if i < 0 else i + 1
+        yield pos, block_end
+        pos = block_end
+
+
+def _line_seq(buffer: Union[mmap.mmap, bytes], begin: int, stop: int, encoding: Union[str, None],
+              errors: str) -> Iterator[Any]:
+    for block_start, block_end in _blocks(buffer, begin, stop):
+        block = buffer[block_start:block_end]
+        lines: list[Any]
+        if encoding is None:
+            lines = block.split(b"\n")
+            cr: Any = b"\r"
+        else:
+            lines = block.decode(encoding, errors).split("\n")
+            cr = "\r"
+        if block.endswith(b"\n"):
+            lines.pop()
+        if b"\r" in block:
+            lines = [line[:-1] if line.endswith(cr) else line for line in lines]
+        yield from lines
+
+
+def _line_views(buffer: Union[mmap.mmap, bytes], begin: int, stop: int) -> Iterator[memoryview]:
+    # The newlines are found in the mapped file itself, so that no line is copied
+    view = memoryview(buffer)
+    find = buffer.find
+    try:
+        pos = begin
+        while pos < stop:
+            i = find(b"\n", pos, stop)
+            line_end = stop if i < 0 else i
+            if line_end > pos and buffer[line_end - 1] == 0x0D:
+                yield view[pos:line_end - 1]
+            else:
+                yield view[pos:line_end]
+            pos = line_end + 1
+    finally:
+        view.release()
+
+
+@overload
+def line_seq(source: Source, encoding: None = None, errors: str = "strict", views: Literal[False] = False,
+             start: int = 0, end: Union[int, None] = None) -> Iterator[bytes]:
+    ...
+
+
+@overload
+def line_seq(source: Source, encoding: str, errors: str = "strict", views: Literal[False] = False,
+             start: int = 0, end: Union[int, None] = None) -> Iterator[str]:
+    ...
+
+
+@overload
+def line_seq(source: Source, encoding: None = None, errors: str = "strict", *, views: Literal[True],
+             start: int = 0, end: Union[int, None] = None) -> Iterator[memoryview]:
+    ...
+
+
+def line_seq(source: Source, encoding: Union[str, None] = None, errors: str = "strict", views: bool = False,
+             start: int = 0, end: Union[int, None] = None) -> Iterator[Union[bytes, str, memoryview]]:
+    """
+    Return a lazy sequence of the lines of ``source``, a path or a file object, without their line terminator (``\\n``
+    or ``\\r\\n``). Lines are ``bytes``, or ``str`` decoded with ``encoding`` and ``errors`` if ``encoding`` is given;
+    it must be ASCII-compatible, such as UTF-8 or Latin-1.
+
+    If ``views`` is ``True``, yield ``memoryview`` slices of the memory-mapped file instead, which don’t copy the
+    lines; the file stays mapped as long as a view exists.
+
+    Only the lines that start in the byte range ``[start, end)`` are returned, including the last one even if it ends
+    after ``end``. Offsets are from the beginning of the file, whatever the current position of a file object. File
+    objects are not closed. Those that can’t be memory-mapped, such as pipes and ``io.BytesIO``, are read whole from
+    their current position.
+    """
+    if views and encoding is not None:
+        raise ValueError("views can't be decoded")
+    return _line_seq_gen(source, encoding, errors, views, start, end)
+
+
+def _line_seq_gen(source: Source, encoding: Union[str, None], errors: str, views: bool, start: int,
+                  end: Union[int, None]) -> Iterator[Union[bytes, str, memoryview]]:
+    to_close, buffer = _open(source)
+    try:
+        begin, stop = _bounds(buffer, start, end)
+        if views:
+            yield from _line_views(buffer, begin, stop)
+        else:
+            yield from _line_seq(buffer, begin, stop, encoding, errors)
+    finally:
+        if isinstance(buffer, mmap.mmap):
+            try:
+                buffer.close()
+            except BufferError:
+                # Views of the lines are still used; the map is closed when they are garbage-collected
+                pass
+        if to_close is not None:
+            to_close.close()
+
+
+def _groups(m: "re.Match[AnyStr]") -> tuple[Union[AnyStr, Any], ...]:
+    return (m.group(),) + m.groups()
+
+
+def _stream_matches(pattern: "Pattern[AnyStr]", f: IO[Any], max_match: int) -> Iterator["re.Match[AnyStr]"]:
+    """
+    Yield the matches of ``pattern`` in ``f``, read a block at a time. The positions of the matches are relative to the
+    buffer they were found in.
+    """
+    buffer = f.read(BLOCK_SIZE)
+    # Position in buffer where the search resumes, and end of the last match if it was empty
+    pos = 0
+    empty_at = -1
+    while True:
+        block = f.read(BLOCK_SIZE)
+        eof = not block
+        buffer += block
+        # Matches must end before limit, so that they can’t depend on the next blocks
+        limit = len(buffer) + 1 if eof else len(buffer) - max_match
+
+        resume = -1
+        last = None
+        for m in pattern.finditer(buffer, pos):
+            end = m.end()
+            if end >= limit:
+                # Search again from there once the next block is read
+                start = m.start()
+                resume = start if start < limit else max(limit, pos)
+                break
+            if end == empty_at and m.start() == end:
+                # The search resumed after an empty match, which is found again
+                continue
+            yield m
+            last = m
+
+        if eof:
+            return
+        if last is not None:
+            pos = last.end()
+            empty_at = pos if last.start() == pos else -1
+        if resume < 0:
+            resume = max(limit, pos)
+
+        # Keep some context before the resume position for lookbehinds, \b, etc.
+        keep = max(resume - max_match, 0)
+        buffer = buffer[keep:]
+        pos = resume - keep
+        if empty_at >= 0:
+            empty_at -= keep
+
+
+def re_seq(pattern: Union[str, bytes, "Pattern[Any]"], source: Any, max_match: int = 4096) -> Iterator[Any]:
+    """
+    Returns a lazy sequence of successive matches of ``pattern`` in ``source``: the matched strings, or tuples of the
+    matched string followed by its groups if the pattern has groups, like Clojure.
+
+    ``source`` is a ``str`` or a bytes-like object such as an ``mmap.mmap``, which are searched in place, or a file
+    object, which is read a block at a time. ``pattern`` must be of the same type as the data, ``str`` or ``bytes``.
+    Matches may span several blocks, as long as they are at most ``max_match`` characters long, lookarounds included.
+    The file object is not closed.
+    """
+    if max_match <= 0:
+        raise ValueError("max_match must be positive")
+    compiled: Pattern[Any] = re.compile(pattern) if isinstance(pattern, (str, bytes)) else pattern
+    if isinstance(source, (str, bytes, bytearray, memoryview, mmap.mmap)) or not hasattr(source, "read"):
+        # mmap.mmap has a read method, but searching it directly doesn’t copy it nor move its position
+        matches = compiled.finditer(source)
+    else:
+        matches = _stream_matches(compiled, source, max_match)
+    return map(_groups if compiled.groups else re.Match.group, matches)
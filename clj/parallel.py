@@ -0,0 +1,234 @@
+# -*- coding: UTF-8 -*-
+import collections
+import collections.abc as collections_abc
+import concurrent.futures
+import functools
+import itertools
+import os
+import queue
+import threading
+import weakref
+from typing import Any, Callable, Deque, Iterable, Iterator, TypeVar, Union, cast
+
+from clj.seqs import _nil, _Nil
+
+T = TypeVar('T')
+R = TypeVar('R')
+
+
+def _default_workers() -> int:
+    return os.cpu_count() or 1
+
+
+def pmap(f: Callable[..., T], *colls: Iterable[Any],
+         workers: Union[int, None] = None,
+         lookahead: Union[int, None] = None,
+         ordered: bool = True,
+         processes: bool = False,
+         executor: Union[concurrent.futures.Executor, None] = None) -> Iterator[T]:
+    """
+    Like ``map``, except ``f`` is applied in parallel. Returns a generator; at most ``lookahead`` calls to ``f`` are in
+    flight at any time (default: ``workers + 2``, like Clojure), so ``pmap`` works on infinite inputs.
+
+    ``f`` runs on a pool of ``workers`` threads (default: the number of CPUs), or processes if ``processes`` is
+    ``True``. In the latter case ``f`` and the items must be picklable. An existing ``executor`` can be given instead;
+    it is not shut down by ``pmap``.
+
+    Results are yielded in the order of the input. If ``ordered`` is ``False``, they are yielded as soon as they are
+    available instead. Exceptions raised by ``f`` are re-raised when the corresponding result is reached.
+
+    Only useful for computationally intensive functions or blocking I/O, where the time of ``f`` dominates the
+    coordination overhead.
+    """
+    if workers is None:
+        workers = _default_workers()
+    if lookahead is None:
+        lookahead = workers + 2
+    lookahead = max(lookahead, 1)
+
+    own_executor = executor is None
+    if executor is None:
+        if processes:
+            executor = concurrent.futures.ProcessPoolExecutor(workers)
+        else:
+            executor = concurrent.futures.ThreadPoolExecutor(workers)
+
+    args = iter(zip(*colls))
+    pending: Deque["concurrent.futures.Future[T]"] = collections.deque()
+    in_flight: set["concurrent.futures.Future[T]"] = set()
+
+    try:
+        for a in args:
+            pending.append(executor.submit(f, *a))
+            if len(pending) >= lookahead:
+                break
+
+        if ordered:
+            while pending:
+                result = pending.popleft().result()
+                for a in args:
+                    pending.append(executor.submit(f, *a))
+                    break
+                yield result
+        else:
+            in_flight.update(pending)
+            pending.clear()
+            while in_flight:
+                done, in_flight = concurrent.futures.wait(in_flight, return_when=concurrent.futures.FIRST_COMPLETED)
+                for a in args:
+                    in_flight.add(executor.submit(f, *a))
+                    if len(in_flight) >= lookahead:
+                        break
+                for future in done:
+                    yield future.result()
+    finally:
+        # Reached on exhaustion, on error and when the consumer stops early (GeneratorExit)
+        for future in (*pending, *in_flight):
+            future.cancel()
+        if own_executor:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _combine_tree(combinef: Callable[[R, R], R], results: Iterable[R]) -> Union[R, _Nil]:
+    """
+    Combine ``results`` as a balanced binary tree, in order, keeping ``O(log(n))`` partial results in memory.
+    """
+    # Partial results, with the number of results each one combines; the counts are decreasing powers of two
+    stack: list[tuple[int, R]] = []
+    for r in results:
+        size = 1
+        while stack and stack[-1][0] == size:
+            r = combinef(stack.pop()[1], r)
+            size *= 2
+        stack.append((size, r))
+
+    if not stack:
+        return _nil
+    result = stack.pop()[1]
+    while stack:
+        result = combinef(stack.pop()[1], result)
+    return result
+
+
+def _fold_chunks(combinef: Callable[..., R], reducef: Callable[[R, Any], R], init: Union[R, _Nil],
+                 chunks: list[Iterable[Any]]) -> R:
+    """
+    Reduce each chunk and combine the results. This runs in the workers of ``fold``.
+    """
+    def reduce_chunk(chunk: Iterable[Any]) -> R:
+        return functools.reduce(reducef, chunk, combinef() if isinstance(init, _Nil) else init)
+
+    return cast(R, _combine_tree(combinef, map(reduce_chunk, chunks)))
+
+
+def fold(combinef: Callable[..., R], reducef: Callable[[R, T], R], coll: Iterable[T], n: int = 512,
+         init: Union[R, _Nil] = _nil,
+         workers: Union[int, None] = None,
+         processes: bool = True,
+         executor: Union[concurrent.futures.Executor, None] = None) -> R:
+    """
+    Like Clojure’s ``clojure.core.reducers/fold``: reduce ``coll`` in parallel. ``coll`` is split into chunks of
+    about ``n`` items, each chunk is reduced with ``reducef``, starting from ``combinef()`` (or ``init`` if given), and
+    the results are combined with ``combinef(a, b)``. ``combinef`` must be associative, and ``combinef()``/``init`` must
+    be its identity; the results are combined in order, so it doesn’t need to be commutative:
+
+        fold(operator.add, operator.add, numbers, init=0)
+        fold(merge_counters, count_word, words)  # merge_counters() returns an empty Counter
+
+    Sequences are sliced; other iterables are consumed in chunks, with a bounded number of chunks in flight. The chunks
+    are reduced on a pool of ``workers`` processes (default: the number of CPUs), so ``combinef``, ``reducef``,
+    ``init`` and the items must be picklable, or threads if ``processes`` is ``False``. An existing ``executor`` can be
+    given instead; it is not shut down by ``fold``. Collections of at most ``n`` items are reduced serially, as well as
+    all collections if there is a single worker.
+    """
+    if workers is None:
+        workers = _default_workers()
+    n = max(n, 1)
+    fold_chunks: Callable[[list[Iterable[Any]]], R] = functools.partial(_fold_chunks, combinef, reducef, init)
+
+    if isinstance(coll, collections_abc.Sequence):
+        size = len(coll)
+        if size <= n:
+            return fold_chunks([coll])
+        chunks: Iterator[Iterable[Any]] = (coll[i:i + n] for i in range(0, size, n))
+        # A few tasks per worker, so that they are balanced if some chunks take longer than others
+        per_task = max(1, -(-size // (n * workers * 4)))
+    else:
+        it = iter(coll)
+        first_chunk = list(itertools.islice(it, n))
+        if len(first_chunk) < n:
+            return fold_chunks([first_chunk])
+        chunks = itertools.chain([first_chunk], iter(lambda: list(itertools.islice(it, n)), []))
+        per_task = 8
+
+    tasks = iter(lambda: list(itertools.islice(chunks, per_task)), [])
+    if executor is None and workers <= 1:
+        results: Iterator[R] = map(fold_chunks, tasks)
+    else:
+        results = pmap(fold_chunks, tasks, workers=workers, processes=processes, executor=executor)
+    return cast(R, _combine_tree(combinef, results))
+
+
+class _SequeError(object):
+    __slots__ = ("exception",)
+
+    def __init__(self, exception: BaseException):
+        self.exception = exception
+
+
+_seque_end = object()
+
+
+def seque(coll: Iterable[T], n: int = 100) -> Iterator[T]:
+    """
+    Returns a generator of the items of ``coll``, which are realized ahead of the consumer on a background thread: up
+    to ``n`` items are buffered in a queue. This lets a slow producer and a slow consumer work at the same time.
+
+    An exception raised while iterating over ``coll`` is re-raised in the consumer once the items before it have been
+    consumed. If the consumer stops early, the background thread stops after the item it is currently realizing.
+    """
+    q: "queue.Queue[Any]" = queue.Queue(max(n, 1))
+    stop = threading.Event()
+
+    def _produce() -> None:
+        try:
+            for e in coll:
+                if stop.is_set():
+                    return
+                q.put(e)
+            item: Any = _seque_end
+        except BaseException as exc:
+            item = _SequeError(exc)
+
+        if not stop.is_set():
+            q.put(item)
+
+    def _stop() -> None:
+        stop.set()
+        # Unblock the producer if it is waiting on a full queue; it'll then see the stop flag
+        while True:
+            try:
+                q.get_nowait()
+            except queue.Empty:
+                break
+
+    def _consume() -> Iterator[T]:
+        try:
+            while True:
+                item = q.get()
+                if item is _seque_end:
+                    return
+                if isinstance(item, _SequeError):
+                    raise item.exception
+                yield item
+        finally:
+            _stop()
+
+    # Start the producer now rather than on the first next() call, so that the buffer fills up in the meantime
+    thread = threading.Thread(target=_produce, name="clj-seque", daemon=True)
+    thread.start()
+
+    consumer = _consume()
+    # A generator that is never started doesn't run its finally clause when it's garbage-collected
+    weakref.finalize(consumer, _stop)
+    return consumer
@@ -0,0 +1,889 @@
+# -*- coding: UTF-8 -*-
+"""
+Persistent (immutable) collections with structural sharing, like Clojure’s: ``PersistentVector``,
+``PersistentHashMap`` and ``PersistentHashSet``.
+
+"Modifying" a persistent collection returns a new one that shares most of its structure with the original, so keeping
+old versions around is cheap. Vectors are 32-way tries of their items with a separate tail; maps and sets are hash
+array mapped tries (HAMT) of their keys. Updates copy the path from the root to the updated item, which has at most
+``log32(n)`` nodes.
+
+To build or update a collection in a batch, use its transient version: ``transient()`` returns a mutable copy that
+updates the nodes it created in place, and ``persistent()`` turns it back into a persistent collection in constant
+time. Nodes are owned by the transient that created them through an ``edit`` token, which is ``None`` for the nodes
+created by persistent operations.
+"""
+import collections.abc as collections_abc
+import itertools
+from typing import Any, Callable, Iterable, Iterator, TypeVar, Union, overload
+
+T = TypeVar('T')
+K = TypeVar('K')
+V = TypeVar('V')
+
+_BITS = 5
+_WIDTH = 1 << _BITS
+_MASK = _WIDTH - 1
+_MASK64 = (1 << 64) - 1
+
+if hasattr(int, "bit_count"):
+    _bit_count: Callable[[int], int] = int.bit_count
+else:  # pragma: no cover
+    # Python < 3.10
+    def _bit_count(x: int) -> int:
+        return bin(x).count("1")
+
+
+def _check_edit(edit: Union[object, None]) -> None:
+    if edit is _DEAD:
+        raise RuntimeError("transient used after persistent() call")
+
+
+# The edit token of transients that have been made persistent
+_DEAD = object()
+
+
+# Vectors
+
+
+class _VNode(object):
+    """
+    A node of a vector: a list of at most 32 child nodes, or items for the leaves.
+    """
+    __slots__ = ("edit", "array")
+
+    def __init__(self, edit: Union[object, None], array: list[Any]):
+        self.edit = edit
+        self.array = array
+
+
+_EMPTY_VNODE = _VNode(None, [])
+
+
+class _VectorBuilder(object):
+    """
+    The state of a vector being updated. Nodes owned by ``edit`` are updated in place, other nodes are copied.
+    """
+    __slots__ = ("cnt", "shift", "root", "tail", "edit")
+
+    def __init__(self, v: "PersistentVector[Any]", edit: Union[object, None]):
+        self.cnt = v._cnt
+        self.shift = v._shift
+        self.root = v._root
+        # The tail is always owned by the builder
+        self.tail = list(v._tail)
+        self.edit = edit
+
+    def _editable(self, node: _VNode) -> _VNode:
+        edit = self.edit
+        if edit is not None and node.edit is edit:
+            return node
+        return _VNode(edit, list(node.array))
+
+    def tailoff(self) -> int:
+        cnt = self.cnt
+        return 0 if cnt < _WIDTH else ((cnt - 1) >> _BITS) << _BITS
+
+    def array_for(self, i: int) -> list[Any]:
+        if not 0 <= i < self.cnt:
+            raise IndexError("vector index out of range")
+        if i >= self.tailoff():
+            return self.tail
+        node = self.root
+        for level in range(self.shift, 0, -_BITS):
+            node = node.array[(i >> level) & _MASK]
+        array: list[Any] = node.array
+        return array
+
+    def conj(self, x: Any) -> None:
+        if len(self.tail) < _WIDTH:
+            self.tail.append(x)
+            self.cnt += 1
+            return
+
+        # The tail is full: push it in the tree
+        tail_node = _VNode(self.edit, self.tail)
+        self.tail = [x]
+        if (self.cnt >> _BITS) > (1 << self.shift):
+            # The root is full
+            self.root = _VNode(self.edit, [self.root, self._new_path(self.shift, tail_node)])
+            self.shift += _BITS
+        else:
+            self.root = self._push_tail(self.shift, self.root, tail_node)
+        self.cnt += 1
+
+    def _new_path(self, level: int, node: _VNode) -> _VNode:
+        while level:
+            node = _VNode(self.edit, [node])
+            level -= _BITS
+        return node
+
+    def _push_tail(self, level: int, parent: _VNode, tail_node: _VNode) -> _VNode:
+        parent = self._editable(parent)
+        array = parent.array
+        sub = ((self.cnt - 1) >> level) & _MASK
+        if level == _BITS:
+            node = tail_node
+        elif sub < len(array):
+            node = self._push_tail(level - _BITS, array[sub], tail_node)
+        else:
+            node = self._new_path(level - _BITS, tail_node)
+
+        if sub < len(array):
+            array[sub] = node
+        else:
+            array.append(node)
+        return parent
+
+    def assoc(self, i: int, x: Any) -> None:
+        if i == self.cnt:
+            self.conj(x)
+            return
+        if not 0 <= i < self.cnt:
+            raise IndexError("vector index out of range")
+        if i >= self.tailoff():
+            self.tail[i & _MASK] = x
+            return
+
+        self.root = node = self._editable(self.root)
+        for level in range(self.shift, 0, -_BITS):
+            array = node.array
+            sub = (i >> level) & _MASK
+            node = array[sub] = self._editable(array[sub])
+        node.array[i & _MASK] = x
+
+    def pop(self) -> None:
+        if not self.cnt:
+            raise IndexError("pop from empty vector")
+        if self.cnt == 1 or len(self.tail) > 1:
+            self.tail.pop()
+            self.cnt -= 1
+            return
+
+        # The tail becomes empty: the last leaf of the tree becomes the tail
+        self.tail = list(self.array_for(self.cnt - 2))
+        root = self._pop_tail(self.shift, self.root)
+        if root is None:
+            root = _EMPTY_VNODE
+        if self.shift > _BITS and len(root.array) == 1:
+            root = root.array[0]
+            self.shift -= _BITS
+        self.root = root
+        self.cnt -= 1
+
+    def _pop_tail(self, level: int, node: _VNode) -> Union[_VNode, None]:
+        sub = ((self.cnt - 2) >> level) & _MASK
+        if level > _BITS:
+            child = self._pop_tail(level - _BITS, node.array[sub])
+            if child is None and sub == 0:
+                return None
+            node = self._editable(node)
+            if child is None:
+                del node.array[sub:]
+            else:
+                node.array[sub] = child
+            return node
+        if sub == 0:
+            return None
+        node = self._editable(node)
+        del node.array[sub:]
+        return node
+
+    def build(self) -> "PersistentVector[Any]":
+        return PersistentVector._make(self.cnt, self.shift, self.root, self.tail)
+
+
+class PersistentVector(collections_abc.Sequence[T]):
+    """
+    An immutable vector. Indexing, ``conj``, ``assoc`` and ``pop`` take ``O(log32(n))`` time, which is practically
+    constant; each version shares its structure with the vector it was derived from.
+    """
+    __slots__ = ("_cnt", "_shift", "_root", "_tail", "_hash")
+
+    _cnt: int
+    _shift: int
+    _root: _VNode
+    _tail: list[T]
+    _hash: Union[int, None]
+
+    def __init__(self, items: Iterable[T] = ()):
+        items = list(items)
+        cnt = len(items)
+        tailoff = 0 if cnt < _WIDTH else ((cnt - 1) >> _BITS) << _BITS
+        nodes = [_VNode(None, items[i:i + _WIDTH]) for i in range(0, tailoff, _WIDTH)]
+        shift = _BITS
+        while len(nodes) > _WIDTH:
+            nodes = [_VNode(None, nodes[i:i + _WIDTH]) for i in range(0, len(nodes), _WIDTH)]
+            shift += _BITS
+        self._set(cnt, shift, _VNode(None, nodes) if nodes else _EMPTY_VNODE, items[tailoff:])
+
+    def _set(self, cnt: int, shift: int, root: _VNode, tail: list[T]) -> None:
+        self._cnt = cnt
+        self._shift = shift
+        self._root = root
+        self._tail = tail
+        self._hash = None
+
+    @classmethod
+    def _make(cls, cnt: int, shift: int, root: _VNode, tail: list[Any]) -> "PersistentVector[Any]":
+        v: PersistentVector[Any] = cls.__new__(cls)
+        v._set(cnt, shift, root, tail)
+        return v
+
+    def _builder(self) -> _VectorBuilder:
+        return _VectorBuilder(self, None)
+
+    def conj(self, x: T) -> "PersistentVector[T]":
+        """
+        Return a new vector with ``x`` added at the end.
+        """
+        b = self._builder()
+        b.conj(x)
+        return b.build()
+
+    def assoc(self, i: int, x: T) -> "PersistentVector[T]":
+        """
+        Return a new vector with ``x`` at index ``i``. ``i`` may be the length of the vector, to add ``x`` at the end.
+        """
+        b = self._builder()
+        b.assoc(i, x)
+        return b.build()
+
+    def pop(self) -> "PersistentVector[T]":
+        """
+        Return a new vector without the last item.
+        """
+        b = self._builder()
+        b.pop()
+        return b.build()
+
+    def transient(self) -> "TransientVector[T]":
+        """
+        Return a mutable copy of the vector, in constant time.
+        """
+        return TransientVector(self)
+
+    def __len__(self) -> int:
+        return self._cnt
+
+    @overload
+    def __getitem__(self, index: int) -> T:
+        ...
+
+    @overload
+    def __getitem__(self, index: slice) -> "PersistentVector[T]":
+        ...
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[T, "PersistentVector[T]"]:
+        if isinstance(index, slice):
+            return PersistentVector(list(self)[index])
+        if index < 0:
+            index += self._cnt
+        item: T = self._builder_for_read().array_for(index)[index & _MASK]
+        return item
+
+    def _builder_for_read(self) -> _VectorBuilder:
+        # Reads don't modify the tail, so it doesn't need to be copied
+        b: _VectorBuilder = _VectorBuilder.__new__(_VectorBuilder)
+        b.cnt, b.shift, b.root, b.tail, b.edit = self._cnt, self._shift, self._root, self._tail, None
+        return b
+
+    def _leaves(self) -> Iterator[list[T]]:
+        b = self._builder_for_read()
+        for i in range(0, b.tailoff(), _WIDTH):
+            yield b.array_for(i)
+        yield self._tail
+
+    def __iter__(self) -> Iterator[T]:
+        return itertools.chain.from_iterable(self._leaves())
+
+    def __reversed__(self) -> Iterator[T]:
+        leaves = list(self._leaves())
+        return itertools.chain.from_iterable(map(reversed, reversed(leaves)))
+
+    def __eq__(self, other: object) -> bool:
+        if self is other:
+            return True
+        if not isinstance(other, PersistentVector) or len(self) != len(other):
+            return False
+        return all(itertools.starmap(_eq, zip(self, other)))
+
+    def __hash__(self) -> int:
+        if self._hash is None:
+            self._hash = hash(tuple(self))
+        return self._hash
+
+    def __clj_empty__(self) -> "PersistentVector[T]":
+        return EMPTY_VECTOR
+
+    def __repr__(self) -> str:
+        return "vector(%s)" % ", ".join(map(repr, self))
+
+
+def _eq(a: Any, b: Any) -> bool:
+    return a is b or bool(a == b)
+
+
+EMPTY_VECTOR: PersistentVector[Any] = PersistentVector()
+
+
+class TransientVector(collections_abc.Sequence[T]):
+    """
+    A mutable vector that shares its structure with the persistent vector it was created from. ``conj``, ``assoc`` and
+    ``pop`` modify it in place and return it; ``persistent()`` returns a persistent vector with the same items, after
+    which the transient can’t be used anymore.
+    """
+
+    def __init__(self, v: PersistentVector[T] = EMPTY_VECTOR):
+        self._b = _VectorBuilder(v, object())
+
+    def conj(self, x: T) -> "TransientVector[T]":
+        _check_edit(self._b.edit)
+        self._b.conj(x)
+        return self
+
+    def assoc(self, i: int, x: T) -> "TransientVector[T]":
+        _check_edit(self._b.edit)
+        self._b.assoc(i, x)
+        return self
+
+    def pop(self) -> "TransientVector[T]":
+        _check_edit(self._b.edit)
+        self._b.pop()
+        return self
+
+    def extend(self, items: Iterable[T]) -> "TransientVector[T]":
+        """
+        ``conj`` all the items of an iterable.
+        """
+        _check_edit(self._b.edit)
+        conj = self._b.conj
+        for x in items:
+            conj(x)
+        return self
+
+    def persistent(self) -> PersistentVector[T]:
+        _check_edit(self._b.edit)
+        self._b.edit = _DEAD
+        return self._b.build()
+
+    def __len__(self) -> int:
+        return self._b.cnt
+
+    def __getitem__(self, index: Any) -> Any:
+        _check_edit(self._b.edit)
+        if isinstance(index, slice):
+            return list(self)[index]
+        if index < 0:
+            index += self._b.cnt
+        return self._b.array_for(index)[index & _MASK]
+
+    def __iter__(self) -> Iterator[T]:
+        b = self._b
+        for i in range(0, b.tailoff(), _WIDTH):
+            yield from b.array_for(i)
+        yield from b.tail
+
+
+def vector(*items: T) -> PersistentVector[T]:
+    """
+    Returns a new ``PersistentVector`` containing the arguments.
+    """
+    return PersistentVector(items)
+
+
+def vec(coll: Iterable[T]) -> PersistentVector[T]:
+    """
+    Returns a new ``PersistentVector`` containing the items of ``coll``.
+    """
+    if isinstance(coll, PersistentVector):
+        return coll
+    return PersistentVector(coll)
+
+
+# Hash maps
+
+
+def _hash(key: Any) -> int:
+    return hash(key) & _MASK64
+
+
+# Marks the slots of a _BitmapNode that hold a child node instead of a key
+_NODE = object()
+
+
+class _BitmapNode(object):
+    """
+    A node of a hash map. ``array`` holds a pair of slots for each bit set in ``bitmap``: a key and its value, or
+    ``_NODE`` and a child node.
+    """
+    __slots__ = ("edit", "bitmap", "array")
+
+    def __init__(self, edit: Union[object, None], bitmap: int, array: list[Any]):
+        self.edit = edit
+        self.bitmap = bitmap
+        self.array = array
+
+    def _editable(self, edit: Union[object, None]) -> "_BitmapNode":
+        if edit is not None and self.edit is edit:
+            return self
+        return _BitmapNode(edit, self.bitmap, list(self.array))
+
+    def find(self, shift: int, h: int, key: Any, default: Any) -> Any:
+        bit = 1 << ((h >> shift) & _MASK)
+        if not self.bitmap & bit:
+            return default
+        i = 2 * _bit_count(self.bitmap & (bit - 1))
+        k = self.array[i]
+        if k is _NODE:
+            return self.array[i + 1].find(shift + _BITS, h, key, default)
+        if k is key or k == key:
+            return self.array[i + 1]
+        return default
+
+    def assoc(self, edit: Union[object, None], shift: int, h: int, key: Any, value: Any, box: list[bool]) -> Any:
+        bit = 1 << ((h >> shift) & _MASK)
+        i = 2 * _bit_count(self.bitmap & (bit - 1))
+        if not self.bitmap & bit:
+            box[0] = True
+            node = self._editable(edit)
+            node.array[i:i] = (key, value)
+            node.bitmap |= bit
+            return node
+
+        array = self.array
+        k = array[i]
+        v = array[i + 1]
+        if k is _NODE:
+            child = v.assoc(edit, shift + _BITS, h, key, value, box)
+            if child is v:
+                return self
+            node = self._editable(edit)
+            node.array[i + 1] = child
+            return node
+
+        if k is key or k == key:
+            if v is value:
+                return self
+            node = self._editable(edit)
+            node.array[i + 1] = value
+            return node
+
+        box[0] = True
+        node = self._editable(edit)
+        node.array[i] = _NODE
+        node.array[i + 1] = _create_node(edit, shift + _BITS, k, v, h, key, value)
+        return node
+
+    def without(self, edit: Union[object, None], shift: int, h: int, key: Any, box: list[bool]) -> Any:
+        bit = 1 << ((h >> shift) & _MASK)
+        if not self.bitmap & bit:
+            return self
+        i = 2 * _bit_count(self.bitmap & (bit - 1))
+        k = self.array[i]
+        if k is _NODE:
+            v = self.array[i + 1]
+            child = v.without(edit, shift + _BITS, h, key, box)
+            if child is v:
+                return self
+            if child is not None:
+                node = self._editable(edit)
+                node.array[i + 1] = child
+                return node
+        elif not (k is key or k == key):
+            return self
+        else:
+            box[0] = True
+
+        if self.bitmap == bit:
+            return None
+        node = self._editable(edit)
+        del node.array[i:i + 2]
+        node.bitmap ^= bit
+        return node
+
+    def items(self) -> Iterator[tuple[Any, Any]]:
+        array = self.array
+        for i in range(0, len(array), 2):
+            k = array[i]
+            if k is _NODE:
+                yield from array[i + 1].items()
+            else:
+                yield k, array[i + 1]
+
+
+class _CollisionNode(object):
+    """
+    A node of keys that have the same hash.
+    """
+    __slots__ = ("edit", "hash", "array")
+
+    def __init__(self, edit: Union[object, None], h: int, array: list[Any]):
+        self.edit = edit
+        self.hash = h
+        self.array = array
+
+    def _index(self, key: Any) -> int:
+        array = self.array
+        for i in range(0, len(array), 2):
+            k = array[i]
+            if k is key or k == key:
+                return i
+        return -1
+
+    def _editable(self, edit: Union[object, None]) -> "_CollisionNode":
+        if edit is not None and self.edit is edit:
+            return self
+        return _CollisionNode(edit, self.hash, list(self.array))
+
+    def find(self, shift: int, h: int, key: Any, default: Any) -> Any:
+        i = self._index(key)
+        return default if i < 0 else self.array[i + 1]
+
+    def assoc(self, edit: Union[object, None], shift: int, h: int, key: Any, value: Any, box: list[bool]) -> Any:
+        if h != self.hash:
+            # Nest this node in a bitmap node to add the new key
+            parent = _BitmapNode(edit, 1 << ((self.hash >> shift) & _MASK), [_NODE, self])
+            return parent.assoc(edit, shift, h, key, value, box)
+
+        i = self._index(key)
+        if i >= 0 and self.array[i + 1] is value:
+            return self
+        node = self._editable(edit)
+        if i >= 0:
+            node.array[i + 1] = value
+        else:
+            box[0] = True
+            node.array.extend((key, value))
+        return node
+
+    def without(self, edit: Union[object, None], shift: int, h: int, key: Any, box: list[bool]) -> Any:
+        i = self._index(key)
+        if i < 0:
+            return self
+        box[0] = True
+        if len(self.array) == 2:
+            return None
+        node = self._editable(edit)
+        del node.array[i:i + 2]
+        return node
+
+    def items(self) -> Iterator[tuple[Any, Any]]:
+        array = self.array
+        return zip(array[::2], array[1::2])
+
+
+def _create_node(edit: Union[object, None], shift: int, k1: Any, v1: Any, h2: int, k2: Any, v2: Any) -> Any:
+    h1 = _hash(k1)
+    if h1 == h2:
+        return _CollisionNode(edit, h1, [k1, v1, k2, v2])
+    box = [False]
+    node = _BitmapNode(edit, 0, []).assoc(edit, shift, h1, k1, v1, box)
+    return node.assoc(edit, shift, h2, k2, v2, box)
+
+
+_EMPTY_MAP_NODE = _BitmapNode(None, 0, [])
+
+_missing = object()
+
+
+class _MapBuilder(object):
+    """
+    The state of a hash map being updated. Nodes owned by ``edit`` are updated in place, other nodes are copied.
+    """
+    __slots__ = ("cnt", "root", "edit", "box")
+
+    def __init__(self, m: "PersistentHashMap[Any, Any]", edit: Union[object, None]):
+        self.cnt = m._cnt
+        self.root = m._root
+        self.edit = edit
+        self.box = [False]
+
+    def assoc(self, key: Any, value: Any) -> None:
+        box = self.box
+        box[0] = False
+        self.root = self.root.assoc(self.edit, 0, _hash(key), key, value, box)
+        if box[0]:
+            self.cnt += 1
+
+    def dissoc(self, key: Any) -> None:
+        box = self.box
+        box[0] = False
+        root = self.root.without(self.edit, 0, _hash(key), key, box)
+        self.root = _EMPTY_MAP_NODE if root is None else root
+        if box[0]:
+            self.cnt -= 1
+
+    def build(self) -> "PersistentHashMap[Any, Any]":
+        return PersistentHashMap._make(self.cnt, self.root)
+
+
+class PersistentHashMap(collections_abc.Mapping[K, V]):
+    """
+    An immutable hash map. Lookups, ``assoc`` and ``dissoc`` take ``O(log32(n))`` time, which is practically
+    constant; each version shares its structure with the map it was derived from. Keys are iterated over in an
+    arbitrary order.
+    """
+    __slots__ = ("_cnt", "_root", "_hash")
+
+    _cnt: int
+    _root: Any
+    _hash: Union[int, None]
+
+    def __init__(self, items: Union[Iterable[tuple[K, V]], "collections_abc.Mapping[K, V]"] = ()):
+        self._cnt = 0
+        self._root = _EMPTY_MAP_NODE
+        self._hash = None
+        if isinstance(items, collections_abc.Mapping):
+            items = items.items()
+        b = _MapBuilder(self, object())
+        for k, v in items:
+            b.assoc(k, v)
+        self._cnt = b.cnt
+        self._root = b.root
+
+    @classmethod
+    def _make(cls, cnt: int, root: Any) -> "PersistentHashMap[Any, Any]":
+        m: PersistentHashMap[Any, Any] = cls.__new__(cls)
+        m._cnt = cnt
+        m._root = root
+        m._hash = None
+        return m
+
+    def assoc(self, key: K, value: V) -> "PersistentHashMap[K, V]":
+        """
+        Return a new map where ``key`` maps to ``value``.
+        """
+        b = _MapBuilder(self, None)
+        b.assoc(key, value)
+        return self if b.root is self._root else b.build()
+
+    def dissoc(self, key: K) -> "PersistentHashMap[K, V]":
+        """
+        Return a new map without ``key``.
+        """
+        b = _MapBuilder(self, None)
+        b.dissoc(key)
+        return self if b.root is self._root else b.build()
+
+    def transient(self) -> "TransientHashMap[K, V]":
+        """
+        Return a mutable copy of the map, in constant time.
+        """
+        return TransientHashMap(self)
+
+    def __getitem__(self, key: K) -> V:
+        value: V = self._root.find(0, _hash(key), key, _missing)
+        if value is _missing:
+            raise KeyError(key)
+        return value
+
+    def get(self, key: K, default: Any = None) -> Any:
+        return self._root.find(0, _hash(key), key, default)
+
+    def __contains__(self, key: object) -> bool:
+        return self._root.find(0, _hash(key), key, _missing) is not _missing
+
+    def __len__(self) -> int:
+        return self._cnt
+
+    def __iter__(self) -> Iterator[K]:
+        return (k for k, _ in self._root.items())
+
+    def items(self) -> "_ItemsView[K, V]":
+        return _ItemsView(self)
+
+    def __hash__(self) -> int:
+        if self._hash is None:
+            self._hash = hash(frozenset(self._root.items()))
+        return self._hash
+
+    def __clj_empty__(self) -> "PersistentHashMap[K, V]":
+        return EMPTY_MAP
+
+    def __repr__(self) -> str:
+        return "hash_map(%s)" % ", ".join("%r, %r" % kv for kv in self._root.items())
+
+
+class _ItemsView(collections_abc.ItemsView[K, V]):
+    _mapping: PersistentHashMap[K, V]
+
+    def __iter__(self) -> Iterator[tuple[K, V]]:
+        items: Iterator[tuple[K, V]] = self._mapping._root.items()
+        return items
+
+
+EMPTY_MAP: PersistentHashMap[Any, Any] = PersistentHashMap()
+
+
+class TransientHashMap(collections_abc.MutableMapping[K, V]):
+    """
+    A mutable hash map that shares its structure with the persistent map it was created from. ``assoc`` and ``dissoc``
+    modify it in place and return it; ``persistent()`` returns a persistent map with the same items, after which the
+    transient can’t be used anymore.
+    """
+
+    def __init__(self, m: PersistentHashMap[K, V] = EMPTY_MAP):
+        self._b = _MapBuilder(m, object())
+
+    def assoc(self, key: K, value: V) -> "TransientHashMap[K, V]":
+        _check_edit(self._b.edit)
+        self._b.assoc(key, value)
+        return self
+
+    def dissoc(self, key: K) -> "TransientHashMap[K, V]":
+        _check_edit(self._b.edit)
+        self._b.dissoc(key)
+        return self
+
+    def persistent(self) -> PersistentHashMap[K, V]:
+        _check_edit(self._b.edit)
+        self._b.edit = _DEAD
+        return self._b.build()
+
+    def __getitem__(self, key: K) -> V:
+        _check_edit(self._b.edit)
+        value: V = self._b.root.find(0, _hash(key), key, _missing)
+        if value is _missing:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key: K, value: V) -> None:
+        self.assoc(key, value)
+
+    def __delitem__(self, key: K) -> None:
+        if key not in self:
+            raise KeyError(key)
+        self.dissoc(key)
+
+    def __contains__(self, key: object) -> bool:
+        _check_edit(self._b.edit)
+        return self._b.root.find(0, _hash(key), key, _missing) is not _missing
+
+    def __len__(self) -> int:
+        return self._b.cnt
+
+    def __iter__(self) -> Iterator[K]:
+        return (k for k, _ in self._b.root.items())
+
+
+def hash_map(*keyvals: Any) -> PersistentHashMap[Any, Any]:
+    """
+    Returns a new ``PersistentHashMap`` with the supplied mappings: ``hash_map(k1, v1, k2, v2, …)``.
+    """
+    if len(keyvals) % 2:
+        raise ValueError("no value supplied for key: %r" % (keyvals[-1],))
+    it = iter(keyvals)
+    return PersistentHashMap(zip(it, it))
+
+
+# Hash sets
+
+
+class PersistentHashSet(collections_abc.Set[T]):
+    """
+    An immutable hash set, stored as a ``PersistentHashMap`` of its items to themselves. Lookups, ``conj`` and
+    ``disj`` take ``O(log32(n))`` time.
+    """
+    __slots__ = ("_map",)
+
+    _map: PersistentHashMap[T, T]
+
+    def __init__(self, items: Iterable[T] = ()):
+        self._map = PersistentHashMap((x, x) for x in items)
+
+    @classmethod
+    def _make(cls, m: PersistentHashMap[Any, Any]) -> "PersistentHashSet[Any]":
+        s: PersistentHashSet[Any] = cls.__new__(cls)
+        s._map = m
+        return s
+
+    @classmethod
+    def _from_iterable(cls, iterable: Iterable[Any]) -> "PersistentHashSet[Any]":
+        # Used by the set operators, e.g. ``s | t``
+        return cls(iterable)
+
+    def conj(self, x: T) -> "PersistentHashSet[T]":
+        """
+        Return a new set with ``x``.
+        """
+        m = self._map.assoc(x, x)
+        return self if m is self._map else PersistentHashSet._make(m)
+
+    def disj(self, x: T) -> "PersistentHashSet[T]":
+        """
+        Return a new set without ``x``.
+        """
+        m = self._map.dissoc(x)
+        return self if m is self._map else PersistentHashSet._make(m)
+
+    def transient(self) -> "TransientHashSet[T]":
+        """
+        Return a mutable copy of the set, in constant time.
+        """
+        return TransientHashSet(self)
+
+    def __contains__(self, x: object) -> bool:
+        return x in self._map
+
+    def __len__(self) -> int:
+        return len(self._map)
+
+    def __iter__(self) -> Iterator[T]:
+        return iter(self._map)
+
+    def __hash__(self) -> int:
+        return self._hash()
+
+    def __clj_empty__(self) -> "PersistentHashSet[T]":
+        return EMPTY_SET
+
+    def __repr__(self) -> str:
+        return "hash_set(%s)" % ", ".join(map(repr, self))
+
+
+EMPTY_SET: PersistentHashSet[Any] = PersistentHashSet()
+
+
+class TransientHashSet(collections_abc.MutableSet[T]):
+    """
+    A mutable hash set that shares its structure with the persistent set it was created from. ``conj`` and ``disj``
+    modify it in place and return it; ``persistent()`` returns a persistent set with the same items, after which the
+    transient can’t be used anymore.
+    """
+
+    def __init__(self, s: PersistentHashSet[T] = EMPTY_SET):
+        self._map = TransientHashMap(s._map)
+
+    def conj(self, x: T) -> "TransientHashSet[T]":
+        self._map.assoc(x, x)
+        return self
+
+    def disj(self, x: T) -> "TransientHashSet[T]":
+        self._map.dissoc(x)
+        return self
+
+    def add(self, x: T) -> None:
+        self._map.assoc(x, x)
+
+    def discard(self, x: T) -> None:
+        self._map.dissoc(x)
+
+    def persistent(self) -> PersistentHashSet[T]:
+        return PersistentHashSet._make(self._map.persistent())
+
+    def __contains__(self, x: object) -> bool:
+        return x in self._map
+
+    def __len__(self) -> int:
+        return len(self._map)
+
+    def __iter__(self) -> Iterator[T]:
+        return iter(self._map)
+
+
+def hash_set(*keys: T) -> PersistentHashSet[T]:
+    """
+    Returns a new ``PersistentHashSet`` with the supplied keys.
+    """
+    return PersistentHashSet(keys)
@@ -0,0 +1,468 @@
+# -*- coding: UTF-8 -*-
+"""
+Pipelines of sequence functions, fused into a single loop.
+
+``filter(is_even, map(inc, coll))`` builds one iterator per stage, so every element goes through each of them in
+turn. A ``Pipeline`` records the stages instead, and runs consecutive ``map``/``filter``/``remove``/``keep``/
+``take_while``/``take``/``drop``/``distinct``/``dedupe`` stages in one generated loop:
+
+    >>> from clj import count, distinct, inc, is_even, thread_last, Pipeline
+    >>> thread_last(range(10), (map, inc), (filter, is_even), distinct, count)
+    5
+    >>> list(Pipeline(range(10)).map(inc).filter(is_even).take(2))
+    [2, 4]
+
+Terminal operations (``first``, ``some``, ``count``) run inside the fused loop, and ``take`` stops pulling from the
+source as soon as enough items went through, so no element is realized needlessly.
+"""
+import builtins
+import collections.abc as collections_abc
+from typing import Any, Callable, Generic, Iterable, Iterator, NamedTuple, TypeVar, Union
+
+from clj import seqs, vectorized
+from clj.seqs import _nil
+
+T = TypeVar('T')
+
+# Stages that can be fused in a single loop
+_FUSIBLE = frozenset(("map", "filter", "remove", "keep", "take_while", "take", "drop", "distinct", "dedupe"))
+
+
+class _Stage(NamedTuple):
+    kind: str
+    # Function of the stage (map, filter, ...), or the sequence function of an opaque stage
+    fn: Union[Callable[..., Any], None] = None
+    # Argument of take and drop
+    n: int = 0
+    # Leading arguments of an opaque stage, which is called as fn(*args, coll)
+    args: tuple[Any, ...] = ()
+
+    def describe(self) -> str:
+        if self.kind in ("take", "drop"):
+            return "%s(%d)" % (self.kind, self.n)
+        if self.kind in ("distinct", "dedupe"):
+            return self.kind
+        if self.kind == "apply":
+            args = [_name(a) for a in self.args] + ["…"]
+            return "%s(%s)" % (_name(self.fn), ", ".join(args))
+        return "%s(%s)" % (self.kind, _name(self.fn))
+
+
+def _name(x: Any) -> str:
+    return getattr(x, "__qualname__", None) or getattr(x, "__name__", None) or repr(x)
+
+
+def _optimize(stages: tuple[_Stage, ...]) -> list[_Stage]:
+    """
+    Merge consecutive ``take`` and ``drop`` stages.
+    """
+    optimized: list[_Stage] = []
+    for stage in stages:
+        if optimized and stage.kind == optimized[-1].kind:
+            if stage.kind == "take":
+                optimized[-1] = stage._replace(n=min(stage.n, optimized[-1].n))
+                continue
+            if stage.kind == "drop":
+                # A negative drop drops nothing, so it mustn't cancel part of the other one
+                optimized[-1] = stage._replace(n=max(stage.n, 0) + max(optimized[-1].n, 0))
+                continue
+        optimized.append(stage)
+    return optimized
+
+
+def _segments(stages: list[_Stage]) -> list[Union[list[_Stage], _Stage]]:
+    """
+    Group consecutive fusible stages in lists.
+    """
+    segments: list[Union[list[_Stage], _Stage]] = []
+    for stage in stages:
+        if stage.kind not in _FUSIBLE:
+            segments.append(stage)
+        elif segments and isinstance(segments[-1], list):
+            segments[-1].append(stage)
+        else:
+            segments.append([stage])
+    return segments
+
+
+# Compiled loops, by stage kinds and terminal operation
+_compiled: dict[tuple[tuple[str, ...], str], Callable[..., Any]] = {}
+
+
+def _compile(kinds: tuple[str, ...], terminal: str) -> Callable[..., Any]:
+    """
+    Generate the function that runs the stages ``kinds`` in a single loop. ``terminal`` is one of ``"iter"`` (the
+    function is a generator), ``"first"``, ``"some"`` and ``"count"``.
+    """
+    key = (kinds, terminal)
+    if key in _compiled:
+        return _compiled[key]
+
+    init: list[str] = []
+    body: list[str] = []
+    has_take = False
+
+    def reject() -> None:
+        if has_take:
+            body.append("    if _done: break")
+        body.append("    continue")
+
+    for i, kind in enumerate(kinds):
+        f = "_a%d" % i
+        if kind == "map":
+            body.append("x = %s(x)" % f)
+        elif kind == "filter":
+            body.append("if not %s(x):" % f)
+            reject()
+        elif kind == "remove":
+            body.append("if %s(x):" % f)
+            reject()
+        elif kind == "keep":
+            body.append("x = %s(x)" % f)
+            body.append("if x is None:")
+            reject()
+        elif kind == "take_while":
+            body.append("if not %s(x): break" % f)
+        elif kind == "distinct":
+            init.append("_seen%d = set()" % i)
+            init.append("_add%d = _seen%d.add" % (i, i))
+            body.append("if x in _seen%d:" % i)
+            reject()
+            body.append("_add%d(x)" % i)
+        elif kind == "dedupe":
+            init.append("_prev%d = _nil" % i)
+            body.append("if _prev%d is not _nil and x == _prev%d:" % (i, i))
+            reject()
+            body.append("_prev%d = x" % i)
+        elif kind == "drop":
+            init.append("_drop%d = %s" % (i, f))
+            body.append("if _drop%d > 0:" % i)
+            body.append("    _drop%d -= 1" % i)
+            reject()
+        elif kind == "take":
+            # Stop right after the last item instead of pulling one more from the source
+            init.append("_take%d = %s" % (i, f))
+            init.append("if _take%d <= 0: return%s" % (i, "" if terminal == "iter" else " _result"))
+            init.append("_done = False")
+            body.append("_take%d -= 1" % i)
+            body.append("if _take%d <= 0: _done = True" % i)
+            has_take = True
+        else:  # pragma: no cover
+            raise ValueError("Unknown stage: %s" % kind)
+
+    if terminal == "iter":
+        body.append("yield x")
+    elif terminal == "first":
+        body.append("return x")
+    elif terminal == "some":
+        body.append("if _pred(x): return x")
+    elif terminal == "count":
+        body.append("_result += 1")
+
+    if has_take:
+        body.append("if _done: break")
+
+    params = ["_coll"] + ["_a%d" % i for i in range(len(kinds))] + ["_pred=None", "_nil=_nil"]
+    lines = ["def _fused(%s):" % ", ".join(params)]
+    lines.append("    _result = %s" % ("0" if terminal == "count" else "None"))
+    lines.extend("    " + line for line in init)
+    lines.append("    for x in _coll:")
+    lines.extend("        " + line for line in body)
+    if terminal != "iter":
+        lines.append("    return _result")
+
+    namespace: dict[str, Any] = {"_nil": _nil}
+    exec("\n".join(lines), namespace)
+    fn: Callable[..., Any] = namespace["_fused"]
+    fn.__doc__ = "\n".join(lines)
+    _compiled[key] = fn
+    return fn
+
+
+def _stage_args(stages: list[_Stage]) -> list[Any]:
+    return [stage.n if stage.kind in ("take", "drop") else stage.fn for stage in stages]
+
+
+class Pipeline(Generic[T]):
+    """
+    A lazy pipeline of sequence functions applied to ``coll``. Each method returns a new pipeline with one more stage;
+    iterating over the pipeline runs it. Consecutive ``map``, ``filter``, ``remove``, ``keep``, ``take_while``,
+    ``take``, ``drop``, ``distinct`` and ``dedupe`` stages run in a single loop. Any other sequence function can be
+    added with ``then``.
+
+    Pipelines are immutable, so a pipeline can be used as the base for several others. Iterating over a pipeline
+    several times only works if ``coll`` can be iterated several times.
+    """
+
+    def __init__(self, coll: Iterable[Any], stages: tuple[_Stage, ...] = (), block_size: Union[int, None] = None):
+        self._coll = coll
+        self._stages = stages
+        self._block_size = block_size
+
+    def _then(self, stage: _Stage) -> "Pipeline[Any]":
+        return Pipeline(self._coll, self._stages + (stage,), self._block_size)
+
+    def vectorize(self, block_size: int = vectorized.BLOCK_SIZE) -> "Pipeline[T]":
+        """
+        Return the same pipeline, but with its first stages run with NumPy on blocks of ``block_size`` items if
+        possible. See ``clj.vectorized`` for the supported sources and stages. This is a no-op if NumPy is not
+        installed.
+        """
+        return Pipeline(self._coll, self._stages, block_size)
+
+    # noinspection PyShadowingBuiltins
+    def map(self, f: Callable[[Any], Any]) -> "Pipeline[Any]":
+        return self._then(_Stage("map", f))
+
+    # noinspection PyShadowingBuiltins
+    def filter(self, pred: Callable[[Any], Any]) -> "Pipeline[Any]":
+        return self._then(_Stage("filter", pred))
+
+    def remove(self, pred: Callable[[Any], Any]) -> "Pipeline[Any]":
+        return self._then(_Stage("remove", pred))
+
+    def keep(self, f: Callable[[Any], Any]) -> "Pipeline[Any]":
+        return self._then(_Stage("keep", f))
+
+    def take_while(self, pred: Callable[[Any], Any]) -> "Pipeline[Any]":
+        return self._then(_Stage("take_while", pred))
+
+    def take(self, n: int) -> "Pipeline[Any]":
+        return self._then(_Stage("take", n=n))
+
+    def drop(self, n: int) -> "Pipeline[Any]":
+        return self._then(_Stage("drop", n=n))
+
+    def distinct(self) -> "Pipeline[Any]":
+        return self._then(_Stage("distinct"))
+
+    def dedupe(self) -> "Pipeline[Any]":
+        return self._then(_Stage("dedupe"))
+
+    def then(self, f: Callable[..., Iterable[Any]], *args: Any) -> "Pipeline[Any]":
+        """
+        Add a stage that calls ``f(*args, coll)``, like Clojure’s ``->>``. ``f`` must return an iterable.
+        """
+        return self._then(_Stage("apply", f, args=args))
+
+    def _plan(self) -> tuple[Iterable[Any], int, list[Union[list[_Stage], _Stage]]]:
+        """
+        Return the source, the number of items to skip in it and the segments of the pipeline.
+        """
+        segments = _segments(_optimize(self._stages))
+
+        # A leading drop can use the fast path of seqs.drop on sequences
+        skip = 0
+        if segments and isinstance(segments[0], list) and segments[0][0].kind == "drop":
+            skip = segments[0][0].n
+            segments[0] = segments[0][1:]
+            if not segments[0]:
+                segments.pop(0)
+
+        return self._coll, skip, segments
+
+    def _vectorized_plan(self) -> Union[vectorized.Plan, str, None]:
+        if self._block_size is None:
+            return None
+        return vectorized.plan(self._coll, _optimize(self._stages))
+
+    def _length(self) -> Union[int, None]:
+        """
+        Return the number of items of the pipeline if it only depends on the length of ``coll``, or ``None``.
+        """
+        if not isinstance(self._coll, collections_abc.Sized):
+            return None
+        length = len(self._coll)
+        for stage in self._stages:
+            if stage.kind == "take":
+                length = min(length, max(stage.n, 0))
+            elif stage.kind == "drop":
+                length = max(length - max(stage.n, 0), 0)
+            elif stage.kind != "map":
+                return None
+        return length
+
+    def _run(self, terminal: str, pred: Union[Callable[[Any], Any], None] = None) -> Any:
+        if terminal == "count":
+            length = self._length()
+            if length is not None:
+                return length
+
+        plan = self._vectorized_plan()
+        if isinstance(plan, vectorized.Plan):
+            assert self._block_size is not None
+            blocks = vectorized.run(plan, self._block_size)
+            rest = tuple(_optimize(self._stages)[plan.size:])
+            if terminal == "count" and not rest:
+                return vectorized.count(blocks)
+            return Pipeline(vectorized.items(blocks), rest)._run(terminal, pred)
+
+        coll, skip, segments = self._plan()
+        if skip:
+            coll = seqs.drop(skip, coll)
+
+        last = len(segments) - 1
+        for i, segment in enumerate(segments):
+            if isinstance(segment, list):
+                fn = _compile(tuple(stage.kind for stage in segment), "iter" if i < last else terminal)
+                result = fn(coll, *_stage_args(segment), _pred=pred)
+                if i == last and terminal != "iter":
+                    return result
+                coll = result
+            else:
+                assert segment.fn is not None
+                coll = segment.fn(*segment.args, coll)
+
+        if terminal == "first":
+            return seqs.first(coll)
+        if terminal == "some":
+            assert pred is not None
+            return seqs.some(pred, coll)
+        if terminal == "count":
+            return seqs.count(coll)
+        return iter(coll)
+
+    def __iter__(self) -> Iterator[T]:
+        it: Iterator[T] = self._run("iter")
+        return it
+
+    def first(self) -> Union[T, None]:
+        """
+        Return the first item of the pipeline, or ``None``.
+        """
+        return self._run("first")  # type: ignore[no-any-return]
+
+    def some(self, pred: Callable[[T], Any]) -> Union[T, None]:
+        """
+        Return the first item of the pipeline for which ``pred(item)`` is truthy, or ``None``. See ``clj.some``.
+        """
+        return self._run("some", pred)  # type: ignore[no-any-return]
+
+    def count(self) -> int:
+        """
+        Return the number of items of the pipeline. If ``coll`` has a length and the pipeline only has ``map``,
+        ``take`` and ``drop`` stages, it’s computed from it without running the pipeline.
+        """
+        return self._run("count")  # type: ignore[no-any-return]
+
+    def explain(self) -> str:
+        """
+        Return a description of how the pipeline runs.
+        """
+        lines = ["source: %s" % type(self._coll).__name__]
+
+        plan = self._vectorized_plan()
+        if isinstance(plan, vectorized.Plan):
+            assert self._block_size is not None
+            stages = _optimize(self._stages)
+            lines.append("vectorized with NumPy, in blocks of %d items:" % self._block_size)
+            lines.extend("  " + stage.describe() for stage in stages[:plan.size])
+            rest: Pipeline[Any] = Pipeline((), tuple(stages[plan.size:]))
+            lines.extend(rest.explain().splitlines()[1:])
+            return "\n".join(lines)
+        if plan is not None:
+            lines.append("not vectorized: %s" % plan)
+
+        _, skip, segments = self._plan()
+        if skip:
+            lines.append("  skip the first %d items" % skip)
+
+        for segment in segments:
+            if isinstance(segment, list):
+                lines.append("fused loop:")
+                for stage in segment:
+                    line = "  " + stage.describe()
+                    if stage.kind == "take":
+                        line += ", stops pulling items after the last one"
+                    lines.append(line)
+            else:
+                lines.append(segment.describe())
+
+        return "\n".join(lines)
+
+    def __repr__(self) -> str:
+        return "Pipeline(%s)" % " -> ".join([type(self._coll).__name__] + [s.describe() for s in self._stages])
+
+
+# Sequence functions that have an equivalent pipeline stage, with the number of arguments they take before coll
+_STAGES: dict[Any, tuple[str, int]] = {
+    seqs.map: ("map", 1),
+    builtins.map: ("map", 1),
+    seqs.filter: ("filter", 1),
+    seqs.remove: ("remove", 1),
+    seqs.keep: ("keep", 1),
+    seqs.take_while: ("take_while", 1),
+    seqs.take: ("take", 1),
+    seqs.drop: ("drop", 1),
+    seqs.distinct: ("distinct", 0),
+    seqs.dedupe: ("dedupe", 0),
+}
+
+# Sequence functions that return a generator, which are added to a pipeline instead of being called right away
+_LAZY = frozenset((seqs.reductions,))
+
+# Functions that consume a pipeline and return a single value
+_TERMINALS: dict[Any, tuple[str, int]] = {
+    seqs.first: ("first", 0),
+    seqs.some: ("some", 1),
+    seqs.count: ("count", 0),
+}
+
+
+def thread_last(coll: Any, *forms: Union[Callable[..., Any], tuple[Any, ...]], vectorize: bool = False) -> Any:
+    """
+    Like Clojure’s ``->>``: threads ``coll`` through the forms. Each form is either a function ``f``, called as
+    ``f(x)``, or a tuple ``(f, *args)``, called as ``f(*args, x)``, where ``x`` is the result of the previous form.
+
+        thread_last(coll, (map, inc), (filter, is_even), distinct, count)
+        # is equivalent to:
+        count(distinct(filter(is_even, map(inc, coll))))
+
+    The sequence functions that have an equivalent ``Pipeline`` stage are fused in a single loop, as well as
+    ``first``, ``some`` and ``count`` if they follow them. Other functions are called as usual. If the last form is
+    fused, the result is an iterator, like the sequence functions return.
+
+    If ``vectorize`` is ``True``, the pipeline is run with NumPy when possible; see ``Pipeline.vectorize``.
+    """
+    current: Any = coll
+    for form in forms:
+        if isinstance(form, tuple):
+            f, args = form[0], form[1:]
+        else:
+            f, args = form, ()
+
+        try:
+            stage, terminal, lazy = _STAGES.get(f), _TERMINALS.get(f), f in _LAZY
+        except TypeError:
+            # An unhashable callable can't be one of the sequence functions above
+            stage, terminal, lazy = None, None, False
+
+        if stage is not None and len(args) == stage[1]:
+            kind = stage[0]
+            pipeline = current if isinstance(current, Pipeline) else _pipeline(current, vectorize)
+            if kind in ("take", "drop"):
+                current = pipeline._then(_Stage(kind, n=args[0]))
+            else:
+                current = pipeline._then(_Stage(kind, args[0] if args else None))
+            continue
+
+        if isinstance(current, Pipeline):
+            if terminal is not None and len(args) == terminal[1]:
+                current = current._run(terminal[0], *args)
+                continue
+
+            if lazy:
+                current = current.then(f, *args)
+                continue
+
+        current = f(*args, current)
+
+    # The sequence functions return iterators, and so does a pipeline that ends with them
+    if isinstance(current, Pipeline):
+        return iter(current)
+    return current
+
+
+def _pipeline(coll: Any, vectorize: bool) -> Pipeline[Any]:
+    pipeline: Pipeline[Any] = Pipeline(coll)
+    return pipeline.vectorize() if vectorize else pipeline
@@ -1,9 +1,18 @@
 # -*- coding: UTF-8 -*-
+import array
+import builtins
 import collections
 import collections.abc as collections_abc
 import itertools
+import operator
+import os
 import random
-from typing import Iterable, TypeVar, Any, Callable, Iterator, Union, cast, Deque, Sequence
+import sys
+import threading
+from typing import Iterable, TypeVar, Any, Callable, Iterator, Union, cast, Deque, Sequence, Generic, overload, \
+    Literal
+
+from clj import spill
 
 
 class _Nil(object):
@@ -13,11 +22,17 @@ class _Nil(object):
 # We use this as a default value for some arguments to check if they were provided or not
 _nil = _Nil()
 
-# We redefine `range` below so keep a reference to the original one here
+# We redefine `range` and `map` below so keep a reference to the original ones here
 _range = range
+_map = builtins.map
 
 T = TypeVar('T')
 T2 = TypeVar('T2')
+S = TypeVar('S')
+
+
+# Sequences that can be indexed and sliced without walking them
+_SLICEABLE_TYPES = (list, tuple, _range, str, bytes, bytearray, memoryview, array.array)
 
 
 def _is_collection_abc(x: Any) -> bool:
@@ -25,22 +40,236 @@ def _is_collection_abc(x: Any) -> bool:
         isinstance(x, collections_abc.Iterable)
 
 
-def _make_gen(g: Iterable[T]) -> Iterator[T]:
-    for e in g:
-        yield e
+class _Counted(itertools.chain[T]):
+    """
+    An iterator with a length, such as ``map(f, coll)`` when ``coll`` has one. ``len()`` returns the number of items
+    left, computed from the current length of the input, so ``count`` doesn’t have to realize them; ``f`` is not
+    called.
+
+    ``length`` takes the number of items yielded so far and returns the number of items left. The items are only
+    counted if ``count`` is true, as it adds a small cost to each of them.
+    """
+    # A chain of a single iterator: subclassing it rather than defining __next__ keeps the iteration in C
+    __slots__ = ("_length", "_counter")
+    _length: Callable[[int], int]
+    _counter: Union["itertools.repeat[bool]", None]
+
+    def __new__(cls, it: Iterator[T], length: Callable[[int], int], count: bool = False) -> "_Counted[T]":
+        counter = itertools.repeat(True, sys.maxsize) if count else None
+        # compress only pulls a selector once it got an item, so it counts the items down in the counter
+        self = super().__new__(cls, it if counter is None else itertools.compress(it, counter))
+        self._length = length
+        self._counter = counter
+        return self
+
+    def __len__(self) -> int:
+        counter = self._counter
+        yielded = 0 if counter is None else sys.maxsize - operator.length_hint(counter)
+        return max(self._length(yielded), 0)
+
+    def __bool__(self) -> bool:
+        # Like any other iterator, and unlike a collection, an empty one is truthy
+        return True
+
+    def __empty__(self) -> bool:
+        return len(self) == 0
+
+    def __clj_empty__(self) -> "_Counted[T]":
+        return _Counted(iter(()), _no_items)
+
+
+def _no_items(_: int) -> int:
+    return 0
+
+
+# Iterators of built-in collections, whose __length_hint__ is the exact number of items left, even if the collection
+# grows during the iteration
+_EXACT_HINT_TYPES = frozenset(type(iter(coll)) for coll in cast(list[Iterable[Any]], [
+    [], (), _range(0), _range(2 ** 64), "", "\u00e9", b"", bytearray(), {}, {}.values(), {}.items(), set(),
+    collections.deque()]))
+
+
+def _source(coll: Iterable[T]) -> Iterator[T]:
+    """
+    Return an iterator over ``coll``, which must have a length, whose ``operator.length_hint`` is the number of items
+    left.
+    """
+    it = iter(coll)
+    if isinstance(it, _Counted) or type(it) in _EXACT_HINT_TYPES:
+        return it
+    sized = cast(collections_abc.Sized, coll)
+    return _Counted(it, lambda yielded: len(sized) - yielded, count=True)
+
+
+def _sources(colls: Sequence[Iterable[Any]]) -> Union[list[Iterator[Any]], None]:
+    """
+    Return the ``_source`` of each of ``colls``, or ``None`` if one of them doesn’t have a length.
+    """
+    if all(isinstance(coll, collections_abc.Sized) for coll in colls):
+        return [_source(coll) for coll in colls]
+    return None
+
+
+class LazySeq(Generic[T]):
+    """
+    A lazy sequence that caches the elements of ``coll`` as they are realized, so it can be iterated several times,
+    including concurrently from different threads, while ``coll`` itself is consumed only once.
+
+    Elements are realized in chunks of ``chunk_size`` items, like Clojure’s chunked seqs. Use ``chunk_size=1`` if
+    realizing one element ahead of the consumer is not acceptable.
+
+    Since every realized element is kept in memory, don’t hold a reference to the ``LazySeq`` of a long stream if
+    you don’t need to iterate over it again.
+
+    Like Clojure’s, a ``LazySeq`` is equal to any sequence with the same elements, such as a list or a tuple; comparing
+    or hashing it realizes it.
+
+        >>> s = LazySeq(x * 2 for x in range(5))
+        >>> first(s), nth(s, 3), list(s)
+        (0, 6, [0, 2, 4, 6, 8])
+    """
+
+    def __init__(self, coll: Iterable[T] = (), chunk_size: int = 32):
+        self._source: Union[Iterator[T], None] = iter(coll)
+        self._cache: list[T] = []
+        self._chunk_size = max(chunk_size, 1)
+        self._lock = threading.Lock()
+
+    def _realize(self, n: int) -> bool:
+        """
+        Realize the sequence until it has more than ``n`` elements. Return ``False`` if that’s not possible because the
+        sequence is shorter.
+        """
+        cache = self._cache
+        with self._lock:
+            # Another thread may have done the job while we were waiting for the lock
+            while len(cache) <= n:
+                source = self._source
+                if source is None:
+                    return False
+
+                size = len(cache)
+                # Append the elements one by one so none is lost if the source raises an exception
+                for e in itertools.islice(source, self._chunk_size):
+                    cache.append(e)
+
+                if len(cache) - size < self._chunk_size:
+                    self._source = None
+
+            return True
+
+    def realize(self) -> None:
+        """
+        Realize the whole sequence.
+        """
+        with self._lock:
+            if self._source is not None:
+                self._cache.extend(self._source)
+                self._source = None
+
+    def is_realized(self) -> bool:
+        """
+        Return ``True`` if the whole sequence has been realized.
+        """
+        return self._source is None
+
+    def __iter__(self) -> Iterator[T]:
+        cache = self._cache
+        i = 0
+        while True:
+            if i < len(cache):
+                yield cache[i]
+                i += 1
+            elif not self._realize(i):
+                return
+
+    @overload
+    def __getitem__(self, index: int) -> T:
+        ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[T]:
+        ...
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[T, list[T]]:
+        if isinstance(index, slice):
+            if (index.start or 0) < 0 or index.stop is None or index.stop < 0:
+                self.realize()
+            else:
+                self._realize(index.stop - 1)
+            return self._cache[index]
+
+        if index < 0:
+            self.realize()
+        else:
+            self._realize(index)
+        return self._cache[index]
+
+    def __empty__(self) -> bool:
+        return not self._cache and not self._realize(0)
+
+    def __bool__(self) -> bool:
+        return not self.__empty__()
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, (str, bytes, bytearray)) \
+                or not isinstance(other, (LazySeq, collections_abc.Sequence)):
+            return NotImplemented
+        self.realize()
+        if isinstance(other, LazySeq):
+            other.realize()
+            return self._cache == other._cache
+        return len(self._cache) == len(other) and all(_map(operator.eq, self._cache, other))
+
+    def __hash__(self) -> int:
+        self.realize()
+        return hash(tuple(self._cache))
+
+    def __repr__(self) -> str:
+        items = [repr(e) for e in self._cache]
+        if not self.is_realized():
+            items.append("...")
+        return "LazySeq([%s])" % ", ".join(items)
+
+
+def is_realized(x: Any) -> bool:
+    """
+    Return ``True`` if ``x`` has been fully realized. This is always the case for non-lazy collections like lists, and
+    never the case for iterators.
+    """
+    if isinstance(x, LazySeq):
+        return x.is_realized()
+    return not isinstance(x, collections_abc.Iterator)
 
 
 # The order of the functions here match the one in the Clojure docs:
 #     http://clojure.org/reference/sequences
 
-def distinct(coll: Iterable[T]) -> Iterator[T]:
+def distinct(coll: Iterable[T], key: Union[Callable[[T], Any], None] = None, seen: Any = None) -> Iterator[T]:
     """
-    Return a generator of the elements of ``coll`` with duplicates removed.
+    Return a generator of the elements of ``coll`` with duplicates removed. If ``key`` is given, two elements are
+    duplicates if they have the same ``key(element)``; the first one is kept.
+
+    The keys are kept in ``seen``, a ``set`` by default, so the memory grows with the number of distinct elements. To
+    bound it, pass any object that supports ``in`` and ``add``, such as ``clj.sketches.LRUWindow(n)``, which only
+    remembers the last ``n`` keys, or ``clj.sketches.BloomFilter(capacity, error_rate)``, which may wrongly drop a
+    fraction ``error_rate`` of the distinct elements. Both report memory statistics with ``stats()``.
     """
-    seen = set()
+    if seen is None:
+        seen = set()
+    add = seen.add
+
+    if key is None:
+        for e in coll:
+            if e not in seen:
+                add(e)
+                yield e
+        return
+
     for e in coll:
-        if e not in seen:
-            seen.add(e)
+        k = key(e)
+        if k not in seen:
+            add(k)
             yield e
 
 
@@ -81,6 +310,15 @@ def cons(x: T2, seq: Iterable[T]) -> Iterator[Union[T, T2]]:
     Return a generator where ``x`` is the first element and ``seq`` is the
     rest. Note, this differs from Clojure’s ``cons`` which returns a non-lazy list.
     """
+    if isinstance(seq, collections_abc.Sized):
+        head = iter((x,))
+        source = _source(seq)
+        return _Counted(itertools.chain(head, source),
+                        lambda _: operator.length_hint(head) + operator.length_hint(source))
+    return _cons(x, seq)
+
+
+def _cons(x: T2, seq: Iterable[T]) -> Iterator[Union[T, T2]]:
     yield x
     for e in seq:
         yield e
@@ -92,12 +330,37 @@ def concat(*xs: Iterable[T]) -> Iterator[T]:
 
     This is equivalent to ``itertools.chain``.
     """
+    sources = _sources(xs)
+    if sources is not None:
+        return _Counted(itertools.chain(*sources), lambda _: sum(_map(operator.length_hint, sources)))
     return itertools.chain(*xs)
 
 
-# alias
+@overload
+def map(f: Callable[[T], S], coll: Iterable[T], /) -> Iterator[S]:
+    ...
+
+
+@overload
+def map(f: Callable[[T, T2], S], coll1: Iterable[T], coll2: Iterable[T2], /) -> Iterator[S]:
+    ...
+
+
+@overload
+def map(f: Callable[..., S], coll1: Iterable[Any], coll2: Iterable[Any], coll3: Iterable[Any], /,
+        *colls: Iterable[Any]) -> Iterator[S]:
+    ...
+
+
 # noinspection PyShadowingBuiltins
-map = map
+def map(f: Callable[..., S], *colls: Iterable[Any]) -> Iterator[S]:
+    """
+    Like Python’s ``map``, but the result has a length if all the ``colls`` have one.
+    """
+    sources = _sources(colls)
+    if colls and sources is not None:
+        return _Counted(_map(f, *sources), lambda _: min(_map(operator.length_hint, sources)))
+    return _map(f, *colls)
 
 
 def mapcat(f: Callable[..., Iterable[T]], *colls: Iterable[Any]) -> Iterator[T]:
@@ -106,7 +369,7 @@ def mapcat(f: Callable[..., Iterable[T]], *colls: Iterable[Any]) -> Iterator[T]:
     result of applying ``map`` to ``f`` and ``colls``. Thus function ``f``
     should return a collection.
     """
-    for coll in map(f, *colls):
+    for coll in _map(f, *colls):
         for e in coll:
             yield e
 
@@ -127,23 +390,60 @@ def cycle(coll: Iterable[T]) -> Iterator[T]:
 
 def interleave(*colls: Iterable[T]) -> Iterator[T]:
     """
-    Returns a generator of the first item in each coll, then the second etc.
+    Returns an iterator of the first item in each coll, then the second etc.
+    Stops as soon as one of the colls is exhausted.
     """
-    iterators = [iter(coll) for coll in colls]
+    return itertools.chain.from_iterable(zip(*colls))
 
-    try:
-        while True:
-            values = [next(it) for it in iterators]
-            for v in values:
-                yield v
-    except StopIteration:
-        pass
+
+def interleave_longest(*colls: Iterable[T], fill: Any = _nil) -> Iterator[T]:
+    """
+    Like ``interleave``, but continues until all colls are exhausted. Exhausted
+    colls are dropped, so the remaining ones are taken from in a round-robin
+    fashion. If ``fill`` is given, it replaces the items of the exhausted colls
+    instead:
+
+    >>> list(interleave_longest([1, 2, 3], "a"))
+    [1, 'a', 2, 3]
+    >>> list(interleave_longest([1, 2, 3], "a", fill=None))
+    [1, 'a', 2, None, 3, None]
+    """
+    if fill is not _nil:
+        return itertools.chain.from_iterable(itertools.zip_longest(*colls, fillvalue=fill))
+    return _round_robin(colls)
+
+
+def _round_robin(colls: Sequence[Iterable[T]]) -> Iterator[T]:
+    # Cycle on the iterators until one of them is exhausted, then on the remaining ones from the next one, etc. The
+    # iterators are advanced by C code, so this takes constant time per item whatever the number of colls.
+    iterators: Iterator[Iterator[T]] = _map(iter, colls)
+    for active in _range(len(colls), 0, -1):
+        iterators = itertools.cycle(itertools.islice(iterators, active))
+        yield from _map(next, iterators)
 
 
 def interpose(sep: T2, coll: Iterable[T]) -> Iterator[Union[T, T2]]:
     """
     Returns a generator of the elements of ``coll`` separated by ``sep``.
     """
+    if isinstance(coll, collections_abc.Sized):
+        source = _source(coll)
+        return _Counted(_interpose(sep, source),
+                        lambda yielded: _interpose_length(operator.length_hint(source), yielded), count=True)
+    return _interpose(sep, coll)
+
+
+def _interpose_length(left: int, yielded: int) -> int:
+    """
+    Return the number of items left in ``interpose(sep, coll)`` given the number of items left in ``coll``.
+    """
+    if yielded == 0:
+        return 2 * left - 1
+    # After an item, each item left comes with a separator. After a separator, the next item was already pulled.
+    return 2 * left if yielded % 2 else 2 * left + 1
+
+
+def _interpose(sep: T2, coll: Iterable[T]) -> Iterator[Union[T, T2]]:
     first_ = True
     for e in coll:
         if first_:
@@ -166,11 +466,27 @@ def drop(n: int, coll: Iterable[T]) -> Iterator[T]:
     Returns a generator of all but the first ``n`` items in ``coll``.
     """
     if coll is None:
-        return
+        return iter(())
 
-    for i, e in enumerate(coll):
-        if i >= n:
-            yield e
+    if not isinstance(coll, collections_abc.Sized):
+        return iter(coll) if n <= 0 else itertools.islice(coll, n, None)
+
+    if n <= 0:
+        source = _source(coll)
+        return _Counted(source, lambda _: operator.length_hint(source))
+
+    if isinstance(coll, _SLICEABLE_TYPES):
+        size = len(coll)
+        # Skipping elements with islice is cheap but linear; indexing is constant-time but adds a small cost on each
+        # remaining element. Index when we'd skip more elements than we'd yield.
+        if n > size - n:
+            indices = iter(_range(n, size))
+            return _Counted(_map(coll.__getitem__, indices), lambda _: operator.length_hint(indices))
+
+    source = _source(coll)
+    # islice skips the first n items when the first one is pulled
+    return _Counted(itertools.islice(source, n, None),
+                    lambda yielded: operator.length_hint(source) - (n if yielded == 0 else 0), count=True)
 
 
 def drop_while(pred: Callable[[T], Any], coll: Iterable[T]) -> Iterator[T]:
@@ -189,25 +505,31 @@ def take(n: int, coll: Iterable[T]) -> Iterator[T]:
     there are fewer than ``n``.
     """
     if n <= 0:
-        return
+        return iter(())
 
-    for i, e in enumerate(coll):
-        yield e
-        if i + 1 >= n:
-            break
+    if isinstance(coll, collections_abc.Sized):
+        source = _source(coll)
+        return _Counted(itertools.islice(source, n), lambda yielded: min(n - yielded, operator.length_hint(source)),
+                        count=True)
+    return itertools.islice(coll, n)
 
 
 def take_nth(n: int, coll: Iterable[T]) -> Iterator[T]:
     """
     Returns a generator of every ``n``th item in ``coll``.
+
+    If ``n`` is not positive, returns an infinite generator of the first item in ``coll`` (or an empty one if ``coll``
+    is empty).
     """
     if n <= 0:
-        for e in coll:
-            while True:
-                yield e
+        return _repeat_first(coll)
 
-    for i, e in enumerate(coll):
-        if i % n == 0:
+    return itertools.islice(coll, 0, None, n)
+
+
+def _repeat_first(coll: Iterable[T]) -> Iterator[T]:
+    for e in coll:
+        while True:
             yield e
 
 
@@ -223,8 +545,19 @@ def take_while(pred: Callable[[T], Any], coll: Iterable[T]) -> Iterable[T]:
 
 def butlast(coll: Iterable[T]) -> Iterator[T]:
     """
-    Return a generator of all but the last item in ``coll``, in linear time.
+    Return a generator of all but the last item in ``coll``, in linear time. If ``coll`` has a length, it’s used to
+    avoid buffering the last item.
     """
+    if isinstance(coll, collections_abc.Sized):
+        size = len(coll) - 1
+        if size <= 0:
+            return iter(())
+        return _Counted(itertools.islice(coll, size), lambda yielded: size - yielded, count=True)
+
+    return _butlast(coll)
+
+
+def _butlast(coll: Iterable[T]) -> Iterator[T]:
     first_ = True
     last_e: Union[T, None] = None
     for e in coll:
@@ -241,10 +574,17 @@ def drop_last(n: int, coll: Iterable[T]) -> Iterator[T]:
     """
     Return a generator of all but the last ``n`` items in ``coll``.
     """
+    if isinstance(coll, collections_abc.Sized):
+        size = max(len(coll) - max(n, 0), 0)
+        return _Counted(itertools.islice(coll, size), lambda yielded: size - yielded, count=True)
+
     if n == 1:
-        yield from butlast(coll)
-        return
+        return _butlast(coll)
 
+    return _drop_last(n, coll)
+
+
+def _drop_last(n: int, coll: Iterable[T]) -> Iterator[T]:
     queue: Deque[T] = collections.deque()
     size = 0
 
@@ -259,27 +599,53 @@ def drop_last(n: int, coll: Iterable[T]) -> Iterator[T]:
 
 
 # Recursive generics are not supported yet -- https://github.com/python/mypy/issues/13693
-def flatten(x: Iterable[Any]) -> Iterator[Any]:
+# Types of the elements that are never flattened, whatever the ``atomic`` types passed to ``flatten``
+_FLATTEN_LEAF_TYPES = (int, float, complex, bool, type(None), str)
+
+
+def flatten(x: Iterable[Any], depth: Union[int, None] = None,
+            atomic: Union[type, tuple[type, ...]] = (str, bytes)) -> Iterator[Any]:
     """
     Takes any nested combination of sequential things (``list``s, ``tuple``s,
     etc.) and returns their contents as a single, flat sequence.
+
+    Iterables that are instances of ``atomic`` (``str`` and ``bytes`` by
+    default) are not flattened; pass e.g. ``atomic=(str, bytes, dict)`` to
+    keep ``dict``s, or your own classes. Strings are never flattened. If
+    ``depth`` is given, only that many levels of nesting are flattened.
     """
-    # Avoid lookup at each loop, but without leaking [Iterable] in the module scope
-    # by using [from collections import Iterable].
-    iterable_class = collections.abc.Iterable
+    # Whether an element is iterable is checked once per type. Lists and tuples of leaves are yielded in bulk.
+    leaf_types = set(_FLATTEN_LEAF_TYPES)
+    branch_types = set()
+    iterable_class = collections_abc.Iterable
 
-    # Use a stack to support deeply-nested iterables
-    xs = collections.deque([iter(x)])
+    # Use a stack to support deeply-nested iterables; the elements of stack[-1] are at depth len(stack)
+    stack = [iter(x)]
+    push = stack.append
 
-    while xs:
-        for e in xs[0]:
-            if isinstance(e, iterable_class) and not isinstance(e, (bytes, str)):
-                xs.appendleft(iter(e))
-                break
+    while stack:
+        for e in stack[-1]:
+            t = type(e)
+            if t in leaf_types:
+                yield e
+                continue
 
-            yield e
+            if t not in branch_types:
+                if issubclass(t, str) or issubclass(t, atomic) or not issubclass(t, iterable_class):
+                    leaf_types.add(t)
+                    yield e
+                    continue
+                branch_types.add(t)
+
+            if depth is not None and len(stack) > depth:
+                yield e
+            elif (t is list or t is tuple) and leaf_types.issuperset(_map(type, e)):
+                yield from e
+            else:
+                push(iter(e))
+                break
         else:
-            xs.popleft()
+            stack.pop()
 
 
 def reverse(coll: Iterable[T]) -> Iterator[T]:
@@ -314,6 +680,9 @@ def _iter(coll: Union[Iterator[T], Sequence[T], Iterable[T]], n: int = 0) -> Ite
 def split_at(n: int, coll: Union[Iterator[T], Sequence[T]]) -> tuple[Iterable[T], Iterable[T]]:
     """
     Returns a tuple of ``(take(n, coll), drop(n coll))``.
+
+    The first element of the tuple is a list, or a ``LazySeq`` if ``coll`` is an iterator: consuming the second element
+    realizes it.
     """
     if n <= 0:
         return [], coll
@@ -321,37 +690,53 @@ def split_at(n: int, coll: Union[Iterator[T], Sequence[T]]) -> tuple[Iterable[T]
     if coll is None:
         return [], []
 
-    # Unfortunately we must consume all elements for the first case because
-    # unlike Clojure's lazy lists, Python's generators yield their elements
-    # only once.
-    taken: list[T] = []
-    for i, e in enumerate(coll):
-        taken.append(e)
-        if i + 1 >= n:
-            break
+    if isinstance(coll, collections_abc.Sequence):
+        # Iterate over the rest rather than slicing it, which would copy it before anything is consumed
+        return list(coll[:n]), itertools.islice(coll, n, None)
 
-    return taken, _iter(coll, n)
+    # Python's iterators yield their elements only once, so we cache the first part to be able to consume the second
+    # one first.
+    it = iter(coll)
+    taken = LazySeq(itertools.islice(it, n))
+
+    def dropped() -> Iterator[T]:
+        taken.realize()
+        yield from it
+
+    return taken, dropped()
 
 
 def split_with(pred: Callable[[T], Any], coll: Union[Iterator[T], Sequence[T]]) -> tuple[Iterable[T], Iterable[T]]:
     """
     Returns a tuple of ``(take_while(pred, coll), drop_while(pred, coll))``.
+
+    The first element of the tuple is a list, or a ``LazySeq`` if ``coll`` is an iterator: consuming the second element
+    realizes it.
     """
+    if isinstance(coll, collections_abc.Sequence):
+        for i, e in enumerate(coll):
+            if not pred(e):
+                return list(coll[:i]), itertools.islice(coll, i, None)
+        return list(coll), []
+
     # See note in split_at.
-    taken: list[T] = []
-    for i, e in enumerate(coll):
-        if pred(e):
-            taken.append(e)
-        else:
-            middle = e
-            break
-    else:
-        return taken, []
+    it = iter(coll)
+    # the first element for which pred is falsy, if any
+    middle: list[T] = []
+
+    def taking() -> Iterator[T]:
+        for el in it:
+            if not pred(el):
+                middle.append(el)
+                return
+            yield el
+
+    taken = LazySeq(taking())
 
     def dropped_while() -> Iterator[T]:
-        yield middle
-        for el in _iter(coll, i + 1):
-            yield el
+        taken.realize()
+        yield from middle
+        yield from it
 
     return taken, dropped_while()
 
@@ -371,7 +756,9 @@ def reductions(f: Callable[[T, Any], Any], coll: Iterable[T], init: Union[T, _Ni
     """
     Yield the intermediate values of the reduction (as per ``reduce``) of ``coll`` by ``f``, starting with ``init``.
     """
-    first_value, is_empty = _first(coll)
+    # Iterate over a single iterator, so a re-iterable coll doesn't start over after its first element
+    it = iter(coll)
+    first_value, is_empty = _first(it)
     if is_empty:
         if isinstance(init, _Nil):
             yield None
@@ -384,12 +771,12 @@ def reductions(f: Callable[[T, Any], Any], coll: Iterable[T], init: Union[T, _Ni
     if isinstance(init, _Nil):
         init_value = first_value
     else:
-        coll = cons(first_value, coll)
+        it = cons(first_value, it)
         init_value = init
 
     yield init_value
 
-    for e in coll:
+    for e in it:
         init_value = f(init_value, e)
         yield init_value
 
@@ -401,7 +788,10 @@ def map_indexed(f: Callable[[int, T], T2], coll: Iterable[T]) -> Iterable[T2]:
     second item in ``coll``, etc, until ``coll`` is exhausted. Thus function
     ``f`` should accept 2 arguments, ``index`` and ``item``.
     """
-    return map(lambda pair: f(pair[0], pair[1]), enumerate(coll))
+    if isinstance(coll, collections_abc.Sized):
+        source = _source(coll)
+        return _Counted(_map(f, itertools.count(), source), lambda _: operator.length_hint(source))
+    return _map(f, itertools.count(), coll)
 
 
 def _first(coll: Iterable[T]) -> tuple[Union[T, None], bool]:
@@ -414,7 +804,7 @@ def _first(coll: Iterable[T]) -> tuple[Union[T, None], bool]:
         return None, True
 
     _flag = object()
-    first_value: Union[T, object] = next(_make_gen(take(1, coll)), _flag)
+    first_value: Union[T, object] = next(iter(coll), _flag)
     if first_value is _flag:
         return None, True
     return cast(Union[T, None], first_value), False
@@ -471,9 +861,8 @@ def nth(coll: Iterable[T], n: int, not_found: Union[T2, _Nil] = _nil) -> Union[T
                     return not_found
                 raise
 
-        for i, e in enumerate(coll):
-            if i == n:
-                return e
+        for e in itertools.islice(coll, n, n + 1):
+            return e
 
     if isinstance(not_found, _Nil):
         raise IndexError("%s index out of range" % type(coll))
@@ -483,12 +872,18 @@ def nth(coll: Iterable[T], n: int, not_found: Union[T2, _Nil] = _nil) -> Union[T
 
 def last(coll: Iterable[T]) -> Union[T, None]:
     """
-    Return the last item in ``coll``, in linear time. Return ``None`` if ``coll`` is empty.
+    Return the last item in ``coll``. Return ``None`` if ``coll`` is empty.
+
+    This takes linear time in general, and constant time if ``coll`` is a sequence or any other reversible collection.
     """
-    e = None
-    for item in coll:
-        e = item
-    return e
+    if isinstance(coll, _SLICEABLE_TYPES):
+        return coll[-1] if coll else None
+
+    if isinstance(coll, collections_abc.Reversible):
+        return next(reversed(coll), None)
+
+    last_items = collections.deque(coll, maxlen=1)
+    return last_items[0] if last_items else None
 
 
 def zipmap(keys: Iterable[T], vals: Iterable[T2]) -> dict[T, T2]:
@@ -498,12 +893,75 @@ def zipmap(keys: Iterable[T], vals: Iterable[T2]) -> dict[T, T2]:
     return dict(zip(keys, vals))
 
 
+@overload
+def frequencies(coll: Iterable[T], key: None = None) -> "collections.Counter[T]":
+    ...
+
+
+@overload
+def frequencies(coll: Iterable[T], key: Callable[[T], T2]) -> "collections.Counter[T2]":
+    ...
+
+
+@overload
+def frequencies(coll: Iterable[T], key: Union[Callable[[T], Any], None] = None, *, sketch: S) -> S:
+    ...
+
+
+def frequencies(coll: Iterable[T], key: Union[Callable[[T], Any], None] = None, sketch: Any = None) -> Any:
+    """
+    Returns a ``collections.Counter`` of the number of times each element (or
+    ``key(element)``) appears in ``coll``.
+
+    The counter grows with the number of distinct elements. To count an
+    unbounded stream in a fixed amount of memory, pass a ``sketch``: an object
+    with an ``update(iterable)`` method such as
+    ``clj.sketches.SpaceSaving(k)``, which approximates the counts of the most
+    frequent elements, or ``clj.sketches.CountMinSketch(error, confidence)``,
+    which approximates the count of any element. The elements are added to
+    the sketch, which is returned. See ``clj.sketches`` for the error bounds.
+    """
+    if key is not None:
+        coll = _map(key, coll)
+
+    if sketch is None:
+        return collections.Counter(coll)
+
+    sketch.update(coll)
+    return sketch
+
+
+@overload
 def group_by(f: Callable[[T], T2], coll: Iterable[T]) -> dict[T2, list[T]]:
+    ...
+
+
+@overload
+def group_by(f: Callable[[T], T2], coll: Iterable[T], max_items: int,
+             spill_dir: Union[str, "os.PathLike[str]", None] = None) -> "spill.SpilledGroups[T2, T]":
+    ...
+
+
+def group_by(f: Callable[[T], T2], coll: Iterable[T], max_items: Union[int, None] = None,
+             spill_dir: Union[str, "os.PathLike[str]", None] = None) \
+        -> Union[dict[T2, list[T]], "spill.SpilledGroups[T2, T]"]:
     """
     Returns a ``dict`` of the elements of ``coll`` keyed by the result of ``f``
     on each element. The value at each key will be a list of the corresponding
     elements, in the order they appeared in ``coll``.
+
+    If ``max_items`` is given, at most that many elements are kept in memory;
+    the others are pickled to a temporary file in ``spill_dir`` (default: the
+    system’s temporary directory). A read-only ``clj.spill.SpilledGroups``
+    mapping is returned instead of a ``dict``, whose keys are in the order they
+    were first seen and whose values are iterables that load the elements of
+    their group from the disk as they are iterated over. Elements must be
+    picklable; the keys, their number of elements and the position of their
+    last spilled elements stay in memory.
     """
+    if max_items is not None:
+        return spill.group_by(f, coll, max_items, spill_dir)
+
     groups = collections.defaultdict(list)
     for e in coll:
         groups[f(e)].append(e)
@@ -672,7 +1130,9 @@ def range(*args: int) -> Iterator[int]:
 
 def tree_seq(has_branch: Callable[[T], Any],
              get_children: Callable[[T], Iterable[T]],
-             root: T) -> Iterator[T]:
+             root: T,
+             order: Literal["pre", "post", "breadth"] = "pre",
+             max_depth: Union[int, None] = None) -> Iterator[T]:
     """
     Returns a generator of the nodes in a tree, via a depth-first walk.
     ``has_branch`` must be a function of one argument that returns ``True`` if
@@ -680,12 +1140,80 @@ def tree_seq(has_branch: Callable[[T], Any],
     be a function of one argument that returns an iterable of the children.
     Will only be called on nodes for which ``has_branch`` returns true.
     ``root`` is the root node of the tree.
+
+    ``order`` selects the walk: ``"pre"`` (the default) yields each node
+    before its children, ``"post"`` after its children, and ``"breadth"``
+    yields the nodes level by level. If ``max_depth`` is given, the children of
+    nodes at that depth (the root is at depth 0) are not walked.
+
+    The walk uses an explicit stack (or queue), so trees can be arbitrarily
+    deep, and children are only requested when the walk reaches them.
     """
+    if order == "pre":
+        return _tree_seq_pre(has_branch, get_children, root, max_depth)
+    if order == "post":
+        return _tree_seq_post(has_branch, get_children, root, max_depth)
+    if order == "breadth":
+        return _tree_seq_breadth(has_branch, get_children, root, max_depth)
+    raise ValueError("order must be 'pre', 'post' or 'breadth', not %r" % (order,))
+
+
+def _tree_seq_pre(has_branch: Callable[[T], Any], get_children: Callable[[T], Iterable[T]], root: T,
+                  max_depth: Union[int, None]) -> Iterator[T]:
+    yield root
+    if (max_depth is not None and max_depth <= 0) or not has_branch(root):
+        return
+
+    # Iterators of the children of the ancestors of the current node; the depth of the nodes of stack[-1] is
+    # len(stack)
+    stack = [iter(get_children(root))]
+    push = stack.append
+    while stack:
+        for node in stack[-1]:
+            yield node
+            if (max_depth is None or len(stack) < max_depth) and has_branch(node):
+                push(iter(get_children(node)))
+                break
+        else:
+            stack.pop()
+
+
+def _tree_seq_post(has_branch: Callable[[T], Any], get_children: Callable[[T], Iterable[T]], root: T,
+                   max_depth: Union[int, None]) -> Iterator[T]:
+    if (max_depth is not None and max_depth <= 0) or not has_branch(root):
+        yield root
+        return
+
+    # Pairs of nodes and iterators of their remaining children
+    stack = [(root, iter(get_children(root)))]
+    push = stack.append
+    while stack:
+        for node in stack[-1][1]:
+            if (max_depth is None or len(stack) < max_depth) and has_branch(node):
+                push((node, iter(get_children(node))))
+                break
+            yield node
+        else:
+            yield stack.pop()[0]
+
+
+def _tree_seq_breadth(has_branch: Callable[[T], Any], get_children: Callable[[T], Iterable[T]], root: T,
+                      max_depth: Union[int, None]) -> Iterator[T]:
     yield root
-    if has_branch(root):
-        for child in get_children(root):
-            for subchild in tree_seq(has_branch, get_children, child):
-                yield subchild
+    if (max_depth is not None and max_depth <= 0) or not has_branch(root):
+        return
+
+    # Pairs of iterators of children and their depth
+    queue = collections.deque([(iter(get_children(root)), 1)])
+    push = queue.append
+    pop = queue.popleft
+    while queue:
+        children, depth = pop()
+        explore = max_depth is None or depth < max_depth
+        for node in children:
+            yield node
+            if explore and has_branch(node):
+                push((iter(get_children(node)), depth + 1))
 
 
 def dedupe(coll: Iterable[T]) -> Iterator[T]:
@@ -704,7 +1232,12 @@ def dedupe(coll: Iterable[T]) -> Iterator[T]:
 def empty(coll: T) -> Union[T, None]:
     """
     Returns an empty collection of the same type as ``coll``, or ``None``.
+
+    Collections can define a ``__clj_empty__`` method to return an empty
+    collection with the same parameters, e.g. the ``key`` of a ``SortedSet``.
     """
+    if hasattr(coll, "__clj_empty__"):
+        return cast(T, coll.__clj_empty__())
     if _is_collection_abc(coll):
         return type(coll)()
     return None
@@ -726,46 +1259,165 @@ def count(coll: Iterable[Any]) -> int:
     return n
 
 
-def partition(coll: Iterable[T], n: int, step: Union[int, None] = None, pad: Union[Iterable[T2], None] = None) \
-        -> Iterator[list[Union[T, T2]]]:
+def _window_slicer(coll: Sequence[Any], views: bool) -> Callable[[int, int], Sequence[Any]]:
+    """
+    Return a function that takes ``start`` and ``end`` and returns the corresponding window of ``coll``.
+    """
+    if views:
+        try:
+            buffer = memoryview(cast(bytes, coll))
+        except TypeError:
+            pass
+        else:
+            return lambda start, end: buffer[start:end]
+
+        if isinstance(coll, tuple):
+            return lambda start, end: coll[start:end]
+        return lambda start, end: tuple(coll[start:end])
+
+    if isinstance(coll, list):
+        return lambda start, end: coll[start:end]
+    return lambda start, end: list(coll[start:end])
+
+
+def _partition_sequence(coll: Sequence[Any], n: int, step: int, pad: Union[Iterable[Any], None], all_: bool,
+                        views: bool) -> Iterator[Sequence[Any]]:
+    window = _window_slicer(coll, views)
+    size = len(coll)
+
+    start = 0
+    while start + n <= size:
+        yield window(start, start + n)
+        start += step
+
+    yield from _partition_tail(window(start, size), n, step, pad, all_, views)
+
+
+def _partition_iterator(coll: Iterable[Any], n: int, step: int, pad: Union[Iterable[Any], None], all_: bool,
+                        views: bool) -> Iterator[Sequence[Any]]:
+    it = iter(coll)
+    copy: Callable[[Iterable[Any]], Sequence[Any]] = tuple if views else list
+
+    if step >= n:
+        skip = step - n
+        while True:
+            window = copy(itertools.islice(it, n))
+            if len(window) < n:
+                yield from _partition_tail(window, n, step, pad, all_, views)
+                return
+            yield window
+            if skip:
+                # consume ``skip`` elements
+                next(itertools.islice(it, skip, skip), None)
+
+    # Overlapping windows: keep the current one in a ring buffer, so producing the next one only needs ``step`` new
+    # elements.
+    ring: Deque[Any] = collections.deque(itertools.islice(it, n), maxlen=n)
+    if len(ring) < n:
+        yield from _partition_tail(copy(ring), n, step, pad, all_, views)
+        return
+
+    yield copy(ring)
+    pulled = 0
+    for e in it:
+        ring.append(e)
+        pulled += 1
+        if pulled == step:
+            yield copy(ring)
+            pulled = 0
+
+    # The ring contains the last complete partition without its first ``pulled`` elements, followed by the ``pulled``
+    # elements after it.
+    yield from _partition_tail(copy(itertools.islice(ring, step - pulled, None)), n, step, pad, all_, views)
+
+
+def _partition_tail(rest: Sequence[Any], n: int, step: int, pad: Union[Iterable[Any], None], all_: bool,
+                    views: bool) -> Iterator[Sequence[Any]]:
+    """
+    Yield the partitions that start after the last one with ``n`` elements, given the elements after it.
+    """
+    if all_:
+        while rest:
+            yield rest
+            rest = rest[step:]
+    elif rest and pad is not None:
+        missing = itertools.islice(pad, n - len(rest))
+        if views:
+            yield tuple(itertools.chain(rest, missing))
+        else:
+            yield list(itertools.chain(rest, missing))
+
+
+@overload
+def partition(coll: Iterable[T], n: int, step: Union[int, None] = None, pad: Union[Iterable[T2], None] = None,
+              views: Literal[False] = False) -> Iterator[list[Union[T, T2]]]:
+    ...
+
+
+@overload
+def partition(coll: Iterable[T], n: int, step: Union[int, None] = None, pad: Union[Iterable[T2], None] = None, *,
+              views: Literal[True]) -> Iterator[Sequence[Union[T, T2]]]:
+    ...
+
+
+def partition(coll: Iterable[T], n: int, step: Union[int, None] = None, pad: Union[Iterable[T2], None] = None,
+              views: bool = False) -> Iterator[Sequence[Union[T, T2]]]:
     """
     Returns a generator of lists of ``n`` items each, at offsets ``step`` apart. If ``step`` is not supplied, defaults
     to ``n``, i.e. the partitions do not overlap. If a ``pad`` collection is supplied, use its elements as necessary to
     complete last partition up to ``n`` items. In case there are not enough padding elements, return a partition with
     fewer than ``n`` items.
 
-    Note: ``step!=n`` is not supported for now.
+    Overlapping partitions (``step < n``) are produced from a ring buffer, so each one requires only ``step`` new
+    elements from ``coll``. Partitions of lists, tuples, ranges, strings and buffers are sliced out of ``coll`` without
+    iterating over it.
+
+    If ``views`` is ``True``, yield read-only partitions instead of lists: ``memoryview`` slices if ``coll`` supports
+    the buffer protocol (``bytes``, ``bytearray``, ``array.array``, …), which don’t copy anything, and tuples
+    otherwise. A padded partition is always a tuple in that case.
 
     Note: in Clojure, ``(partition 0 [1 2 3])`` returns an infinite lazy sequence of empty lists. To avoid issues this
     Python implementation returns an empty generator if called with n≤0.
     """
-    if n <= 0:
-        return
+    return _partition(coll, n, step, pad, False, views)
 
-    if step is not None and step != n:
-        # TODO
-        raise NotImplementedError("Step != n is not supported for now.")
 
-    current_partition: list[Union[T, T2]] = []
-    partition_index = 0
-    partition_end = n
+@overload
+def partition_all(coll: Iterable[T], n: int, step: Union[int, None] = None,
+                  views: Literal[False] = False) -> Iterator[list[T]]:
+    ...
 
-    for element in coll:
-        current_partition.append(element)
-        partition_index += 1
-        if partition_index == partition_end:
-            yield current_partition
-            current_partition = []
-            partition_index = 0
-            partition_end = n
-
-    if pad is not None and 0 < partition_index < partition_end:
-        for pad_element in pad:
-            current_partition.append(pad_element)
-            if partition_index == partition_end:
-                break
 
-        yield current_partition
+@overload
+def partition_all(coll: Iterable[T], n: int, step: Union[int, None] = None, *,
+                  views: Literal[True]) -> Iterator[Sequence[T]]:
+    ...
+
+
+def partition_all(coll: Iterable[T], n: int, step: Union[int, None] = None,
+                  views: bool = False) -> Iterator[Sequence[T]]:
+    """
+    Like ``partition``, but the generator may include partitions with fewer than ``n`` items at the end.
+
+    ``(partition-all n step coll)`` becomes ``partition_all(coll, n, step)``.
+    """
+    return _partition(coll, n, step, None, True, views)
+
+
+def _partition(coll: Iterable[Any], n: int, step: Union[int, None], pad: Union[Iterable[Any], None], all_: bool,
+               views: bool) -> Iterator[Sequence[Any]]:
+    if n <= 0:
+        return
+
+    if step is None:
+        step = n
+    elif step <= 0:
+        raise ValueError("step must be positive")
+
+    if isinstance(coll, _SLICEABLE_TYPES):
+        yield from _partition_sequence(coll, n, step, pad, all_, views)
+    else:
+        yield from _partition_iterator(coll, n, step, pad, all_, views)
 
 
 def partition_by(f: Callable[[T], Any], coll: Iterable[T]) -> Iterator[list[T]]:
@@ -0,0 +1,414 @@
+# -*- coding: UTF-8 -*-
+"""
+Bounded-memory replacements for the sets used by ``distinct`` and the counters used by ``frequencies``.
+
+``LRUWindow`` and ``BloomFilter`` implement ``x in s`` and ``s.add(x)``, so they can be passed as
+``distinct(coll, seen=…)``:
+
+    >>> from clj import distinct
+    >>> from clj.sketches import LRUWindow
+    >>> list(distinct([1, 2, 1, 3, 1, 2], seen=LRUWindow(2)))
+    [1, 2, 3, 2]
+
+``SpaceSaving`` and ``CountMinSketch`` count items approximately and can be passed as ``frequencies(coll, sketch=…)``:
+
+    >>> from clj import frequencies
+    >>> from clj.sketches import SpaceSaving
+    >>> frequencies("abracadabra", sketch=SpaceSaving(10)).top(2)
+    [('a', 5), ('b', 2)]
+
+Items are hashed with ``hash``, so they must be hashable, and a ``BloomFilter`` can only be used within a single
+process (the hash of strings changes between processes).
+"""
+import array
+import collections
+import hashlib
+import heapq
+import itertools
+import math
+import operator
+import sys
+from typing import Any, Hashable, Iterable, Iterator, Union
+
+_MASK64 = (1 << 64) - 1
+_SALT = 0x5BD1E995
+
+
+def _next_prime(n: int) -> int:
+    """
+    Return the smallest prime that is greater than or equal to ``n``. Hash tables of a prime size make every step of
+    double hashing coprime with the size, so that the ``k`` positions of an item are all distinct.
+    """
+    if n <= 2:
+        return 2
+    n |= 1
+    while any(n % d == 0 for d in range(3, math.isqrt(n) + 1, 2)):
+        n += 2
+    return n
+
+
+class LRUWindow(object):
+    """
+    A set that remembers only the ``size`` most recently seen items. Checking if an item is in the set counts as
+    seeing it, so an item that keeps coming back is never forgotten.
+
+    With ``distinct``, this removes the duplicates that are less than ``size`` distinct items apart, in constant memory.
+    """
+
+    def __init__(self, size: int):
+        if size <= 0:
+            raise ValueError("size must be positive")
+        self.size = size
+        self.evictions = 0
+        self._items: collections.OrderedDict[Hashable, None] = collections.OrderedDict()
+
+    def __contains__(self, item: Hashable) -> bool:
+        if item in self._items:
+            self._items.move_to_end(item)
+            return True
+        return False
+
+    def add(self, item: Hashable) -> None:
+        items = self._items
+        items[item] = None
+        items.move_to_end(item)
+        if len(items) > self.size:
+            items.popitem(last=False)
+            self.evictions += 1
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Return the number of items in the window, its size, the number of evicted items and the approximate memory
+        used by the window in bytes (not counting the items themselves).
+        """
+        return {
+            "items": len(self._items),
+            "size": self.size,
+            "evictions": self.evictions,
+            "bytes": sys.getsizeof(self._items),
+        }
+
+
+class BloomFilter(object):
+    """
+    A probabilistic set of at most ``capacity`` items that uses about ``1.44 * log2(1 / error_rate)`` bits per item.
+
+    ``x in s`` is always ``True`` if ``x`` was added. If it wasn’t, it’s ``True`` with a probability of at most
+    ``error_rate`` as long as no more than ``capacity`` items were added; the probability increases beyond that. With
+    ``distinct``, this means that a fraction ``error_rate`` of the distinct items may be wrongly dropped as duplicates,
+    but no duplicate is ever yielded.
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.01):
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        if not 0 < error_rate < 1:
+            raise ValueError("error_rate must be between 0 and 1")
+
+        self.capacity = capacity
+        self.error_rate = error_rate
+        # Optimal number of bits and of hash functions for the capacity and the error rate
+        self.bits = _next_prime(max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)))
+        self.hashes = max(1, round(self.bits / capacity * math.log(2)))
+        self.count = 0
+        self._array = bytearray((self.bits + 7) // 8)
+        self._hash_range = range(self.hashes)
+
+    def _start(self, item: Hashable) -> tuple[int, int]:
+        # Double hashing: the k positions are h1 + i * h2 for i in [0, k), with h2 in [1, bits) so that they're distinct
+        # as bits is prime. Hashing a tuple mixes the bits of the hash of the item, which is the item itself for small
+        # ints.
+        h = hash((item, _SALT)) & _MASK64
+        bits = self.bits
+        return (h & 0xFFFFFFFF) % bits, 1 + (h >> 32) % (bits - 1)
+
+    def __contains__(self, item: Hashable) -> bool:
+        array = self._array
+        bits = self.bits
+        pos, step = self._start(item)
+        for _ in self._hash_range:
+            if not array[pos >> 3] & (1 << (pos & 7)):
+                return False
+            pos += step
+            if pos >= bits:
+                pos -= bits
+        return True
+
+    def add(self, item: Hashable) -> None:
+        array = self._array
+        bits = self.bits
+        pos, step = self._start(item)
+        for _ in self._hash_range:
+            array[pos >> 3] |= 1 << (pos & 7)
+            pos += step
+            if pos >= bits:
+                pos -= bits
+        self.count += 1
+
+    def __len__(self) -> int:
+        """
+        Return the number of items added to the filter.
+        """
+        return self.count
+
+    def estimated_error_rate(self) -> float:
+        """
+        Return the probability that ``x in s`` is ``True`` for an item ``x`` that wasn’t added, given the number of
+        items added so far.
+        """
+        return float((1 - math.exp(-self.hashes * self.count / self.bits)) ** self.hashes)
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Return the number of items added, the capacity, the number of bits and hash functions, the memory used by
+        the bit array in bytes and the current estimated error rate.
+        """
+        return {
+            "items": self.count,
+            "capacity": self.capacity,
+            "bits": self.bits,
+            "hashes": self.hashes,
+            "bytes": len(self._array),
+            "error_rate": self.estimated_error_rate(),
+        }
+
+
+def _stable_hash(item: Hashable) -> int:
+    """
+    Return a 64-bit hash of ``item`` that is the same in all processes, unlike ``hash``, so that sketches built in
+    different processes can be merged.
+    """
+    if isinstance(item, str):
+        data = b"s" + item.encode("utf-8", "surrogatepass")
+    elif isinstance(item, bytes):
+        data = b"b" + item
+    elif isinstance(item, int):
+        data = b"i%d" % item
+    else:
+        data = b"r" + repr(item).encode("utf-8", "surrogatepass")
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), "little")
+
+
+class SpaceSaving(object):
+    """
+    Approximate counts of the most frequent items of a stream, using ``k`` counters (Space-Saving algorithm).
+
+    After ``n`` items were added, every item whose count is above ``n / k`` is in ``top()``. The count of a tracked
+    item is overestimated by at most ``n / k``; ``error(item)`` gives a tighter bound for each item.
+
+    Sketches built on different parts of a stream, possibly in different processes, can be merged with ``merge``. The
+    counts of the merged sketch are still overestimated by at most ``n / k`` and ``error(item)`` is still an upper
+    bound, but an item whose count is above ``n / k`` may be missing from it. Items must be hashable.
+    """
+
+    def __init__(self, k: int):
+        if k <= 0:
+            raise ValueError("k must be positive")
+        self.k = k
+        self.total = 0
+        self._counts: dict[Hashable, int] = {}
+        self._errors: dict[Hashable, int] = {}
+        # Min-heap of (count, n, item) with one entry per tracked item; counts may be outdated. n breaks ties so that
+        # items are never compared.
+        self._heap: list[tuple[int, int, Hashable]] = []
+        self._n = 0
+
+    def add(self, item: Hashable, count: int = 1) -> None:
+        counts = self._counts
+        self.total += count
+        if item in counts:
+            counts[item] += count
+            return
+
+        if len(counts) < self.k:
+            counts[item] = count
+            self._errors[item] = 0
+            self._push(count, item)
+            return
+
+        # Replace the item with the smallest count
+        heap = self._heap
+        while True:
+            old_count, _, old_item = heap[0]
+            current = counts[old_item]
+            if current == old_count:
+                break
+            heapq.heapreplace(heap, (current, self._next(), old_item))
+
+        del counts[old_item]
+        del self._errors[old_item]
+        counts[item] = old_count + count
+        self._errors[item] = old_count
+        heapq.heapreplace(heap, (old_count + count, self._next(), item))
+
+    def update(self, items: Iterable[Hashable]) -> None:
+        """
+        Add all the items of an iterable.
+        """
+        add = self.add
+        for item in items:
+            add(item)
+
+    def _next(self) -> int:
+        self._n += 1
+        return self._n
+
+    def _push(self, count: int, item: Hashable) -> None:
+        heapq.heappush(self._heap, (count, self._next(), item))
+
+    def _min_count(self) -> int:
+        """
+        Return the maximal count of an item that isn’t tracked.
+        """
+        if len(self._counts) < self.k:
+            return 0
+        return min(self._counts.values())
+
+    def __getitem__(self, item: Hashable) -> int:
+        """
+        Return the estimated count of ``item``: an upper bound of its actual count, or 0 if it isn’t tracked.
+        """
+        return self._counts.get(item, 0)
+
+    def error(self, item: Hashable) -> int:
+        """
+        Return the maximal overestimation of the count of ``item``. For an item that isn’t tracked, this is the
+        maximal count it may have.
+        """
+        if item in self._errors:
+            return self._errors[item]
+        return self._min_count()
+
+    def top(self, n: Union[int, None] = None) -> list[tuple[Hashable, int]]:
+        """
+        Return the ``n`` items with the highest estimated counts (all tracked items by default) with their counts, in
+        decreasing order of counts.
+        """
+        items = sorted(self._counts.items(), key=operator.itemgetter(1), reverse=True)
+        return items if n is None else items[:n]
+
+    def merge(self, other: "SpaceSaving") -> "SpaceSaving":
+        """
+        Return a new sketch of ``k`` counters for the union of the streams of ``self`` and ``other``.
+        """
+        merged = SpaceSaving(self.k)
+        merged.total = self.total + other.total
+
+        min_self = self._min_count()
+        min_other = other._min_count()
+        counts: dict[Hashable, int] = {}
+        errors: dict[Hashable, int] = {}
+        for item in itertools.chain(self._counts, other._counts):
+            if item in counts:
+                continue
+            # An item that isn’t tracked by a sketch may have a count of up to its smallest count in its stream
+            counts[item] = self._counts.get(item, min_self) + other._counts.get(item, min_other)
+            errors[item] = self._errors.get(item, min_self) + other._errors.get(item, min_other)
+
+        for item, count in heapq.nlargest(self.k, counts.items(), key=operator.itemgetter(1)):
+            merged._counts[item] = count
+            merged._errors[item] = errors[item]
+            merged._push(count, item)
+        return merged
+
+    def __len__(self) -> int:
+        """
+        Return the number of tracked items.
+        """
+        return len(self._counts)
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Return the number of tracked items, the number of counters, the number of items added and the approximate
+        memory used by the counters in bytes (not counting the items themselves).
+        """
+        return {
+            "items": len(self._counts),
+            "k": self.k,
+            "total": self.total,
+            "bytes": sys.getsizeof(self._counts) + sys.getsizeof(self._errors) + sys.getsizeof(self._heap),
+        }
+
+
+class CountMinSketch(object):
+    """
+    Approximate counts of all the items of a stream in a fixed amount of memory (Count-Min sketch).
+
+    ``s[item]`` is never below the actual count of ``item``. After ``n`` items were added, it is above it by more than
+    ``error * n`` with a probability of at most ``1 - confidence``. The sketch uses ``e / error`` counters, rounded up
+    to a prime, in each of ``ln(1 / (1 - confidence))`` rows. It doesn’t remember the items, so it can’t list the most
+    frequent ones; use ``SpaceSaving`` for that.
+
+    Items are hashed in the same way in all processes, so sketches with the same parameters built in different
+    processes can be merged with ``merge``. Strings, bytes and integers are hashed by value, other items by their
+    ``repr``.
+    """
+
+    def __init__(self, error: float = 0.001, confidence: float = 0.99):
+        if not 0 < error < 1:
+            raise ValueError("error must be between 0 and 1")
+        if not 0 < confidence < 1:
+            raise ValueError("confidence must be between 0 and 1")
+        self.error = error
+        self.confidence = confidence
+        self.width = _next_prime(math.ceil(math.e / error))
+        self.depth = math.ceil(math.log(1 / (1 - confidence)))
+        self.total = 0
+        self._rows = [array.array("q", [0]) * self.width for _ in range(self.depth)]
+
+    def _positions(self, item: Hashable) -> Iterator[tuple["array.array[int]", int]]:
+        h = _stable_hash(item)
+        width = self.width
+        pos = (h & 0xFFFFFFFF) % width
+        # width is prime, so the positions of an item are distinct in the first width rows
+        step = 1 + (h >> 32) % (width - 1)
+        for row in self._rows:
+            yield row, pos
+            pos = (pos + step) % width
+
+    def add(self, item: Hashable, count: int = 1) -> None:
+        self.total += count
+        for row, pos in self._positions(item):
+            row[pos] += count
+
+    def update(self, items: Iterable[Hashable]) -> None:
+        """
+        Add all the items of an iterable.
+        """
+        add = self.add
+        for item in items:
+            add(item)
+
+    def __getitem__(self, item: Hashable) -> int:
+        """
+        Return the estimated count of ``item``.
+        """
+        return min(row[pos] for row, pos in self._positions(item))
+
+    def merge(self, other: "CountMinSketch") -> "CountMinSketch":
+        """
+        Return a new sketch for the union of the streams of ``self`` and ``other``, which must have the same
+        parameters.
+        """
+        if (self.width, self.depth) != (other.width, other.depth):
+            raise ValueError("can’t merge sketches with different parameters")
+        merged = CountMinSketch(self.error, self.confidence)
+        merged.total = self.total + other.total
+        merged._rows = [array.array("q", map(operator.add, row, other_row))
+                        for row, other_row in zip(self._rows, other._rows)]
+        return merged
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Return the number of items added, the number of counters per row, the number of rows and the approximate
+        memory used by the counters in bytes.
+        """
+        return {
+            "total": self.total,
+            "width": self.width,
+            "depth": self.depth,
+            "bytes": sum(row.itemsize * len(row) for row in self._rows),
+        }
@@ -0,0 +1,443 @@
+# -*- coding: UTF-8 -*-
+"""
+Sorted collections: ``SortedSet`` and ``SortedMap``, with ``subseq`` and ``rsubseq`` to walk a range of their keys.
+
+Items are kept in a list of sorted sublists of at most ``2 * _LOAD`` items, along with the last key of each sublist.
+Finding an item takes two binary searches; adding or removing one also moves the items that follow it in its sublist.
+This is a two-level B+ tree whose nodes are Python lists, which in practice is much faster than a balanced tree or a
+skip list of Python objects.
+
+The collections are mutable. Keys must be totally ordered, and must not be modified while they are in a collection.
+"""
+import bisect
+import collections.abc as collections_abc
+import itertools
+import operator
+from typing import Any, Callable, Generic, Iterable, Iterator, TypeVar, Union, cast
+
+from clj.seqs import _nil
+
+T = TypeVar('T')
+K = TypeVar('K')
+V = TypeVar('V')
+
+# Half the maximal size of a sublist
+_LOAD = 512
+
+
+class _Sorted(Generic[T]):
+    """
+    Items sorted by their key, with the columns of the collection stored in parallel sublists: the keys, then the items
+    if they are not their own key, then the values for a map.
+    """
+
+    def __init__(self, key: Union[Callable[[Any], Any], None], values: bool):
+        self.key = key
+        self._maxes: list[Any] = []
+        self._keys: list[list[Any]] = []
+        self._items = self._keys if key is None else []
+        self._columns = [self._keys] if key is None else [self._keys, self._items]
+        self._values: Union[list[list[Any]], None] = None
+        if values:
+            self._values = []
+            self._columns.append(self._values)
+        self._len = 0
+
+    def _load(self, rows: list[tuple[Any, ...]], keep_last: bool) -> None:
+        """
+        Fill the empty collection with rows of columns, in any order. When rows have the same key, keep the first one,
+        or the last one if ``keep_last`` is true.
+        """
+        if keep_last:
+            rows.reverse()
+        # The sort is stable, so the first row of each key is the first (or last) one that was given
+        rows.sort(key=operator.itemgetter(0))
+        rows = [next(group) for _, group in itertools.groupby(rows, operator.itemgetter(0))]
+        self._fill([list(values) for values in zip(*rows)])
+
+    def _fill(self, columns: list[list[Any]]) -> None:
+        """
+        Fill the empty collection with sorted columns without duplicate keys.
+        """
+        for column, values in zip(self._columns, columns):
+            column.extend(values[i:i + _LOAD] for i in range(0, len(values), _LOAD))
+        self._maxes = [keys[-1] for keys in self._keys]
+        self._len = len(columns[0]) if columns else 0
+
+    def _find(self, k: Any) -> tuple[int, int]:
+        """
+        Return the position of the first item whose key is not lower than ``k``: the index of its sublist and its index
+        in the sublist. The index of the sublist is the number of sublists if there is no such item.
+        """
+        maxes = self._maxes
+        i = bisect.bisect_left(maxes, k)
+        if i == len(maxes):
+            return i, 0
+        return i, bisect.bisect_left(self._keys[i], k)
+
+    def _find_right(self, k: Any) -> tuple[int, int]:
+        """
+        Return the position of the first item whose key is greater than ``k``.
+        """
+        maxes = self._maxes
+        i = bisect.bisect_right(maxes, k)
+        if i == len(maxes):
+            return i, 0
+        return i, bisect.bisect_right(self._keys[i], k)
+
+    def _found(self, i: int, j: int, k: Any) -> bool:
+        return i < len(self._maxes) and self._keys[i][j] == k
+
+    def _insert(self, i: int, j: int, row: tuple[Any, ...]) -> None:
+        """
+        Insert the columns of an item at a position returned by ``_find``.
+        """
+        maxes = self._maxes
+        columns = self._columns
+        if not maxes:
+            for column, x in zip(columns, row):
+                column.append([x])
+            maxes.append(row[0])
+            self._len = 1
+            return
+
+        if i == len(maxes):
+            i -= 1
+            j = len(self._keys[i])
+
+        for column, x in zip(columns, row):
+            column[i].insert(j, x)
+        keys = self._keys[i]
+        maxes[i] = keys[-1]
+        self._len += 1
+
+        if len(keys) > 2 * _LOAD:
+            for column in columns:
+                sublist = column[i]
+                column.insert(i + 1, sublist[_LOAD:])
+                del sublist[_LOAD:]
+            maxes.insert(i, self._keys[i][-1])
+
+    def _delete(self, i: int, j: int) -> None:
+        for column in self._columns:
+            del column[i][j]
+        self._len -= 1
+
+        keys = self._keys[i]
+        if keys:
+            self._maxes[i] = keys[-1]
+        else:
+            for column in self._columns:
+                del column[i]
+            del self._maxes[i]
+
+    def _locate(self, index: int) -> tuple[int, int]:
+        """
+        Return the position of the item at ``index``.
+        """
+        if index < 0:
+            index += self._len
+        if not 0 <= index < self._len:
+            raise IndexError("index out of range")
+        for i, keys in enumerate(self._keys):
+            if index < len(keys):
+                return i, index
+            index -= len(keys)
+        raise IndexError("index out of range")  # pragma: no cover
+
+    def _slice(self, column: list[list[Any]], start: Any, start_inclusive: bool, end: Any, end_inclusive: bool,
+               reverse: bool) -> Iterator[Any]:
+        """
+        Return a generator of the items of a column whose key is between ``start`` and ``end`` (``_nil`` for no bound).
+        """
+        if start is _nil:
+            i0, j0 = 0, 0
+        else:
+            i0, j0 = self._find(start) if start_inclusive else self._find_right(start)
+        if end is _nil:
+            i1, j1 = len(self._maxes), 0
+        else:
+            i1, j1 = self._find_right(end) if end_inclusive else self._find(end)
+
+        if (i0, j0) >= (i1, j1):
+            return
+
+        if i0 == i1:
+            sublist = column[i0][j0:j1]
+            yield from reversed(sublist) if reverse else sublist
+            return
+
+        if not reverse:
+            yield from column[i0][j0:]
+            for i in range(i0 + 1, i1):
+                yield from column[i]
+            if i1 < len(column):
+                yield from column[i1][:j1]
+        else:
+            if i1 < len(column):
+                yield from reversed(column[i1][:j1])
+            for i in range(i1 - 1, i0, -1):
+                yield from reversed(column[i])
+            yield from reversed(column[i0][j0:])
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __bool__(self) -> bool:
+        return self._len > 0
+
+
+class SortedSet(_Sorted[T], collections_abc.MutableSet[T]):
+    """
+    A set whose items are iterated over in sorted order, or sorted by ``key(item)`` if ``key`` is given. Two items are
+    the same if their keys are equal; items don’t need to be hashable.
+
+    Adding, removing and finding an item take logarithmic time; so does iterating over a range of items with
+    ``subseq``. ``s[i]`` returns the ``i``-th item.
+    """
+
+    def __init__(self, iterable: Iterable[T] = (), key: Union[Callable[[T], Any], None] = None):
+        super().__init__(key, False)
+        if key is None:
+            self._fill([[k for k, _ in itertools.groupby(sorted(cast(Iterable[Any], iterable)))]])
+        else:
+            self._load([(key(item), item) for item in iterable], False)
+
+    def add(self, item: T) -> None:
+        k = item if self.key is None else self.key(item)
+        i, j = self._find(k)
+        if not self._found(i, j, k):
+            self._insert(i, j, (k,) if self.key is None else (k, item))
+
+    def discard(self, item: T) -> None:
+        k = item if self.key is None else self.key(item)
+        i, j = self._find(k)
+        if self._found(i, j, k):
+            self._delete(i, j)
+
+    def __contains__(self, item: object) -> bool:
+        k = item if self.key is None else self.key(item)
+        return self._found(*self._find(k), k)
+
+    def __iter__(self) -> Iterator[T]:
+        return itertools.chain.from_iterable(self._items)
+
+    def __reversed__(self) -> Iterator[T]:
+        return itertools.chain.from_iterable(map(reversed, reversed(self._items)))
+
+    def __getitem__(self, index: int) -> T:
+        i, j = self._locate(index)
+        item: T = self._items[i][j]
+        return item
+
+    def _from_iterable(self, iterable: Iterable[T]) -> "SortedSet[T]":  # type: ignore[override]
+        # Used by the set operators, e.g. ``s | t``
+        return SortedSet(iterable, self.key)
+
+    def _range(self, *args: Any) -> Iterator[T]:
+        return self._slice(self._items, *args)
+
+    def __clj_empty__(self) -> "SortedSet[T]":
+        return SortedSet(key=self.key)
+
+    def __repr__(self) -> str:
+        if self.key is None:
+            return "SortedSet(%r)" % list(self)
+        return "SortedSet(%r, key=%r)" % (list(self), self.key)
+
+
+class SortedMap(_Sorted[K], collections_abc.MutableMapping[K, V]):
+    """
+    A mapping whose keys are iterated over in sorted order, or sorted by ``key(k)`` if ``key`` is given. Keys don’t
+    need to be hashable.
+
+    Getting, setting and deleting a key take logarithmic time; so does iterating over a range of keys with ``subseq``,
+    which yields ``(key, value)`` pairs.
+    """
+
+    def __init__(self, items: Union[Iterable[tuple[K, V]], "collections_abc.Mapping[K, V]"] = (),
+                 key: Union[Callable[[K], Any], None] = None):
+        super().__init__(key, True)
+        if isinstance(items, collections_abc.Mapping):
+            items = items.items()
+        if key is None:
+            pairs = list(items)
+            try:
+                mapping = dict(pairs)
+            except TypeError:
+                # Unhashable keys
+                self._load(pairs, True)
+            else:
+                keys = sorted(mapping)
+                self._fill([keys, list(map(mapping.__getitem__, keys))])
+        else:
+            self._load([(key(k), k, v) for k, v in items], True)
+
+    def _sort_key(self, k: Any) -> Any:
+        return k if self.key is None else self.key(k)
+
+    def __getitem__(self, k: K) -> V:
+        sort_key = self._sort_key(k)
+        i, j = self._find(sort_key)
+        if not self._found(i, j, sort_key):
+            raise KeyError(k)
+        assert self._values is not None
+        value: V = self._values[i][j]
+        return value
+
+    def __setitem__(self, k: K, value: V) -> None:
+        sort_key = self._sort_key(k)
+        i, j = self._find(sort_key)
+        if self._found(i, j, sort_key):
+            assert self._values is not None
+            self._values[i][j] = value
+        else:
+            self._insert(i, j, (k, value) if self.key is None else (sort_key, k, value))
+
+    def __delitem__(self, k: K) -> None:
+        sort_key = self._sort_key(k)
+        i, j = self._find(sort_key)
+        if not self._found(i, j, sort_key):
+            raise KeyError(k)
+        self._delete(i, j)
+
+    def __contains__(self, k: object) -> bool:
+        sort_key = self._sort_key(k)
+        return self._found(*self._find(sort_key), sort_key)
+
+    def __iter__(self) -> Iterator[K]:
+        return itertools.chain.from_iterable(self._items)
+
+    def __reversed__(self) -> Iterator[K]:
+        return itertools.chain.from_iterable(map(reversed, reversed(self._items)))
+
+    def items(self) -> "_ItemsView[K, V]":
+        return _ItemsView(self)
+
+    def values(self) -> "_ValuesView[V]":
+        return _ValuesView(self)
+
+    def _entries(self) -> Iterator[tuple[K, V]]:
+        assert self._values is not None
+        return zip(self, itertools.chain.from_iterable(self._values))
+
+    def _range(self, *args: Any) -> Iterator[tuple[K, V]]:
+        assert self._values is not None
+        return zip(self._slice(self._items, *args), self._slice(self._values, *args))
+
+    def __clj_empty__(self) -> "SortedMap[K, V]":
+        return SortedMap(key=self.key)
+
+    def __repr__(self) -> str:
+        if self.key is None:
+            return "SortedMap(%r)" % list(self.items())
+        return "SortedMap(%r, key=%r)" % (list(self.items()), self.key)
+
+
+class _ItemsView(collections_abc.ItemsView[K, V]):
+    _mapping: SortedMap[K, V]
+
+    def __iter__(self) -> Iterator[tuple[K, V]]:
+        return self._mapping._entries()
+
+    def __reversed__(self) -> Iterator[tuple[K, V]]:
+        mapping = self._mapping
+        assert mapping._values is not None
+        return zip(reversed(mapping), itertools.chain.from_iterable(map(reversed, reversed(mapping._values))))
+
+
+class _ValuesView(collections_abc.ValuesView[V]):
+    _mapping: SortedMap[Any, V]
+
+    def __iter__(self) -> Iterator[V]:
+        values = self._mapping._values
+        assert values is not None
+        return itertools.chain.from_iterable(values)
+
+
+def sorted_set(*keys: T) -> SortedSet[T]:
+    """
+    Returns a new ``SortedSet`` with the supplied keys.
+    """
+    return SortedSet(keys)
+
+
+def sorted_set_by(key: Callable[[T], Any], *keys: T) -> SortedSet[T]:
+    """
+    Returns a new ``SortedSet`` with the supplied keys, sorted by ``key(k)``. Unlike in Clojure, ``key`` is a key
+    function, like the one of Python’s ``sorted``, rather than a comparator.
+    """
+    return SortedSet(keys, key)
+
+
+def _pairs(keyvals: tuple[Any, ...]) -> Iterator[tuple[Any, Any]]:
+    if len(keyvals) % 2:
+        raise ValueError("no value supplied for key: %r" % (keyvals[-1],))
+    it = iter(keyvals)
+    return zip(it, it)
+
+
+def sorted_map(*keyvals: Any) -> SortedMap[Any, Any]:
+    """
+    Returns a new ``SortedMap`` with the supplied mappings: ``sorted_map(k1, v1, k2, v2, …)``.
+    """
+    return SortedMap(_pairs(keyvals))
+
+
+def sorted_map_by(key: Callable[[Any], Any], *keyvals: Any) -> SortedMap[Any, Any]:
+    """
+    Returns a new ``SortedMap`` with the supplied mappings, sorted by ``key(k)``. See ``sorted_set_by``.
+    """
+    return SortedMap(_pairs(keyvals), key)
+
+
+# The tests accepted by subseq and rsubseq: whether they bound the start or the end of the range, and if it’s inclusive
+_TESTS = {
+    operator.gt: (True, False),
+    operator.ge: (True, True),
+    operator.lt: (False, False),
+    operator.le: (False, True),
+}
+
+
+def _bounds(test: Callable[[Any, Any], bool], key: Any, end_test: Union[Callable[[Any, Any], bool], None],
+            end_key: Any) -> tuple[Any, bool, Any, bool]:
+    if test not in _TESTS or (end_test is not None and end_test not in _TESTS):
+        raise ValueError("tests must be operator.gt, operator.ge, operator.lt or operator.le")
+
+    is_start, inclusive = _TESTS[test]
+    if end_test is None:
+        if is_start:
+            return key, inclusive, _nil, False
+        return _nil, False, key, inclusive
+
+    end_is_start, end_inclusive = _TESTS[end_test]
+    if not is_start or end_is_start:
+        raise ValueError("the first test must be operator.gt or operator.ge and the second one operator.lt or "
+                         "operator.le")
+    return key, inclusive, end_key, end_inclusive
+
+
+def subseq(sc: Union[SortedSet[Any], SortedMap[Any, Any]], test: Callable[[Any, Any], bool], key: Any,
+           end_test: Union[Callable[[Any, Any], bool], None] = None, end_key: Any = None) -> Iterator[Any]:
+    """
+    Returns a generator of the items of the sorted collection ``sc`` (``(key, value)`` pairs for a ``SortedMap``) for
+    which ``test(k, key)`` is true, in ascending order. ``test`` is one of ``operator.gt``, ``operator.ge``,
+    ``operator.lt`` or ``operator.le``, and ``k`` is the key of the item (``sc.key(item)`` if the collection has a key
+    function).
+
+    ``subseq(sc, start_test, start_key, end_test, end_key)`` yields the items between two bounds, where ``start_test``
+    is ``operator.gt`` or ``operator.ge`` and ``end_test`` is ``operator.lt`` or ``operator.le``.
+
+    The first item is found in logarithmic time, and the collection must not be modified until the generator is
+    exhausted.
+    """
+    return sc._range(*_bounds(test, key, end_test, end_key), False)
+
+
+def rsubseq(sc: Union[SortedSet[Any], SortedMap[Any, Any]], test: Callable[[Any, Any], bool], key: Any,
+            end_test: Union[Callable[[Any, Any], bool], None] = None, end_key: Any = None) -> Iterator[Any]:
+    """
+    Like ``subseq``, but yields the items in descending order.
+    """
+    return sc._range(*_bounds(test, key, end_test, end_key), True)
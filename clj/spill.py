@@ -0,0 +1,200 @@
+# -*- coding: UTF-8 -*-
+"""
+Groups that don’t fit in memory, used by ``group_by(f, coll, max_items=n)``.
+
+Items are buffered in memory by group. When more than ``max_items`` items are buffered, all the buffers are pickled to
+a temporary file and emptied. Reading a group loads its pickled buffers one by one, so iterating over a group uses at
+most ``max_items`` items of memory, whatever its size.
+
+Each pickled buffer is preceded by the offset of the previous buffer of its group, so the buffers of a group form a
+chain in the file. Besides the buffers, only the number of items and the offset of the last buffer of each group stay
+in memory, however many spills a group spans.
+"""
+import os
+import pickle
+import struct
+import tempfile
+from typing import IO, Any, Callable, Generic, Iterable, Iterator, Mapping, TypeVar, Union
+
+T = TypeVar('T')
+K = TypeVar('K')
+
+# Offset of the previous buffer of the same group, or -1, written before each pickled buffer
+_header = struct.Struct("<q")
+
+
+class Group(Generic[T]):
+    """
+    The items of a group of ``SpilledGroups``, in the order they appeared in the grouped collection. Each iteration
+    reads them again from the disk.
+    """
+
+    def __init__(self, groups: "SpilledGroups[Any, T]", key: Any):
+        self._groups = groups
+        self._key = key
+
+    def __iter__(self) -> Iterator[T]:
+        groups = self._groups
+        buffer = groups._buffers.get(self._key, ())
+        if groups._counts[self._key] - len(buffer) <= groups.max_items:
+            # The spilled items fit in memory: load them while walking the chain, which takes one seek per buffer
+            for spilled in reversed(groups._load_chain(self._key)):
+                yield from spilled
+        else:
+            for offset in groups._chain(self._key):
+                yield from groups._load(offset)
+        yield from buffer
+
+    def __len__(self) -> int:
+        return self._groups._counts[self._key]
+
+    def __repr__(self) -> str:
+        return "<Group %r (%d items)>" % (self._key, len(self))
+
+
+class SpilledGroups(Mapping[K, Group[T]]):
+    """
+    A mapping of keys to ``Group`` objects, in the order the keys were first seen. It’s filled with ``add`` and is
+    read-only otherwise. The temporary file is deleted when the mapping is closed or garbage-collected; it can be used
+    as a context manager.
+    """
+
+    def __init__(self, max_items: int, spill_dir: Union[str, "os.PathLike[str]", None] = None):
+        if max_items <= 0:
+            raise ValueError("max_items must be positive")
+        self.max_items = max_items
+        self.spills = 0
+        self._spill_dir = spill_dir
+        self._file: Union[IO[bytes], None] = None
+        # Number of items of each group; also records the keys in the order they were first seen
+        self._counts: dict[K, int] = {}
+        # Offset of the last pickled buffer of each group in the file
+        self._last: dict[K, int] = {}
+        self._buffers: dict[K, list[T]] = {}
+        self._buffered = 0
+
+    def add(self, key: K, item: T) -> None:
+        """
+        Add ``item`` at the end of the group of ``key``, and spill the buffered items to the disk if there are
+        ``max_items`` of them.
+        """
+        counts = self._counts
+        counts[key] = counts.get(key, 0) + 1
+
+        buffer = self._buffers.get(key)
+        if buffer is None:
+            self._buffers[key] = buffer = []
+        buffer.append(item)
+
+        self._buffered += 1
+        if self._buffered >= self.max_items:
+            self._spill()
+
+    def _spill(self) -> None:
+        f = self._file
+        if f is None:
+            f = self._file = tempfile.TemporaryFile(dir=self._spill_dir)
+        f.seek(0, os.SEEK_END)
+
+        last = self._last
+        pack = _header.pack
+        offset = f.tell()
+        for key, buffer in self._buffers.items():
+            f.write(pack(last.get(key, -1)))
+            pickle.dump(buffer, f, pickle.HIGHEST_PROTOCOL)
+            last[key] = offset
+            offset = f.tell()
+
+        self._buffers = {}
+        self._buffered = 0
+        self.spills += 1
+
+    def _chain(self, key: K) -> list[int]:
+        """
+        Return the offsets of the pickled buffers of the group of ``key``, in the order they were written.
+        """
+        offsets: list[int] = []
+        offset = self._last.get(key, -1)
+        if offset < 0:
+            return offsets
+
+        f = self._open_file()
+        seek, read, unpack, size = f.seek, f.read, _header.unpack, _header.size
+        while offset >= 0:
+            offsets.append(offset)
+            seek(offset)
+            offset, = unpack(read(size))
+        offsets.reverse()
+        return offsets
+
+    def _load_chain(self, key: K) -> list[list[T]]:
+        """
+        Return the pickled buffers of the group of ``key``, from the last one written to the first one.
+        """
+        buffers: list[list[T]] = []
+        offset = self._last.get(key, -1)
+        if offset < 0:
+            return buffers
+
+        f = self._open_file()
+        seek, read, unpack, size, load = f.seek, f.read, _header.unpack, _header.size, pickle.load
+        while offset >= 0:
+            seek(offset)
+            offset, = unpack(read(size))
+            buffers.append(load(f))
+        return buffers
+
+    def _load(self, offset: int) -> list[T]:
+        f = self._open_file()
+        f.seek(offset + _header.size)
+        buffer: list[T] = pickle.load(f)
+        return buffer
+
+    def _open_file(self) -> IO[bytes]:
+        if self._file is None:
+            raise ValueError("the groups are closed")
+        return self._file
+
+    def __getitem__(self, key: K) -> Group[T]:
+        if key not in self._counts:
+            raise KeyError(key)
+        return Group(self, key)
+
+    def __iter__(self) -> Iterator[K]:
+        return iter(self._counts)
+
+    def __len__(self) -> int:
+        return len(self._counts)
+
+    def close(self) -> None:
+        """
+        Delete the temporary file. The spilled items can no longer be read.
+        """
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self) -> "SpilledGroups[K, T]":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def __repr__(self) -> str:
+        return "<SpilledGroups: %d groups, %d spills>" % (len(self), self.spills)
+
+
+def group_by(f: Callable[[T], K], coll: Iterable[T], max_items: int,
+             spill_dir: Union[str, "os.PathLike[str]", None] = None) -> SpilledGroups[K, T]:
+    """
+    Group the items of ``coll`` by ``f``, keeping at most ``max_items`` items in memory.
+    """
+    groups: SpilledGroups[K, T] = SpilledGroups(max_items, spill_dir)
+    add = groups.add
+    try:
+        for e in coll:
+            add(f(e), e)
+    except BaseException:
+        groups.close()
+        raise
+    return groups
@@ -0,0 +1,681 @@
+# -*- coding: UTF-8 -*-
+"""
+Transducers: composable transformations of reducing functions.
+
+A reducing function ``rf`` has two arities: ``rf(result, input)`` is the step and ``rf(result)`` completes the
+reduction. A transducer (or "xform") is a function that takes a reducing function and returns a new one. Transducers
+compose with ``clj.comp``, and the resulting chain runs in a single loop instead of one generator per stage:
+
+    >>> import operator
+    >>> from clj import comp, inc, is_even, transduce
+    >>> from clj import transducers as xf
+    >>> transduce(comp(xf.map(inc), xf.filter(is_even), xf.take(3)), operator.add, range(100), 0)
+    12
+
+As in Clojure, the transducers are applied left-to-right: the example above increments *then* filters.
+"""
+import array
+import builtins
+import collections
+import collections.abc as collections_abc
+from typing import Any, Callable, Deque, Generic, Hashable, Iterable, Iterator, TypeVar, Union
+
+from clj import persistent
+from clj.seqs import _nil, _Nil
+
+T = TypeVar('T')
+
+# A reducing function: rf(result, input) -> result (step) and rf(result) -> result (completion)
+ReducingFn = Callable[..., Any]
+Transducer = Callable[[ReducingFn], ReducingFn]
+
+
+class Reduced(Generic[T]):
+    """
+    Wrapper around a value to signal that the reduction must stop. Use ``reduced`` to create one.
+    """
+    __slots__ = ("value",)
+
+    def __init__(self, value: T):
+        self.value = value
+
+
+def reduced(x: T) -> Reduced[T]:
+    """
+    Wraps ``x`` in a way such that a reduction will terminate with the value ``x``.
+    """
+    return Reduced(x)
+
+
+def is_reduced(x: Any) -> bool:
+    """
+    Returns ``True`` if ``x`` is the result of a call to ``reduced``.
+    """
+    return isinstance(x, Reduced)
+
+
+def ensure_reduced(x: Any) -> Reduced[Any]:
+    """
+    If ``x`` is already reduced, returns it, else returns ``reduced(x)``.
+    """
+    return x if isinstance(x, Reduced) else Reduced(x)
+
+
+def unreduced(x: Any) -> Any:
+    """
+    If ``x`` is reduced, returns the value it wraps, else returns ``x``.
+    """
+    return x.value if isinstance(x, Reduced) else x
+
+
+def _preserving_reduced(rf: ReducingFn) -> ReducingFn:
+    # Used by nested reductions (cat) so that a reduced value also stops the outer reduction
+    def _rf(result: Any, input: Any) -> Any:
+        ret = rf(result, input)
+        if isinstance(ret, Reduced):
+            return Reduced(ret)
+        return ret
+
+    return _rf
+
+
+def _reduce(rf: ReducingFn, init: Any, coll: Iterable[Any]) -> Any:
+    result = init
+    for e in coll:
+        result = rf(result, e)
+        if isinstance(result, Reduced):
+            return result.value
+    return result
+
+
+def _bottom_rf(f: Callable[[Any, Any], Any]) -> ReducingFn:
+    # Turn a plain function of two arguments into a reducing function. ``_nil`` as a result means there was no initial
+    # value: the first input becomes the accumulator.
+    def _rf(result: Any, input: Any = _nil) -> Any:
+        if input is _nil:
+            return None if result is _nil else result
+        if result is _nil:
+            return input
+        return f(result, input)
+
+    return _rf
+
+
+def transduce(xform: Transducer, f: Callable[[Any, Any], Any], coll: Iterable[Any], init: Any = _nil) -> Any:
+    """
+    Reduce ``coll`` with ``xform(f)``, starting with ``init``. ``f`` is a function of two arguments, the accumulated
+    result and an input; it may return ``reduced(result)`` to stop the reduction early.
+
+    ``(transduce xform f init coll)`` becomes ``transduce(xform, f, coll, init)``. If ``init`` is not supplied, the
+    first element that reaches ``f`` is used instead, like in ``reductions``; if no element reaches ``f``, returns
+    ``None``.
+    """
+    rf = xform(_bottom_rf(f))
+    return rf(_reduce(rf, init, coll))
+
+
+class Eduction(Iterable[Any]):
+    """
+    A reducible and iterable application of a transducer to a collection. See ``eduction``.
+    """
+
+    def __init__(self, xform: Transducer, coll: Iterable[Any]):
+        self.xform = xform
+        self.coll = coll
+
+    def __iter__(self) -> Iterator[Any]:
+        buffer: Deque[Any] = collections.deque()
+        append = buffer.append
+        popleft = buffer.popleft
+
+        def _append(result: Any, input: Any = _nil) -> Any:
+            if input is not _nil:
+                append(input)
+            return result
+
+        rf = self.xform(_append)
+
+        for e in self.coll:
+            result = rf(None, e)
+            while buffer:
+                yield popleft()
+            if isinstance(result, Reduced):
+                break
+
+        rf(None)
+        while buffer:
+            yield popleft()
+
+
+def eduction(xform: Transducer, coll: Iterable[Any]) -> Eduction:
+    """
+    Returns a lazy iterable of the application of the transducer ``xform`` to the items in ``coll``. The whole chain of
+    transformations runs in one loop. Each iteration runs the transformations again, so an eduction over a list can
+    be iterated several times.
+    """
+    return Eduction(xform, coll)
+
+
+def _pairs(items: Iterable[Any], key: Union[Callable[[Any], Any], None],
+           value: Union[Callable[[Any], Any], None]) -> Iterable[tuple[Any, Any]]:
+    """
+    Return the ``(key(x), value(x))`` pairs of ``items``; a missing function is the identity.
+    """
+    if isinstance(items, collections_abc.Collection) and not isinstance(items, collections_abc.Iterator):
+        # Collections can be iterated twice, which lets map run the functions without a Python-level loop
+        return zip(items if key is None else builtins.map(key, items),
+                   items if value is None else builtins.map(value, items))
+    if key is None:
+        assert value is not None
+        return ((x, value(x)) for x in items)
+    if value is None:
+        return ((key(x), x) for x in items)
+    return ((key(x), value(x)) for x in items)
+
+
+def into(to: Any, xform_or_coll: Any, coll: Union[Iterable[Any], _Nil] = _nil, *,
+         key: Union[Callable[[Any], Any], None] = None,
+         value: Union[Callable[[Any], Any], None] = None) -> Any:
+    """
+    Usage: into(to, coll)
+           into(to, xform, coll)
+
+    Adds all the items of ``coll`` to ``to``, optionally transformed by the transducer ``xform``, and returns ``to``.
+    ``to`` may be a ``list``, a ``set``, a ``dict`` or any other mutable mapping, a ``collections.deque``, an
+    ``array.array``, a persistent collection from ``clj.persistent``, or any collection with an ``append`` or ``add``
+    method. Without ``xform``, the items are added in bulk (``extend``, ``update``, …), which grows ``to`` once when
+    the length of ``coll`` is known.
+
+    The items added to a mapping must be key/value pairs, unless ``key`` or ``value`` is given: each item ``x`` is
+    then added as ``key(x)`` mapped to ``value(x)``, where a missing function is the identity:
+
+        into({}, users, key=attrgetter("id"))  # users by id
+        into({}, words, value=len)             # length of each word
+
+    Note this differs from Clojure’s ``into``: Python collections are mutable, so ``to`` is updated in place. Persistent
+    collections are not, so a new one is returned; it’s built with a transient.
+    """
+    xform: Union[Transducer, None]
+    items: Iterable[Any]
+    if isinstance(coll, _Nil):
+        xform = None
+        items = xform_or_coll
+    else:
+        xform = xform_or_coll
+        items = coll
+
+    if isinstance(to, (persistent.PersistentVector, persistent.PersistentHashSet, persistent.PersistentHashMap)):
+        transient = to.transient()
+        if xform is None:
+            into(transient, items, key=key, value=value)
+        else:
+            into(transient, xform, items, key=key, value=value)
+        return transient.persistent()
+
+    if isinstance(to, collections_abc.MutableMapping):
+        if key is None and value is None:
+            if xform is None:
+                to.update(items)
+                return to
+
+            def _step(result: Any, x: Any) -> Any:
+                result[x[0]] = x[1]
+                return result
+        else:
+            if xform is None:
+                to.update(_pairs(items, key, value))
+                return to
+
+            get_key = key or _identity
+            get_value = value or _identity
+
+            def _step(result: Any, x: Any) -> Any:
+                result[get_key(x)] = get_value(x)
+                return result
+    elif key is not None or value is not None:
+        raise TypeError("key and value can only be used with mappings")
+    elif isinstance(to, array.array) and xform is None:
+        if isinstance(items, list):
+            to.fromlist(items)
+        else:
+            to.extend(items)
+        return to
+    elif hasattr(to, "append") or isinstance(to, persistent.TransientVector):
+        if xform is None and hasattr(to, "extend"):
+            to.extend(items)
+            return to
+
+        append = to.append if hasattr(to, "append") else to.conj
+
+        def _step(result: Any, x: Any) -> Any:
+            append(x)
+            return result
+    else:
+        if xform is None and hasattr(to, "update"):
+            to.update(items)
+            return to
+
+        add = to.add
+        if xform is None:
+            # Run the loop in C
+            collections.deque(builtins.map(add, items), 0)
+            return to
+
+        def _step(result: Any, x: Any) -> Any:
+            add(x)
+            return result
+
+    if xform is None:
+        return _reduce(_step, to, items)
+    return transduce(xform, _step, items, to)
+
+
+def _identity(x: Any) -> Any:
+    return x
+
+
+# Transducers
+# The names below shadow the sequence functions and builtins on purpose: use them as ``transducers.map`` etc.
+
+# noinspection PyShadowingBuiltins
+def map(f: Callable[[Any], Any]) -> Transducer:
+    """
+    Returns a transducer that applies ``f`` to each input.
+    """
+
+    def _xform(rf: ReducingFn) -> ReducingFn:
+        def _rf(result: Any, input: Any = _nil) -> Any:
+            if input is _nil:
+                return rf(result)
+            return rf(result, f(input))
+
+        return _rf
+
+    return _xform
+
+
+# noinspection PyShadowingBuiltins
+def filter(pred: Callable[[Any], Any]) -> Transducer:
+    """
+    Returns a transducer that keeps the inputs for which ``pred(input)`` returns a truthy value.
+    """
+
+    def _xform(rf: ReducingFn) -> ReducingFn:
+        def _rf(result: Any, input: Any = _nil) -> Any:
+            if input is _nil:
+                return rf(result)
+            if pred(input):
+                return rf(result, input)
+            return result
+
+        return _rf
+
+    return _xform
+
+
+def remove(pred: Callable[[Any], Any]) -> Transducer:
+    """
+    Returns a transducer that removes the inputs for which ``pred(input)`` returns a truthy value.
+    """
+
+    def _xform(rf: ReducingFn) -> ReducingFn:
+        def _rf(result: Any, input: Any = _nil) -> Any:
+            if input is _nil:
+                return rf(result)
+            if pred(input):
+                return result
+            return rf(result, input)
+
+        return _rf
+
+    return _xform
+
+
+def keep(f: Callable[[Any], Any]) -> Transducer:
+    """
+    Returns a transducer of the non-``None`` results of ``f(input)``.
+    """
+
+    def _xform(rf: ReducingFn) -> ReducingFn:
+        def _rf(result: Any, input: Any = _nil) -> Any:
+            if input is _nil:
+                return rf(result)
+            v = f(input)
+            if v is None:
+                return result
+            return rf(result, v)
+
+        return _rf
+
+    return _xform
+
+
+def keep_indexed(f: Callable[[int, Any], Any]) -> Transducer:
+    """
+    Returns a transducer of the non-``None`` results of ``f(index, input)``.
+    """
+
+    def _xform(rf: ReducingFn) -> ReducingFn:
+        i = -1
+
+        def _rf(result: Any, input: Any = _nil) -> Any:
+            nonlocal i
+            if input is _nil:
+                return rf(result)
+            i += 1
+            v = f(i, input)
+            if v is None:
+                return result
+            return rf(result, v)
+
+        return _rf
+
+    return _xform
+
+
+def map_indexed(f: Callable[[int, Any], Any]) -> Transducer:
+    """
+    Returns a transducer that applies ``f`` to ``0`` and the first input, then to ``1`` and the second input, etc.
+    """
+
+    def _xform(rf: ReducingFn) -> ReducingFn:
+        i = -1
+
+        def _rf(result: Any, input: Any = _nil) -> Any:
+            nonlocal i
+            if input is _nil:
+                return rf(result)
+            i += 1
+            return rf(result, f(i, input))
+
+        return _rf
+
+    return _xform
+
+
+def cat(rf: ReducingFn) -> ReducingFn:
+    """
+    A transducer that concatenates the contents of each input, which must be iterable. Note ``cat`` is a transducer
+    itself, not a function that returns one.
+    """
+    rrf = _preserving_reduced(rf)
+
+    def _rf(result: Any, input: Any = _nil) -> Any:
+        if input is _nil:
+            return rf(result)
+        for e in input:
+            result = rrf(result, e)
+            if isinstance(result, Reduced):
+                return result.value
+        return result
+
+    return _rf
+
+
+def mapcat(f: Callable[[Any], Iterable[Any]]) -> Transducer:
+    """
+    Returns a transducer that applies ``f`` to each input and concatenates the results.
+    """
+    map_xform = map(f)
+
+    def _xform(rf: ReducingFn) -> ReducingFn:
+        return map_xform(cat(rf))
+
+    return _xform
+
+
+def take(n: int) -> Transducer:
+    """
+    Returns a transducer that keeps the first ``n`` inputs, then stops the reduction.
+    """
+
+    def _xform(rf: ReducingFn) -> ReducingFn:
+        remaining = n
+
+        def _rf(result: Any, input: Any = _nil) -> Any:
+            nonlocal remaining
+            if input is _nil:
+                return rf(result)
+            if remaining > 0:
+                result = rf(result, input)
+            remaining -= 1
+            if remaining <= 0:
+                return ensure_reduced(result)
+            return result
+
+        return _rf
+
+    return _xform
+
+
+def take_while(pred: Callable[[Any], Any]) -> Transducer:
+    """
+    Returns a transducer that keeps the inputs while ``pred(input)`` returns a truthy value, then stops the reduction.
+    """
+
+    def _xform(rf: ReducingFn) -> ReducingFn:
+        def _rf(result: Any, input: Any = _nil) -> Any:
+            if input is _nil:
+                return rf(result)
+            if pred(input):
+                return rf(result, input)
+            return Reduced(result)
+
+        return _rf
+
+    return _xform
+
+
+def take_nth(n: int) -> Transducer:
+    """
+    Returns a transducer that keeps every ``n``th input, starting with the first one. ``n`` must be positive.
+    """
+    if n <= 0:
+        raise ValueError("n must be positive")
+
+    def _xform(rf: ReducingFn) -> ReducingFn:
+        countdown = 1
+
+        def _rf(result: Any, input: Any = _nil) -> Any:
+            nonlocal countdown
+            if input is _nil:
+                return rf(result)
+            countdown -= 1
+            if countdown:
+                return result
+            countdown = n
+            return rf(result, input)
+
+        return _rf
+
+    return _xform
+
+
+def drop(n: int) -> Transducer:
+    """
+    Returns a transducer that drops the first ``n`` inputs.
+    """
+
+    def _xform(rf: ReducingFn) -> ReducingFn:
+        remaining = n
+
+        def _rf(result: Any, input: Any = _nil) -> Any:
+            nonlocal remaining
+            if input is _nil:
+                return rf(result)
+            if remaining > 0:
+                remaining -= 1
+                return result
+            return rf(result, input)
+
+        return _rf
+
+    return _xform
+
+
+def drop_while(pred: Callable[[Any], Any]) -> Transducer:
+    """
+    Returns a transducer that drops the inputs while ``pred(input)`` returns a truthy value.
+    """
+
+    def _xform(rf: ReducingFn) -> ReducingFn:
+        dropping = True
+
+        def _rf(result: Any, input: Any = _nil) -> Any:
+            nonlocal dropping
+            if input is _nil:
+                return rf(result)
+            if dropping:
+                if pred(input):
+                    return result
+                dropping = False
+            return rf(result, input)
+
+        return _rf
+
+    return _xform
+
+
+def distinct(rf: ReducingFn) -> ReducingFn:
+    """
+    A transducer that removes duplicated inputs. Note ``distinct`` is a transducer itself, not a function that returns
+    one.
+    """
+    seen: set[Hashable] = set()
+    add = seen.add
+
+    def _rf(result: Any, input: Any = _nil) -> Any:
+        if input is _nil:
+            return rf(result)
+        if input in seen:
+            return result
+        add(input)
+        return rf(result, input)
+
+    return _rf
+
+
+def dedupe(rf: ReducingFn) -> ReducingFn:
+    """
+    A transducer that removes consecutive duplicated inputs. Note ``dedupe`` is a transducer itself, not a function that
+    returns one.
+    """
+    prev: Any = _nil
+
+    def _rf(result: Any, input: Any = _nil) -> Any:
+        nonlocal prev
+        if input is _nil:
+            return rf(result)
+        if prev is not _nil and input == prev:
+            return result
+        prev = input
+        return rf(result, input)
+
+    return _rf
+
+
+def replace(smap: dict[Any, Any]) -> Transducer:
+    """
+    Returns a transducer that replaces inputs that are keys in ``smap`` with the corresponding value.
+    """
+    get = smap.get
+
+    def _xform(rf: ReducingFn) -> ReducingFn:
+        def _rf(result: Any, input: Any = _nil) -> Any:
+            if input is _nil:
+                return rf(result)
+            return rf(result, get(input, input))
+
+        return _rf
+
+    return _xform
+
+
+def interpose(sep: Any) -> Transducer:
+    """
+    Returns a transducer that puts ``sep`` between inputs.
+    """
+
+    def _xform(rf: ReducingFn) -> ReducingFn:
+        started = False
+
+        def _rf(result: Any, input: Any = _nil) -> Any:
+            nonlocal started
+            if input is _nil:
+                return rf(result)
+            if started:
+                result = rf(result, sep)
+                if isinstance(result, Reduced):
+                    return result
+            else:
+                started = True
+            return rf(result, input)
+
+        return _rf
+
+    return _xform
+
+
+def partition_by(f: Callable[[Any], Any]) -> Transducer:
+    """
+    Returns a transducer that groups consecutive inputs in lists, splitting each time ``f(input)`` returns a new value.
+    """
+
+    def _xform(rf: ReducingFn) -> ReducingFn:
+        current: list[Any] = []
+        current_value: Any = _nil
+
+        def _rf(result: Any, input: Any = _nil) -> Any:
+            nonlocal current, current_value
+            if input is _nil:
+                if current:
+                    result = unreduced(rf(result, current))
+                    current = []
+                return rf(result)
+
+            value = f(input)
+            if current_value is _nil or value == current_value:
+                current_value = value
+                current.append(input)
+                return result
+
+            ret = rf(result, current)
+            current_value = value
+            current = [input]
+            if isinstance(ret, Reduced):
+                current = []
+            return ret
+
+        return _rf
+
+    return _xform
+
+
+def partition_all(n: int) -> Transducer:
+    """
+    Returns a transducer that groups inputs in lists of ``n`` items; the last list may have fewer items.
+    """
+    if n <= 0:
+        raise ValueError("n must be positive")
+
+    def _xform(rf: ReducingFn) -> ReducingFn:
+        current: list[Any] = []
+
+        def _rf(result: Any, input: Any = _nil) -> Any:
+            nonlocal current
+            if input is _nil:
+                if current:
+                    result = unreduced(rf(result, current))
+                    current = []
+                return rf(result)
+
+            current.append(input)
+            if len(current) == n:
+                full = current
+                current = []
+                return rf(result, full)
+            return result
+
+        return _rf
+
+    return _xform
@@ -0,0 +1,299 @@
+# -*- coding: UTF-8 -*-
+"""
+NumPy backend of ``Pipeline``, used by ``Pipeline.vectorize()`` and ``thread_last(..., vectorize=True)``.
+
+When the source of a pipeline is a ``range`` or a one-dimensional array of integers (``numpy.ndarray`` or
+``array.array``), its first stages are run as array operations on blocks of items instead of item by item, as long
+as they only use known functions:
+
+* ``map`` with ``inc``, ``dec``, ``identity`` or ``constantly(n)`` where ``n`` is an ``int``;
+* ``filter`` and ``remove`` with ``is_even``, ``is_odd`` or ``identity``;
+* ``take`` and ``drop``;
+* ``reductions`` with ``operator.add``.
+
+The other stages run on the items of the blocks as usual. Items are computed as 64-bit integers, so stages whose
+results could overflow are not vectorized. If NumPy is not installed, pipelines always run item by item.
+"""
+import array
+import operator
+from typing import Any, Callable, Iterable, Iterator, NamedTuple, Sequence, Union
+
+from clj import fns, seqs
+
+numpy: Any
+try:
+    import numpy  # type: ignore[import-not-found, no-redef, unused-ignore]
+except ImportError:  # pragma: no cover
+    numpy = None
+
+# Number of items of a block
+BLOCK_SIZE = 1 << 16
+
+_INT64_MAX = 2 ** 63 - 1
+
+_ARRAY_INT_TYPECODES = "bBhHiIlLqQ"
+
+_constantly_code = fns.constantly(None).__code__
+
+
+def is_available() -> bool:
+    """
+    Return ``True`` if NumPy is installed.
+    """
+    return numpy is not None
+
+
+class _Op(object):
+    """
+    A stage that runs on blocks. ``done`` is set when the stage won’t produce any more item.
+    """
+    done = False
+
+    def __call__(self, block: Any) -> Any:
+        return block
+
+    def flush(self) -> Any:
+        """
+        Return a block of items to produce once the input is exhausted, or ``None``.
+        """
+        return None
+
+
+class _Map(_Op):
+    def __init__(self, f: Callable[[Any], Any]):
+        self.f = f
+
+    def __call__(self, block: Any) -> Any:
+        return self.f(block)
+
+
+class _Filter(_Op):
+    def __init__(self, mask: Callable[[Any], Any], keep: bool):
+        self.mask = mask
+        self.keep = keep
+
+    def __call__(self, block: Any) -> Any:
+        mask = self.mask(block)
+        return block[mask if self.keep else ~mask]
+
+
+class _Take(_Op):
+    def __init__(self, n: int):
+        self.n = n
+        self.done = n <= 0
+
+    def __call__(self, block: Any) -> Any:
+        block = block[:max(self.n, 0)]
+        self.n -= len(block)
+        self.done = self.n <= 0
+        return block
+
+
+class _Drop(_Op):
+    def __init__(self, n: int):
+        self.n = n
+
+    def __call__(self, block: Any) -> Any:
+        if self.n <= 0:
+            return block
+        dropped = min(self.n, len(block))
+        self.n -= dropped
+        return block[dropped:]
+
+
+class _Sums(_Op):
+    def __init__(self) -> None:
+        self.total = 0
+        self.seen = False
+
+    def __call__(self, block: Any) -> Any:
+        if not len(block):
+            return block
+        sums = numpy.cumsum(block)
+        sums += self.total
+        self.total = int(sums[-1])
+        self.seen = True
+        return sums
+
+    def flush(self) -> Any:
+        # Like clj.reductions, yield None if there was no item
+        if self.seen:
+            return None
+        self.seen = True
+        return numpy.array([None], dtype=object)
+
+
+def _is_even_mask(block: Any) -> Any:
+    return (block & 1) == 0
+
+
+def _is_odd_mask(block: Any) -> Any:
+    return (block & 1) == 1
+
+
+def _non_zero_mask(block: Any) -> Any:
+    return block != 0
+
+
+_MASKS = {fns.is_even: _is_even_mask, fns.is_odd: _is_odd_mask, fns.identity: _non_zero_mask}
+
+
+def _constant(f: Any) -> Union[int, None]:
+    """
+    Return ``n`` if ``f`` is ``constantly(n)`` with ``n`` an int, ``None`` otherwise.
+    """
+    if getattr(f, "__code__", None) is not _constantly_code:
+        return None
+    value = f.__closure__[0].cell_contents
+    return value if type(value) is int else None
+
+
+def _op(stage: Any, bound: int, length: int) -> Union[tuple[Callable[[], _Op], int], None]:
+    """
+    Return a function that creates the block operation of ``stage`` and the bound of the absolute value of its
+    results, given the bound of its inputs and the number of items. Return ``None`` if the stage can’t be vectorized.
+    """
+    kind = stage.kind
+    f = stage.fn
+
+    if kind == "map":
+        if f is fns.identity:
+            return _Op, bound
+        if f is fns.inc:
+            return (lambda: _Map(lambda block: block + 1)), bound + 1
+        if f is fns.dec:
+            return (lambda: _Map(lambda block: block - 1)), bound + 1
+        value = _constant(f)
+        if value is not None:
+            return (lambda: _Map(lambda block: numpy.full(len(block), value, dtype=numpy.int64))), abs(value)
+        return None
+
+    if kind in ("filter", "remove") and f in _MASKS:
+        mask = _MASKS[f]
+        keep = kind == "filter"
+        return (lambda: _Filter(mask, keep)), bound
+
+    if kind == "take":
+        n = stage.n
+        return (lambda: _Take(n)), bound
+
+    if kind == "drop":
+        n = stage.n
+        return (lambda: _Drop(n)), bound
+
+    if kind == "apply" and f is seqs.reductions and stage.args == (operator.add,):
+        return _Sums, bound * length
+
+    return None
+
+
+class Plan(NamedTuple):
+    # Return the items of the source between two indices as an array of int64
+    blocks: Callable[[int, int], Any]
+    length: int
+    # Functions that create the operations of the vectorized stages
+    ops: list[Callable[[], _Op]]
+    # Number of vectorized stages
+    size: int
+
+
+def _source(coll: Any) -> Union[tuple[Callable[[int, int], Any], int, int], None]:
+    """
+    Return a function that returns blocks of ``coll``, its length and the bound of the absolute value of its items.
+    """
+    if isinstance(coll, range):
+        length = len(coll)
+        bound = max(abs(coll[0]), abs(coll[-1])) if length else 0
+
+        def _range_block(start: int, end: int) -> Any:
+            r = coll[start:end]
+            return numpy.arange(r.start, r.stop, r.step, dtype=numpy.int64)
+
+        return _range_block, length, bound
+
+    if isinstance(coll, array.array):
+        if coll.typecode not in _ARRAY_INT_TYPECODES:
+            return None
+        coll = numpy.frombuffer(coll, dtype=numpy.dtype(coll.typecode))
+
+    if isinstance(coll, numpy.ndarray) and coll.ndim == 1 and coll.dtype.kind in "iu":
+        arr = coll
+        length = len(arr)
+        bound = max(abs(int(arr.min())), abs(int(arr.max()))) if length else 0
+
+        def _array_block(start: int, end: int) -> Any:
+            return arr[start:end].astype(numpy.int64)
+
+        return _array_block, length, bound
+
+    return None
+
+
+def plan(coll: Any, stages: Sequence[Any]) -> Union[Plan, str]:
+    """
+    Return the plan to vectorize the first stages of a pipeline, or the reason why it can’t be done.
+    """
+    if numpy is None:
+        return "NumPy is not installed"
+
+    source = _source(coll)
+    if source is None:
+        return "the source is not a range or an array of integers"
+
+    blocks, length, bound = source
+    if bound > _INT64_MAX:
+        return "the source has items that don’t fit in 64 bits"
+
+    ops = []
+    for stage in stages:
+        op = _op(stage, bound, length)
+        if op is None or op[1] > _INT64_MAX:
+            break
+        ops.append(op[0])
+        bound = op[1]
+
+    if not ops:
+        return "the first stage can’t be vectorized"
+
+    return Plan(blocks, length, ops, len(ops))
+
+
+def run(p: Plan, block_size: int = BLOCK_SIZE) -> Iterator[Any]:
+    """
+    Return a generator of the non-empty blocks of items produced by the vectorized stages of ``p``.
+    """
+    ops = [make_op() for make_op in p.ops]
+    block_size = max(block_size, 1)
+
+    for start in range(0, p.length, block_size):
+        if any(op.done for op in ops):
+            break
+
+        block = p.blocks(start, start + block_size)
+        for op in ops:
+            block = op(block)
+        if len(block):
+            yield block
+
+    for i, op in enumerate(ops):
+        block = op.flush()
+        if block is not None:
+            for next_op in ops[i + 1:]:
+                block = next_op(block)
+            if len(block):
+                yield block
+
+
+def items(blocks: Iterable[Any]) -> Iterator[Any]:
+    """
+    Return an iterator of the items of ``blocks``, as Python objects.
+    """
+    for block in blocks:
+        yield from block.tolist()
+
+
+def count(blocks: Iterable[Any]) -> int:
+    """
+    Return the number of items of ``blocks``.
+    """
+    return sum(len(block) for block in blocks)
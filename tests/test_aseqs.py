@@ -0,0 +1,303 @@
+import asyncio
+import os
+from typing import Any
+
+import pytest
+
+import clj as c
+from clj import aseqs as a
+from clj.sketches import LRUWindow
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+async def alist(ait):
+    return [e async for e in ait]
+
+
+def collect(ait):
+    return run(alist(ait))
+
+
+async def infinite_arange_fn():
+    """
+    Test async generator that fails if its 10k-th element is consumed.
+    """
+    n = 0
+    while True:
+        yield n
+        n += 1
+        assert n <= 10000
+
+
+async def arange(n):
+    for i in range(n):
+        await asyncio.sleep(0)
+        yield i
+
+
+async def ainc(x):
+    await asyncio.sleep(0)
+    return x + 1
+
+
+async def ais_even(x):
+    return x % 2 == 0
+
+
+def test_accepts_sync_and_async_iterables():
+    assert collect(a.map(c.inc, [1, 2, 3])) == [2, 3, 4]
+    assert collect(a.map(c.inc, arange(3))) == [1, 2, 3]
+    assert collect(a.map(ainc, arange(3))) == [1, 2, 3]
+    assert collect(a.concat([1], arange(2), (x for x in [5]))) == [1, 0, 1, 5]
+
+
+def test_distinct_filter_remove_keep():
+    assert collect(a.distinct(arange(0))) == []
+    assert collect(a.distinct([1, 2, 1, 3, 2])) == [1, 2, 3]
+    assert collect(a.distinct(["a", "B", "b", "A", "c"], key=str.lower)) == ["a", "B", "c"]
+    assert collect(a.distinct(arange(6), key=ais_even)) == [0, 1]
+    assert collect(a.distinct([1, 2, 1, 3, 1, 2], seen=LRUWindow(2))) == [1, 2, 3, 2]
+    assert collect(a.filter(c.is_even, arange(6))) == [0, 2, 4]
+    assert collect(a.filter(ais_even, arange(6))) == [0, 2, 4]
+    assert collect(a.remove(ais_even, arange(6))) == [1, 3, 5]
+    assert collect(a.keep(c.identity, [1, None, False, 2])) == [1, False, 2]
+    assert collect(a.keep_indexed(lambda i, x: x if i % 2 else None, "abcd")) == ["b", "d"]
+
+
+def test_map():
+    assert collect(a.map(lambda x, y: x + y, arange(3), [10, 20, 30, 40])) == [10, 21, 32]
+    assert collect(a.map_indexed(lambda i, x: (i, x), "ab")) == [(0, "a"), (1, "b")]
+    assert collect(a.mapcat(lambda x: arange(x), [1, 2, 3])) == [0, 0, 1, 0, 1, 2]
+    assert collect(a.mapcat(lambda x: [x, x], [1, 2])) == [1, 1, 2, 2]
+
+
+def test_cons_cycle_interleave_interpose():
+    assert collect(a.cons(0, arange(2))) == [0, 0, 1]
+    assert collect(a.take(5, a.cycle(arange(2)))) == [0, 1, 0, 1, 0]
+    assert collect(a.cycle([])) == []
+    assert collect(a.interleave(arange(3), "ab")) == [0, "a", 1, "b"]
+    assert collect(a.interleave()) == []
+    assert collect(a.interleave_longest(arange(3), "a", [])) == [0, "a", 1, 2]
+    assert collect(a.interleave_longest(arange(3), "a", fill=None)) == [0, "a", 1, None, 2, None]
+    assert collect(a.interleave_longest()) == []
+    assert collect(a.interpose(",", "abc")) == ["a", ",", "b", ",", "c"]
+
+
+def test_drop_take():
+    assert collect(a.rest(arange(3))) == [1, 2]
+    assert collect(a.drop(2, arange(4))) == [2, 3]
+    assert collect(a.drop(0, arange(2))) == [0, 1]
+    assert collect(a.drop_while(lambda x: x < 2, arange(4))) == [2, 3]
+    assert collect(a.take(3, infinite_arange_fn())) == [0, 1, 2]
+    assert collect(a.take(0, infinite_arange_fn())) == []
+    assert collect(a.take(10, arange(2))) == [0, 1]
+    assert collect(a.take_nth(2, arange(5))) == [0, 2, 4]
+    assert collect(a.take(3, a.take_nth(0, arange(5)))) == [0, 0, 0]
+    assert collect(a.take_nth(0, [])) == []
+    assert collect(a.take_while(lambda x: x < 3, infinite_arange_fn())) == [0, 1, 2]
+    assert collect(a.butlast(arange(3))) == [0, 1]
+    assert collect(a.drop_last(2, arange(3))) == [0]
+    assert collect(a.drop_last(5, arange(3))) == []
+
+
+def test_take_does_not_pull_extra_items():
+    pulled = []
+
+    async def source():
+        for i in range(10):
+            pulled.append(i)
+            yield i
+
+    assert collect(a.take(2, source())) == [0, 1]
+    assert pulled == [0, 1]
+
+
+def test_flatten():
+    assert collect(a.flatten([1, [2, arange(2)], "ab", [[[]]]])) == [1, 2, 0, 1, "ab"]
+    assert collect(a.flatten([1, [2, [3]]], depth=1)) == [1, 2, [3]]
+    assert collect(a.flatten([{"a": 1}, [b"x"]], atomic=(bytes, dict))) == [{"a": 1}, b"x"]
+
+
+def test_reverse_shuffle():
+    assert collect(a.reverse(arange(3))) == [2, 1, 0]
+    assert sorted(run(a.shuffle(arange(10)))) == list(range(10))
+    assert sorted(run(a.shuffle(range(10)))) == list(range(10))
+
+
+def test_split_at_split_with():
+    async def split_at():
+        taken, dropped = await a.split_at(2, arange(5))
+        return taken, await alist(dropped)
+
+    async def split_with():
+        taken, dropped = await a.split_with(lambda x: x < 3, arange(5))
+        return taken, await alist(dropped)
+
+    assert run(split_at()) == ([0, 1], [2, 3, 4])
+    assert run(split_with()) == ([0, 1, 2], [3, 4])
+
+
+def test_replace_reductions():
+    assert collect(a.replace({1: "one"}, [1, 2, 1])) == ["one", 2, "one"]
+    assert collect(a.reductions(lambda x, y: x + y, arange(4))) == [0, 1, 3, 6]
+    assert collect(a.reductions(lambda x, y: x + y, arange(3), 10)) == [10, 10, 11, 13]
+    assert collect(a.reductions(lambda x, y: x + y, [])) == [None]
+
+
+def test_first_and_co():
+    assert run(a.first(arange(3))) == 0
+    assert run(a.first([])) is None
+    assert run(a.ffirst([arange(2)])) == 0
+    assert run(a.ffirst([])) is None
+    assert run(a.second(arange(3))) == 1
+
+    async def nfirst():
+        return await alist(await a.nfirst([[1, 2, 3]]))
+
+    assert run(nfirst()) == [2, 3]
+    assert run(a.nth(arange(5), 3)) == 3
+    assert run(a.nth(arange(5), 30, "x")) == "x"
+    with pytest.raises(IndexError):
+        run(a.nth(arange(5), 30))
+    assert run(a.last(arange(3))) == 2
+    assert run(a.last([])) is None
+
+
+def test_zipmap_group_by():
+    assert run(a.zipmap("abc", arange(2))) == {"a": 0, "b": 1}
+    assert run(a.group_by(ais_even, arange(5))) == {True: [0, 2, 4], False: [1, 3]}
+    assert run(a.frequencies(arange(5), ais_even)) == {True: 3, False: 2}
+    assert run(a.frequencies("abca")) == {"a": 2, "b": 1, "c": 1}
+
+
+def test_group_by_spill(tmp_path):
+    with run(a.group_by(ais_even, arange(7), 2, spill_dir=tmp_path)) as groups:
+        assert groups.spills == 3
+        assert dict((k, list(v)) for k, v in groups.items()) == {True: [0, 2, 4, 6], False: [1, 3, 5]}
+    assert os.listdir(tmp_path) == []
+
+    async def agen():
+        for x in range(10):
+            yield x
+        raise RuntimeError()
+
+    with pytest.raises(RuntimeError):
+        run(a.group_by(c.is_even, agen(), 3, spill_dir=tmp_path))
+    assert os.listdir(tmp_path) == []
+
+
+def test_some_every():
+    assert run(a.some(lambda x: x > 2, infinite_arange_fn())) == 3
+    assert run(a.some({5, 3}, arange(10))) == 3
+    assert run(a.some(ais_even, [1, 3])) is None
+    assert run(a.every(ais_even, [2, 4])) is True
+    assert run(a.every(ais_even, arange(3))) is False
+    assert run(a.not_every(ais_even, arange(3))) is True
+    assert run(a.not_any(ais_even, [1, 3])) is True
+    assert run(a.not_any({1}, [1, 3])) is False
+
+
+def test_dorun_count():
+    seen: list[int] = []
+    assert run(a.dorun(a.map(seen.append, arange(3)))) is None
+    assert seen == [0, 1, 2]
+    assert run(a.count(arange(4))) == 4
+    assert run(a.count([1, 2])) == 2
+
+
+def test_generators():
+    assert collect(a.repeatedly(lambda: 1, 3)) == [1, 1, 1]
+    assert collect(a.repeatedly(3, lambda: 1)) == [1, 1, 1]
+    assert collect(a.take(2, a.repeatedly(lambda: 1))) == [1, 1]
+    assert collect(a.take(3, a.iterate(ainc, 0))) == [0, 1, 2]
+    assert collect(a.repeat(1, 2)) == [1, 1]
+    assert collect(a.take(2, a.repeat(1))) == [1, 1]
+    assert collect(a.range(3)) == [0, 1, 2]
+    assert collect(a.take(3, a.range())) == [0, 1, 2]
+
+
+def test_tree_seq():
+    tree = [1, [2, [3]], 4]
+    assert collect(a.tree_seq(c.is_seq, lambda x: x, tree)) == [tree, 1, [2, [3]], 2, [3], 3, 4]
+
+    async def children(x):
+        return arange(x)
+
+    assert collect(a.tree_seq(lambda x: x > 1, children, 3)) == [3, 0, 1, 2, 0, 1]
+
+
+@pytest.mark.parametrize("order", ["pre", "post", "breadth"])
+@pytest.mark.parametrize("max_depth", [None, 0, 1, 2, 10])
+def test_tree_seq_order_max_depth(order, max_depth):
+    tree: Any = [1, [2, [3, [4]], 5], [], 6]
+    expected = list(c.tree_seq(c.is_seq, c.identity, tree, order, max_depth))
+    assert collect(a.tree_seq(c.is_seq, c.identity, tree, order, max_depth)) == expected
+
+    async def ais_seq(x):
+        return c.is_seq(x)
+
+    async def children(x):
+        return arange_of(x)
+
+    async def arange_of(xs):
+        for x in xs:
+            await asyncio.sleep(0)
+            yield x
+
+    assert collect(a.tree_seq(ais_seq, children, tree, order=order, max_depth=max_depth)) == expected
+
+
+def test_tree_seq_invalid_order():
+    with pytest.raises(ValueError):
+        a.tree_seq(c.is_seq, c.identity, [], order="in")  # type: ignore
+
+
+def test_dedupe():
+    assert collect(a.dedupe([1, 1, 2, 1, None, None])) == [1, 2, 1, None]
+
+
+@pytest.mark.parametrize("n, step, pad", [
+    (2, None, None), (3, None, None), (3, 1, None), (2, 3, None), (3, 2, None), (3, 2, "xy"), (4, None, "xy"),
+    (0, None, None),
+])
+def test_partition(n, step, pad):
+    for size in range(8):
+        assert collect(a.partition(arange(size), n, step, pad)) == list(c.partition(range(size), n, step, pad))
+
+
+@pytest.mark.parametrize("n, step", [(2, None), (3, None), (3, 1), (2, 3), (3, 2)])
+def test_partition_all(n, step):
+    for size in range(8):
+        assert collect(a.partition_all(arange(size), n, step)) == list(c.partition_all(range(size), n, step))
+
+
+@pytest.mark.parametrize("n, step, pad", [(2, None, None), (3, 1, None), (2, 3, None), (3, 2, "xy")])
+def test_partition_views(n, step, pad):
+    for size in range(8):
+        expected = list(c.partition(iter(range(size)), n, step, pad, views=True))
+        assert collect(a.partition(arange(size), n, step, pad, views=True)) == expected
+        assert all(isinstance(p, tuple) for p in expected)
+        expected = list(c.partition_all(iter(range(size)), n, step, views=True))
+        assert collect(a.partition_all(arange(size), n, step, views=True)) == expected
+
+
+def test_partition_step_must_be_positive():
+    with pytest.raises(ValueError):
+        collect(a.partition([1, 2], 2, 0))
+
+
+def test_partition_by():
+    assert collect(a.partition_by(ais_even, [1, 3, 2, 4, 5])) == [[1, 3], [2, 4], [5]]
+    assert collect(a.partition_by(c.identity, [])) == []
+
+
+def test_seq_gen():
+    assert run(a.seq_gen(arange(0))) is None
+
+    async def seq_gen():
+        return await alist(await a.seq_gen(arange(3)))
+
+    assert run(seq_gen()) == [0, 1, 2]
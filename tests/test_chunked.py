@@ -0,0 +1,107 @@
+import pytest
+
+import clj as c
+from clj import chunked as ch
+
+
+def infinite_range_fn():
+    """
+    Test generator that fails if its 10k-th element is consumed.
+    """
+    n = 0
+    while True:
+        yield n
+        n += 1
+        assert n <= 10000
+
+
+def test_chunked_seq():
+    s = ch.chunked_seq(range(10), size=4)
+    assert ch.is_chunked_seq(s)
+    assert not ch.is_chunked_seq(range(10))
+    assert [list(chunk) for chunk in s.chunks()] == [[0, 1, 2, 3], [4, 5, 6, 7], [8, 9]]
+    assert ch.chunked_seq(s) is s
+
+    assert list(ch.chunked_seq([])) == []
+    assert list(ch.chunked_seq([1, 2, 3], size=2).chunks()) == [[1, 2], [3]]
+    assert list(ch.chunked_seq((1, 2, 3), size=0).chunks()) == [[1], [2], [3]]
+    assert list(ch.chunked_seq(x for x in "abc")) == ["a", "b", "c"]
+    assert list(c.take(3, ch.chunked_seq(infinite_range_fn()))) == [0, 1, 2]
+
+
+def test_chunked_seq_is_lazy():
+    realized: list[int] = []
+
+    def gen():
+        for i in range(100):
+            realized.append(i)
+            yield i
+
+    s = ch.chunked_seq(gen(), size=10)
+    assert realized == []
+    assert c.first(s) == 0
+    assert realized == list(range(10))
+
+
+def test_range():
+    assert list(ch.range(5)) == [0, 1, 2, 3, 4]
+    assert list(ch.range(2, 5)) == [2, 3, 4]
+    assert list(ch.range(10, 0, -3)) == [10, 7, 4, 1]
+    assert list(ch.range(70)) == list(range(70))
+    assert list(ch.range(0)) == []
+    assert list(c.take(100, ch.range())) == list(range(100))
+    assert list(ch.range(5, size=2).chunks()) == [[0, 1], [2, 3], [4]]
+
+
+def test_repeat():
+    assert list(ch.repeat(1, 5, size=2)) == [1] * 5
+    assert list(ch.repeat(1, 4, size=2).chunks()) == [[1, 1], [1, 1]]
+    assert list(ch.repeat(1, 0)) == []
+    assert list(c.take(40, ch.repeat("a"))) == ["a"] * 40
+
+    for s in (ch.repeat(1, 6, size=2), ch.repeat(1, size=2)):
+        chunks = s.chunks()
+        first = next(chunks)
+        first.append(2)
+        assert next(chunks) == [1, 1]
+
+
+def test_iterate():
+    assert list(c.take(50, ch.iterate(c.inc, 0))) == list(range(50))
+    assert list(ch.take(5, ch.iterate(lambda x: x * 2, 1, size=2))) == [1, 2, 4, 8, 16]
+
+
+def test_map_filter_remove_keep():
+    assert list(ch.map(c.inc, ch.range(100))) == list(map(c.inc, range(100)))
+    assert list(ch.map(c.inc, [1, 2])) == [2, 3]
+    assert list(ch.filter(c.is_even, ch.range(100))) == list(filter(c.is_even, range(100)))
+    assert list(ch.remove(c.is_even, range(100))) == list(c.remove(c.is_even, range(100)))
+    assert list(ch.keep(lambda x: x if x % 3 else None, range(10))) == [1, 2, 4, 5, 7, 8]
+    assert list(ch.keep(c.identity, [None, False, 0])) == [False, 0]
+    assert list(ch.filter(lambda x: x > 1000, ch.range(100))) == []
+
+
+def test_take_drop():
+    assert list(ch.take(5, ch.filter(c.is_even, ch.map(c.inc, ch.range())))) == [2, 4, 6, 8, 10]
+    assert list(ch.take(0, ch.range())) == []
+    assert list(ch.take(100, ch.range(10))) == list(range(10))
+    assert list(ch.take(40, infinite_range_fn())) == list(range(40))
+    assert list(ch.drop(3, ch.range(10, size=4))) == [3, 4, 5, 6, 7, 8, 9]
+    assert list(ch.drop(4, ch.range(10, size=4))) == [4, 5, 6, 7, 8, 9]
+    assert list(ch.drop(0, ch.range(3))) == [0, 1, 2]
+    assert list(ch.drop(30, ch.range(10))) == []
+    assert list(ch.drop(2, ch.filter(c.is_odd, ch.range(10, size=2)))) == [5, 7, 9]
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 32])
+def test_take_realizes_only_the_needed_chunks(size):
+    realized: list[int] = []
+
+    def gen():
+        for i in range(100):
+            realized.append(i)
+            yield i
+
+    assert list(ch.take(5, ch.map(c.inc, ch.chunked_seq(gen(), size=size)))) == [1, 2, 3, 4, 5]
+    # the chunk that contains the 5th item is the last one realized
+    assert len(realized) == -(-5 // size) * size
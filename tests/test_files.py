@@ -0,0 +1,168 @@
+import io
+import mmap
+import random
+import re
+import subprocess
+import sys
+
+import pytest
+
+import clj as c
+from clj import files
+
+
+@pytest.fixture
+def small_blocks(monkeypatch):
+    # Exercise the lines split across several blocks
+    monkeypatch.setattr(files, "BLOCK_SIZE", 64)
+
+
+def make_lines(n):
+    # Mix of \n and \r\n terminators, non-ASCII characters, and a last line without terminator
+    lines = [("line %d" if i % 5 else "lïne %d") % i for i in range(n)]
+    content = "".join(line + ("\r\n" if i % 3 == 0 else "\n") for i, line in enumerate(lines[:-1])) + lines[-1]
+    return lines, content.encode("utf-8")
+
+
+@pytest.fixture
+def lines_file(tmp_path):
+    lines, content = make_lines(1000)
+    path = tmp_path / "lines.txt"
+    path.write_bytes(content)
+    return path, lines, content
+
+
+def test_line_seq(lines_file, small_blocks):
+    path, lines, _ = lines_file
+    assert list(c.line_seq(path)) == [line.encode("utf-8") for line in lines]
+    assert list(c.line_seq(str(path), "utf-8")) == lines
+    with open(path, "rb") as f:
+        assert list(c.line_seq(f, encoding="utf-8")) == lines
+        assert not f.closed
+
+    views = list(c.line_seq(path, views=True))
+    assert all(isinstance(v, memoryview) for v in views)
+    assert [bytes(v).decode("utf-8") for v in views] == lines
+    # the views are slices of the mapped file, not of copies of its lines
+    assert all(isinstance(v.obj, mmap.mmap) for v in views)
+
+    with pytest.raises(ValueError):
+        c.line_seq(path, "utf-8", views=True)  # type: ignore[call-overload]
+
+
+def test_line_seq_long_lines(tmp_path, small_blocks):
+    lines = ["x" * 1000, "", "y" * 10, "z" * 200]
+    path = tmp_path / "long.txt"
+    path.write_text("\n".join(lines) + "\n")
+    assert list(c.line_seq(path, "ascii")) == lines
+    assert [bytes(v) for v in c.line_seq(path, views=True)] == [line.encode() for line in lines]
+
+
+def test_line_seq_is_lazy(lines_file):
+    path, lines, _ = lines_file
+    assert c.first(c.line_seq(path, "utf-8")) == lines[0]
+    assert list(c.take(3, c.line_seq(path, "utf-8", start=20))) == lines[3:6]
+
+
+@pytest.mark.parametrize("parts", [1, 2, 3, 7, 100])
+def test_line_seq_ranges(lines_file, small_blocks, parts):
+    path, lines, content = lines_file
+    size = len(content)
+    result: list[str] = []
+    for i in range(parts):
+        result.extend(c.line_seq(path, "utf-8", start=size * i // parts, end=size * (i + 1) // parts))
+    assert result == lines
+
+
+def test_line_seq_offsets(lines_file):
+    path, lines, content = lines_file
+    # line 1 starts at offset 9, after "lïne 0\r\n"
+    assert content[:9] == "lïne 0\r\n".encode("utf-8")
+    assert c.first(c.line_seq(path, "utf-8", start=9)) == lines[1]
+    assert c.first(c.line_seq(path, "utf-8", start=8)) == lines[1]
+    assert c.first(c.line_seq(path, "utf-8", start=10)) == lines[2]
+    assert list(c.line_seq(path, start=0, end=1)) == [lines[0].encode("utf-8")]
+    assert list(c.line_seq(path, start=9, end=9)) == []
+    assert list(c.line_seq(path, start=len(content))) == []
+    assert list(c.line_seq(path, start=len(content) + 10)) == []
+    assert [bytes(v) for v in c.line_seq(path, views=True, start=5, end=20)] == [b"line 1", b"line 2"]
+
+
+def test_line_seq_edge_cases(tmp_path):
+    path = tmp_path / "empty.txt"
+    path.write_bytes(b"")
+    assert list(c.line_seq(path)) == []
+    assert list(c.line_seq(path, views=True)) == []
+
+    path.write_bytes(b"\n\r\n\n")
+    assert list(c.line_seq(path)) == [b"", b"", b""]
+
+    assert list(c.line_seq(io.BytesIO(b"a\nb\r\nc"), "ascii")) == ["a", "b", "c"]
+    assert [bytes(v) for v in c.line_seq(io.BytesIO(b"a\nb"), views=True)] == [b"a", b"b"]
+
+
+def test_line_seq_pipe():
+    proc = subprocess.Popen([sys.executable, "-c", "print('a'); print('b')"], stdout=subprocess.PIPE)
+    assert proc.stdout is not None
+    with proc.stdout:
+        assert [line.rstrip(b"\r") for line in c.line_seq(proc.stdout)] == [b"a", b"b"]
+    proc.wait()
+
+
+@pytest.mark.parametrize("block_size", [1, 3, 7, 64, 1 << 16])
+@pytest.mark.parametrize("pattern", [
+    r"\d{1,5}",
+    r"[a-z]{1,4}@[a-z]{1,4}\.com",
+    r"(\w{1,3})=(\d{1,3})",
+    r"\bfoo\b",
+    r"(?<=x)y{1,5}",
+    r"ab|abc",
+    r"x{0,3}",
+    r"$",
+])
+def test_re_seq_blocks(monkeypatch, block_size, pattern):
+    monkeypatch.setattr(files, "BLOCK_SIZE", block_size)
+    rng = random.Random(block_size)
+    for _ in range(50):
+        text = "".join(rng.choice(["a", "b", "c", "x", "y", "1", "23", "foo", " ", "=", "@", "q.com", "\n", "abc"])
+                       for _ in range(rng.randrange(100)))
+        expected = [m.group() if not m.re.groups else (m.group(),) + m.groups() for m in re.finditer(pattern, text)]
+        assert list(c.re_seq(pattern, io.StringIO(text), max_match=16)) == expected
+        assert list(c.re_seq(pattern.encode(), io.BytesIO(text.encode()), max_match=16)) == [
+            x.encode() if isinstance(x, str) else tuple(g.encode() for g in x) for x in expected]
+
+
+def test_re_seq(lines_file):
+    assert list(c.re_seq(r"\d+", "a1b22c333")) == ["1", "22", "333"]
+    assert list(c.re_seq(r"(\w)=(\d)?", "a=1 b=")) == [("a=1", "a", "1"), ("b=", "b", None)]
+    assert list(c.re_seq(re.compile(r"^\w", re.M), "ab\ncd")) == ["a", "c"]
+    assert list(c.re_seq(r"x", "")) == []
+
+    path, lines, content = lines_file
+    expected = re.findall(rb"line \d+", content)
+    with open(path, "rb") as f:
+        assert list(c.re_seq(rb"line \d+", f)) == expected
+        assert not f.closed
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+        assert list(c.re_seq(rb"line \d+", m)) == expected
+        # the map is searched in place, without moving its position
+        assert list(c.re_seq(rb"line \d+", m)) == expected
+        assert m.tell() == 0
+    with open(path, encoding="utf-8") as text:
+        assert list(c.re_seq(r"lïne \d+", text)) == [line for line in lines if line.startswith("lïne")]
+
+    with pytest.raises(ValueError):
+        c.re_seq(r"x", "x", max_match=0)
+
+
+def test_re_seq_is_lazy():
+    class Source(io.StringIO):
+        reads = 0
+
+        def read(self, size=-1):
+            self.reads += 1
+            return super().read(size)
+
+    source = Source("abc " * 100000)
+    assert c.first(c.re_seq(r"\w+", source)) == "abc"
+    assert source.reads == 2
@@ -0,0 +1,103 @@
+import json
+import time
+
+import clj as c
+from clj.instrument import Profile
+
+
+def slow_inc(x):
+    time.sleep(0.001)
+    return x + 1
+
+
+def test_thread_last():
+    with Profile() as p:
+        result = p.thread_last(range(100), (map, c.inc), (filter, c.is_even), c.distinct, (c.take, 10), list)
+    assert result == list(range(2, 22, 2))
+
+    assert [s.name for s in p.stages] == [
+        "range", "map(inc, …)", "filter(is_even, …)", "distinct(…)", "take(10, …)", "list(…)"]
+    # take stops pulling as soon as it has 10 elements
+    assert [(s.elements_in, s.elements_out) for s in p.stages] == [
+        (None, 20), (20, 20), (20, 10), (10, 10), (10, 10), (10, 10)]
+    assert all(s.buffered is None for s in p.stages)
+    assert all(s.first_element is not None for s in p.stages)
+    first_map, first_list = p.stages[1].first_element, p.stages[-1].first_element
+    assert first_map is not None and first_list is not None
+    assert first_map <= first_list
+
+
+def test_self_time():
+    p = Profile()
+    result = p.thread_last(iter(range(20)), (map, slow_inc), (filter, c.is_even), c.count)
+    assert result == 10
+    source, mapped, filtered, counted = p.stages
+    assert mapped.self_time >= 0.02
+    assert mapped.self_time > 10 * filtered.self_time
+    assert mapped.self_time > 10 * source.self_time
+    assert counted.elements_out is None
+    assert counted.time >= mapped.time
+
+
+def test_lazy():
+    p = Profile()
+    it = p.thread_last(c.range(), (map, c.inc))
+    assert p.stages[1].elements_out == 0
+    assert p.stages[1].first_element is None
+    assert next(it) == 1
+    assert p.stages[0].elements_out == 1
+    assert p.stages[1].elements_out == 1
+    assert p.stages[1].first_element is not None
+
+
+def test_buffers():
+    p = Profile()
+    result = p.thread_last(iter(range(100)), (c.drop_last, 10), c.reverse, (c.take, 3), list)
+    assert result == [89, 88, 87]
+    dropped, reversed_ = p.stages[1:3]
+    assert dropped.buffered == 10
+    assert reversed_.buffered == 90
+    assert reversed_.buffered_bytes is not None
+    assert reversed_.buffered_bytes >= 90 * 8
+
+    # drop_last doesn't buffer anything when the input has a length
+    p = Profile()
+    assert p.thread_last(list(range(100)), (c.drop_last, 10), c.cycle, (c.take, 200), c.count) == 200
+    source, dropped, cycled = p.stages[:3]
+    assert source.elements_out == 90
+    assert dropped.buffered == 0
+    assert cycled.buffered == 90
+    assert cycled.elements_out == 200
+
+    p = Profile()
+    groups = p.thread_last(range(10), (c.group_by, c.is_even))
+    assert groups == {True: [0, 2, 4, 6, 8], False: [1, 3, 5, 7, 9]}
+    assert p.stages[1].elements_out == 2
+    assert p.stages[1].buffered == 10
+
+
+def test_wrap():
+    p = Profile()
+    words = p.wrap("words", ["a", "bb", "ccc"])
+    lengths = p.wrap("lengths", map(len, words))
+    assert list(lengths) == [1, 2, 3]
+    assert [(s.elements_in, s.elements_out) for s in p.stages] == [(None, 3), (3, 3)]
+
+
+def test_export():
+    with Profile() as p:
+        p.thread_last(range(10), (map, c.inc), c.reverse, list)
+
+    d = p.to_dict()
+    assert json.loads(json.dumps(d)) == d
+    assert d["total_time"] == p.total_time
+    assert [s["name"] for s in d["stages"]] == ["range", "map(inc, …)", "reverse(…)", "list(…)"]
+    assert d["stages"][2]["buffered"] == 10
+
+    lines = str(p).splitlines()
+    assert len(lines) == 5
+    assert lines[0].split() == ["stage", "in", "out", "self", "(ms)", "self", "(%)", "first", "(ms)", "buffered",
+                                "buffer", "(KiB)"]
+    cells = lines[3].split()
+    assert cells[:3] == ["reverse(…)", "10", "10"]
+    assert cells[6] == "10"
@@ -0,0 +1,230 @@
+import concurrent.futures
+import operator
+import threading
+import time
+
+import pytest
+
+import clj as c
+
+
+def infinite_range_fn():
+    """
+    Test generator that fails if its 10k-th element is consumed.
+    """
+    n = 0
+    while True:
+        yield n
+        n += 1
+        assert n <= 10000
+
+
+def test_pmap():
+    assert c.pmap(c.inc, infinite_range_fn()) is not None
+    assert list(c.pmap(c.inc, [])) == []
+    assert list(c.pmap(c.inc, range(100))) == list(range(1, 101))
+    assert list(c.pmap(operator.add, [1, 2, 3], [10, 20])) == [11, 22]
+    assert list(c.take(5, c.pmap(c.inc, infinite_range_fn()))) == [1, 2, 3, 4, 5]
+
+
+def test_pmap_ordered_with_uneven_durations():
+    def slow_identity(x):
+        time.sleep(0.01 * (5 - x))
+        return x
+
+    assert list(c.pmap(slow_identity, range(5), workers=5)) == [0, 1, 2, 3, 4]
+
+
+def test_pmap_unordered():
+    assert sorted(c.pmap(c.inc, range(100), ordered=False)) == list(range(1, 101))
+    firsts = list(c.take(5, c.pmap(c.inc, infinite_range_fn(), ordered=False)))
+    assert len(set(firsts)) == 5
+
+
+def test_pmap_bounded_lookahead():
+    consumed = []
+
+    def gen():
+        for x in range(1000):
+            consumed.append(x)
+            yield x
+
+    it = c.pmap(c.inc, gen(), workers=2, lookahead=3)
+    assert next(it) == 1
+    assert len(consumed) <= 4
+    del it
+
+
+def test_pmap_exception():
+    def boom(x):
+        if x == 3:
+            raise RuntimeError("boom!")
+        return x
+
+    it = c.pmap(boom, range(10))
+    assert [next(it) for _ in range(3)] == [0, 1, 2]
+    with pytest.raises(RuntimeError):
+        next(it)
+
+
+def test_pmap_executor():
+    with concurrent.futures.ThreadPoolExecutor(2) as executor:
+        assert list(c.pmap(c.inc, range(10), executor=executor)) == list(range(1, 11))
+        # the executor is still usable
+        assert executor.submit(c.inc, 1).result() == 2
+
+
+def test_pmap_processes():
+    assert list(c.pmap(c.inc, range(10), workers=2, processes=True)) == list(range(1, 11))
+
+
+def test_pmap_parallelism():
+    barrier = threading.Barrier(4, timeout=5)
+
+    def wait(x):
+        barrier.wait()
+        return x
+
+    assert list(c.pmap(wait, range(4), workers=4)) == [0, 1, 2, 3]
+
+
+def test_seque():
+    assert c.seque(infinite_range_fn()) is not None
+    assert list(c.seque([])) == []
+    assert list(c.seque(range(1000), 10)) == list(range(1000))
+    assert list(c.seque(range(10), 0)) == list(range(10))
+    assert list(c.take(3, c.seque(infinite_range_fn(), 5))) == [0, 1, 2]
+
+
+def test_seque_prefetches():
+    consumed = []
+
+    def gen():
+        for x in range(100):
+            consumed.append(x)
+            yield x
+
+    it = c.seque(gen(), 10)
+    assert next(it) == 0
+    deadline = time.monotonic() + 5
+    while len(consumed) < 11 and time.monotonic() < deadline:
+        time.sleep(0.001)
+    # the first item, plus a full buffer, plus at most the item that's waiting to be put in the queue
+    assert 11 <= len(consumed) <= 12
+    assert list(it) == list(range(1, 100))
+
+
+def test_seque_prefetches_before_first_next():
+    consumed = []
+
+    def gen():
+        for x in range(100):
+            consumed.append(x)
+            yield x
+
+    it = c.seque(gen(), 10)
+    deadline = time.monotonic() + 5
+    while len(consumed) < 10 and time.monotonic() < deadline:
+        time.sleep(0.001)
+    # a full buffer, plus at most the item that's waiting to be put in the queue
+    assert 10 <= len(consumed) <= 11
+    assert list(it) == list(range(100))
+
+
+def test_seque_never_started():
+    threads_before = threading.active_count()
+
+    def gen():
+        n = 0
+        while True:
+            yield n
+            n += 1
+
+    it = c.seque(gen(), 2)
+    del it
+
+    deadline = time.monotonic() + 5
+    while threading.active_count() > threads_before and time.monotonic() < deadline:
+        time.sleep(0.001)
+    assert threading.active_count() == threads_before
+
+
+def test_seque_exception():
+    def gen():
+        yield 1
+        yield 2
+        raise RuntimeError("boom!")
+
+    it = c.seque(gen())
+    assert next(it) == 1
+    assert next(it) == 2
+    with pytest.raises(RuntimeError):
+        next(it)
+
+
+def test_seque_early_stop():
+    producing = threading.Event()
+    threads_before = threading.active_count()
+
+    def gen():
+        n = 0
+        while True:
+            producing.set()
+            yield n
+            n += 1
+
+    assert list(c.take(2, c.seque(gen(), 2))) == [0, 1]
+    assert producing.is_set()
+
+    deadline = time.monotonic() + 5
+    while threading.active_count() > threads_before and time.monotonic() < deadline:
+        time.sleep(0.001)
+    assert threading.active_count() == threads_before
+
+
+def append(acc, x):
+    return acc + [x]
+
+
+def concat(a, b):
+    return a + b
+
+
+def test_fold():
+    assert c.fold(operator.add, operator.add, range(10000), init=0, workers=4, processes=False) == sum(range(10000))
+    assert c.fold(operator.add, operator.add, [], init=0) == 0
+    assert c.fold(operator.add, operator.add, [1, 2], init=0) == 3
+
+    # combinef() is the initial value
+    def concat_or_empty(a=None, b=None):
+        return [] if a is None or b is None else a + b
+
+    # the partial results are combined in order
+    expected = list(range(2000))
+    for make_coll in [lambda: expected, lambda: range(2000), lambda: iter(expected), lambda: (x for x in expected)]:
+        for n in [1, 7, 512, 5000]:
+            assert c.fold(concat_or_empty, append, make_coll(), n=n, workers=3, processes=False) == expected
+
+
+def test_fold_chunks():
+    chunks: list[list[int]] = []
+
+    def record(acc, x):
+        if not acc:
+            chunks.append([])
+        chunks[-1].append(x)
+        return acc + 1
+
+    assert c.fold(operator.add, record, iter(range(1000)), n=100, init=0, workers=1) == 1000
+    assert [len(chunk) for chunk in chunks] == [100] * 10
+
+
+def test_fold_processes():
+    assert c.fold(operator.add, operator.add, range(10000), n=100, init=0, workers=2) == sum(range(10000))
+    assert c.fold(concat, append, iter(range(3000)), n=100, init=[], workers=2) == list(range(3000))
+
+
+def test_fold_executor():
+    with concurrent.futures.ThreadPoolExecutor(2) as executor:
+        assert c.fold(operator.add, operator.add, range(1000), n=10, init=0, executor=executor) == sum(range(1000))
+        assert executor.submit(c.inc, 1).result() == 2
@@ -0,0 +1,220 @@
+import random
+
+import pytest
+
+import clj as c
+from clj.persistent import TransientHashMap, TransientHashSet, TransientVector
+
+
+class CollidingKey:
+    # Many keys with the same hash, to exercise the collision nodes
+    def __init__(self, x):
+        self.x = x
+
+    def __hash__(self):
+        return self.x % 7
+
+    def __eq__(self, other):
+        return isinstance(other, CollidingKey) and other.x == self.x
+
+    def __repr__(self):
+        return "CollidingKey(%d)" % self.x
+
+
+def test_vector():
+    rng = random.Random(42)
+    v: c.PersistentVector[int] = c.vector()
+    expected: list[int] = []
+    snapshots = []
+    for i in range(40000):
+        r = rng.random()
+        if r < 0.7:
+            v = v.conj(i)
+            expected.append(i)
+        elif r < 0.85 and expected:
+            j = rng.randrange(len(expected))
+            v = v.assoc(j, -i)
+            expected[j] = -i
+        elif expected:
+            v = v.pop()
+            expected.pop()
+        if i % 1000 == 0:
+            snapshots.append((v, list(expected)))
+
+    assert len(v) == len(expected)
+    assert list(v) == expected
+    assert [v[i] for i in range(len(v))] == expected
+    assert list(reversed(v)) == expected[::-1]
+    for snapshot, items in snapshots:
+        assert list(snapshot) == items
+
+    while v:
+        v = v.pop()
+    assert list(v) == []
+    with pytest.raises(IndexError):
+        v.pop()
+
+
+def test_vector_init():
+    for n in [0, 1, 31, 32, 33, 64, 1024, 1025, 32 * 32 * 32 + 33]:
+        v = c.vec(range(n))
+        assert len(v) == n
+        assert list(v) == list(range(n))
+        assert all(v[i] == i for i in range(0, n, 97))
+        if n:
+            assert v[-1] == n - 1
+            assert v.pop().conj(n - 1) == v
+        with pytest.raises(IndexError):
+            v[n]
+
+    v = c.vector(1, 2, 3)
+    assert c.vec(v) is v
+    assert v.assoc(3, 4) == c.vector(1, 2, 3, 4)
+    assert v[1:] == c.vector(2, 3)
+    assert v != [1, 2, 3]
+    assert hash(v) == hash(c.vector(1, 2, 3))
+    assert repr(v) == "vector(1, 2, 3)"
+
+
+def test_transient_vector():
+    v = c.vec(range(2000))
+    t = v.transient()
+    assert isinstance(t, TransientVector)
+    assert t.conj(2000) is t
+    t.extend(range(2001, 3000))
+    for i in range(0, 3000, 7):
+        t.assoc(i, -i)
+    for _ in range(500):
+        t.pop()
+
+    expected = list(range(3000))
+    for i in range(0, 3000, 7):
+        expected[i] = -i
+    assert list(t) == expected[:2500]
+    assert t[-1] == expected[2499]
+
+    p = t.persistent()
+    assert list(p) == expected[:2500]
+    # the original vector is unchanged
+    assert list(v) == list(range(2000))
+    with pytest.raises(RuntimeError):
+        t.conj(1)
+
+    # the new vector doesn't share editable nodes with the transient
+    t2 = p.transient()
+    t2.assoc(0, 1)
+    assert p[0] == 0
+    assert t2.persistent()[0] == 1
+
+
+def test_hash_map():
+    rng = random.Random(0)
+    m: c.PersistentHashMap = c.hash_map()
+    expected: dict = {}
+    snapshots = []
+    for i in range(20000):
+        k = rng.randrange(3000)
+        key = CollidingKey(k) if k % 3 == 0 else k
+        if rng.random() < 0.6:
+            m = m.assoc(key, i)
+            expected[key] = i
+        else:
+            m = m.dissoc(key)
+            expected.pop(key, None)
+        if i % 1000 == 0:
+            snapshots.append((m, dict(expected)))
+
+    assert len(m) == len(expected)
+    assert m == expected
+    assert dict(m.items()) == expected
+    assert all(m[k] == v for k, v in expected.items())
+    assert m.get("missing") is None
+    with pytest.raises(KeyError):
+        m["missing"]
+    for snapshot, items in snapshots:
+        assert snapshot == items
+
+    for k in expected:
+        m = m.dissoc(k)
+    assert len(m) == 0
+    assert m == {}
+
+
+def test_hash_map_init():
+    m = c.hash_map("a", 1, "b", 2, "a", 3)
+    assert m == {"a": 3, "b": 2}
+    assert c.PersistentHashMap({"a": 3, "b": 2}) == m
+    assert hash(m) == hash(c.hash_map("b", 2, "a", 3))
+    assert m.assoc("a", 3) is m
+    assert m.dissoc("c") is m
+    assert repr(c.hash_map(1, 2)) == "hash_map(1, 2)"
+    with pytest.raises(ValueError):
+        c.hash_map(1, 2, 3)
+
+
+def test_transient_hash_map():
+    m = c.PersistentHashMap((i, i) for i in range(1000))
+    t = m.transient()
+    assert isinstance(t, TransientHashMap)
+    for i in range(0, 1000, 2):
+        t.dissoc(i)
+    t[1000] = 1000
+    del t[1]
+    with pytest.raises(KeyError):
+        del t[1]
+
+    expected = {i: i for i in range(3, 1000, 2)}
+    expected[1000] = 1000
+    assert dict(t) == expected
+    p = t.persistent()
+    assert p == expected
+    assert m == {i: i for i in range(1000)}
+    with pytest.raises(RuntimeError):
+        t.assoc(1, 1)
+
+
+def test_hash_set():
+    s = c.hash_set(1, 2, 3)
+    assert s == {1, 2, 3}
+    assert s.conj(4) == {1, 2, 3, 4}
+    assert s.disj(1) == {2, 3}
+    assert s.conj(1) is s
+    assert s == {1, 2, 3}
+    assert isinstance(s | {4}, c.PersistentHashSet)
+    assert hash(s) == hash(frozenset({1, 2, 3}))
+    assert repr(c.hash_set(1)) == "hash_set(1)"
+
+    keys = [CollidingKey(i) for i in range(50)]
+    s2 = c.PersistentHashSet(keys)
+    assert len(s2) == 50
+    assert all(CollidingKey(i) in s2 for i in range(50))
+
+    t = s.transient()
+    assert isinstance(t, TransientHashSet)
+    t.conj(4).disj(2)
+    t.add(5)
+    t.discard(1)
+    assert t.persistent() == {3, 4, 5}
+    assert s == {1, 2, 3}
+
+
+def test_clj_functions():
+    v = c.vec(range(100))
+    assert c.count(v) == 100
+    assert c.first(v) == 0
+    assert c.last(v) == 99
+    assert c.nth(v, 50) == 50
+    assert c.nth(v, 100, "x") == "x"
+    assert c.empty(v) == c.vector()
+    assert isinstance(c.empty(v), c.PersistentVector)
+
+    m = c.hash_map("a", 1)
+    assert c.count(m) == 1
+    assert c.first(m) == "a"
+    assert isinstance(c.empty(m), c.PersistentHashMap)
+    assert c.empty(m) == {}
+
+    s = c.hash_set(1)
+    assert c.count(s) == 1
+    assert c.first(s) == 1
+    assert isinstance(c.empty(s), c.PersistentHashSet)
@@ -0,0 +1,151 @@
+import pytest
+
+import clj as c
+from clj.pipeline import _compile
+
+
+def infinite_range_fn():
+    """
+    Test generator that fails if its 10k-th element is consumed.
+    """
+    n = 0
+    while True:
+        yield n
+        n += 1
+        assert n <= 10000
+
+
+def counting_gen(n, pulled):
+    for i in range(n):
+        pulled.append(i)
+        yield i
+
+
+def test_thread_last():
+    coll = [1, 2, 3, 4, 5, 6, 7, 1]
+    assert c.thread_last(coll) is coll
+    assert c.thread_last(coll, (map, c.inc), (filter, c.is_even), c.distinct, c.count) == 4
+    assert c.thread_last(coll, (c.map, c.inc), (c.filter, c.is_even), c.distinct, list) == [2, 4, 6, 8]
+    assert c.thread_last(coll, (map, c.inc), c.first) == 2
+    assert c.thread_last(coll, (map, c.inc), (c.some, lambda x: x > 4)) == 5
+    assert c.thread_last(coll, (c.take, 0), c.count) == 0
+    assert c.thread_last(coll, (map, c.inc), list, len, c.inc) == 9
+    assert c.thread_last(coll, (c.interpose, 0), (c.take, 3), list) == [1, 0, 2]
+    # map with several collections isn't fused
+    assert c.thread_last([1, 2], (map, lambda x, y: x + y, [10, 20]), list) == [11, 22]
+    assert c.thread_last(infinite_range_fn(), (map, c.inc), (c.drop, 2), (c.take, 3), list) == [3, 4, 5]
+
+    # a fused pipeline is returned as an iterator, like the sequence functions return
+    it = c.thread_last(coll, (map, c.inc), (c.take, 3))
+    assert next(it) == 2
+    assert list(it) == [3, 4]
+    it = c.thread_last(infinite_range_fn(), (c.filter, c.is_even))
+    assert next(it) == 0
+    assert next(it) == 2
+
+
+def test_thread_last_unhashable_function():
+    class Adder(object):
+        __hash__ = None  # type: ignore[assignment]
+
+        def __call__(self, coll):
+            return [x + 1 for x in coll]
+
+    assert c.thread_last([1, 2], Adder(), (map, c.inc), list) == [3, 4]
+    assert c.thread_last([1, 2], (map, c.inc), Adder()) == [3, 4]
+
+
+def test_pipeline():
+    p = c.Pipeline(range(10)).map(c.inc).filter(c.is_even)
+    assert list(p) == [2, 4, 6, 8, 10]
+    # pipelines are immutable and re-iterable when the source is
+    assert list(p.take(2)) == [2, 4]
+    assert list(p) == [2, 4, 6, 8, 10]
+
+    assert list(c.Pipeline([])) == []
+    assert list(c.Pipeline([1, 2, 3])) == [1, 2, 3]
+    assert list(c.Pipeline(range(10)).remove(c.is_even)) == [1, 3, 5, 7, 9]
+    assert list(c.Pipeline([1, None, False, 2]).keep(c.identity)) == [1, False, 2]
+    assert list(c.Pipeline(range(10)).take_while(lambda x: x < 4).map(c.inc)) == [1, 2, 3, 4]
+    assert list(c.Pipeline([1, 2, 1, 3, 2]).distinct()) == [1, 2, 3]
+    assert list(c.Pipeline([1, 1, 2, 1, 1, None, None]).dedupe()) == [1, 2, 1, None]
+    assert list(c.Pipeline(range(10)).drop(3).drop(4)) == [7, 8, 9]
+    # a negative drop drops nothing, even when it's merged with another one
+    assert c.thread_last(range(5), (c.drop, -2), (c.drop, 3), list) == [3, 4]
+    assert list(c.Pipeline(iter(range(5))).drop(3).drop(-2)) == [3, 4]
+    assert list(c.Pipeline(range(10)).take(5).take(3)) == [0, 1, 2]
+    assert list(c.Pipeline(range(10)).take(0)) == []
+    assert list(c.Pipeline(range(10)).filter(c.is_odd).drop(2).take(2)) == [5, 7]
+    assert list(c.Pipeline(range(10)).take(4).filter(c.is_odd)) == [1, 3]
+    assert list(c.Pipeline([1, 1, 2]).then(c.interpose, 0).dedupe()) == [1, 0, 1, 0, 2]
+    assert list(c.Pipeline(range(6)).then(c.partition_by, c.is_even).map(len)) == [1, 1, 1, 1, 1, 1]
+
+
+def test_pipeline_terminals():
+    p = c.Pipeline(range(10)).map(c.inc).filter(c.is_even)
+    assert p.first() == 2
+    assert p.some(lambda x: x > 5) == 6
+    assert p.some(lambda x: x > 50) is None
+    assert p.count() == 5
+    assert p.take(2).count() == 2
+    assert p.take(0).first() is None
+    assert c.Pipeline([]).first() is None
+    assert c.Pipeline(range(3)).count() == 3
+    assert c.Pipeline(range(3)).then(c.interpose, 0).count() == 5
+    assert c.Pipeline(range(3)).then(c.interpose, 9).some(c.is_odd) == 9
+
+    assert c.Pipeline(infinite_range_fn()).map(c.inc).first() == 1
+    assert c.Pipeline(infinite_range_fn()).filter(lambda x: x > 100).some(c.is_even) == 102
+
+
+def test_pipeline_count_without_running():
+    def boom(_):
+        raise RuntimeError("boom!")
+
+    assert c.Pipeline(range(10)).map(boom).drop(3).take(5).count() == 5
+    assert c.Pipeline(range(10)).drop(20).count() == 0
+    assert c.Pipeline(range(5)).drop(-2).count() == c.count(c.drop(-2, range(5))) == 5
+    assert c.Pipeline(range(5)).drop(-2).take(3).count() == 3
+    assert c.thread_last(list(range(10)), (map, boom), (c.take, 4), c.count) == 4
+    with pytest.raises(RuntimeError):
+        c.Pipeline(range(10)).map(boom).filter(c.is_even).count()
+    assert c.Pipeline(iter(range(10))).map(c.inc).count() == 10
+
+
+def test_pipeline_early_termination():
+    pulled: list[int] = []
+    assert list(c.Pipeline(counting_gen(10, pulled)).map(c.inc).take(3)) == [1, 2, 3]
+    assert pulled == [0, 1, 2]
+
+    pulled = []
+    assert c.Pipeline(counting_gen(10, pulled)).take(3).filter(c.is_even).count() == 2
+    assert pulled == [0, 1, 2]
+
+    pulled = []
+    assert c.Pipeline(counting_gen(10, pulled)).take(0).count() == 0
+    assert pulled == []
+
+    pulled = []
+    assert c.Pipeline(counting_gen(10, pulled)).some(lambda x: x == 2) == 2
+    assert pulled == [0, 1, 2]
+
+
+def test_pipeline_explain():
+    p = c.Pipeline([1, 2, 3]).drop(1).map(c.inc).then(c.interpose, 0).take(2).take(5)
+    assert p.explain() == "\n".join([
+        "source: list",
+        "  skip the first 1 items",
+        "fused loop:",
+        "  map(inc)",
+        "interpose(0, …)",
+        "fused loop:",
+        "  take(2), stops pulling items after the last one",
+    ])
+    assert "map(inc)" in repr(p)
+
+
+def test_compile_cache():
+    assert _compile(("map", "filter"), "iter") is _compile(("map", "filter"), "iter")
+    assert _compile(("map", "filter"), "iter") is not _compile(("map", "filter"), "count")
+    with pytest.raises(ValueError):
+        _compile(("nope",), "iter")
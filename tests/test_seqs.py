@@ -1,10 +1,12 @@
+import operator
 import re
 from collections import OrderedDict, Counter, deque, defaultdict
-from typing import Iterable, Any, cast, Union
+from typing import Iterable, Iterator, Any, cast, Union
 
 import pytest
 
 import clj as c
+from clj.sketches import BloomFilter, CountMinSketch, LRUWindow, SpaceSaving
 
 IntNode = Union[int, list["IntNode"]]
 StrNode = Union[str, list["StrNode"]]
@@ -39,6 +41,24 @@ def test_distinct():
     assert list(c.distinct([2, 1, 3, 1, 2, 3])) == [2, 1, 3]
 
 
+def test_distinct_key():
+    assert list(c.distinct(["a", "B", "b", "A", "c"], key=str.lower)) == ["a", "B", "c"]
+    assert list(c.distinct([{"id": 1}, {"id": 2}, {"id": 1}], key=lambda d: d["id"])) == [{"id": 1}, {"id": 2}]
+
+
+def test_distinct_seen():
+    seen: set[int] = set()
+    assert list(c.distinct([1, 2, 1, 3], seen=seen)) == [1, 2, 3]
+    assert seen == {1, 2, 3}
+    # the keys are stored in seen
+    seen = {2}
+    assert list(c.distinct([1, 2, 3], key=c.inc, seen=seen)) == [2, 3]
+    assert seen == {2, 3, 4}
+
+    assert list(c.distinct([1, 2, 1, 3, 1, 2, 4, 2], seen=LRUWindow(2))) == [1, 2, 3, 2, 4]
+    assert list(c.take(5, c.distinct(infinite_range_fn(), seen=BloomFilter(100, 0.01)))) == [0, 1, 2, 3, 4]
+
+
 def test_filter():
     assert c.filter(lambda _: True, infinite_range_fn()) is not None
 
@@ -130,6 +150,24 @@ def test_interleave():
     assert list(c.interleave(range(500, 1000), range(2))) \
            == [500, 0, 501, 1]
 
+    assert list(c.interleave()) == []
+    assert list(c.interleave([1, 2])) == [1, 2]
+
+
+def test_interleave_longest():
+    assert list(c.interleave_longest()) == []
+    assert list(c.interleave_longest([1, 2])) == [1, 2]
+    assert list(c.interleave_longest("abc", [], "de", "f")) == ["a", "d", "f", "b", "e", "c"]
+    assert list(c.interleave_longest(range(2), range(10, 15))) == [0, 10, 1, 11, 12, 13, 14]
+    assert list(c.interleave_longest(range(2), "abc", fill=None)) == [0, "a", 1, "b", None, "c"]
+    assert list(c.take(5, c.interleave_longest([1], infinite_range_fn()))) == [1, 0, 1, 2, 3]
+
+    shards = [range(i) for i in range(100)]
+    merged = list(c.interleave_longest(*shards))
+    assert sorted(merged) == sorted(x for shard in shards for x in shard)
+    assert merged[:99] == [0] * 99
+    assert merged[-3:] == [97, 97, 98]
+
 
 def test_interpose():
     assert c.interpose(42, infinite_range_fn()) is not None
@@ -157,6 +195,27 @@ def test_drop():
     assert list(c.drop(3, [1, 2, 3, 4])) == [4]
 
 
+def test_drop_fast_paths():
+    assert list(c.drop(10 ** 18 - 2, range(10 ** 18))) == [10 ** 18 - 2, 10 ** 18 - 1]
+    assert list(c.drop(2, "abcd")) == ["c", "d"]
+    assert list(c.drop(3, (1, 2, 3, 4))) == [4]
+    assert list(c.drop(1, (1, 2, 3, 4))) == [2, 3, 4]
+    assert list(c.drop(5, (1, 2, 3, 4))) == []
+    assert list(c.drop(2, iter([1, 2, 3]))) == [3]
+
+    consumed = []
+
+    def gen():
+        for x in range(10):
+            consumed.append(x)
+            yield x
+
+    g = c.drop(3, gen())
+    assert consumed == []
+    assert next(g) == 3
+    assert consumed == [0, 1, 2, 3]
+
+
 def test_drop_while():
     assert c.drop_while(lambda _: True, infinite_range_fn()) is not None
     assert list(c.drop_while(lambda _: True, [])) == []
@@ -194,6 +253,13 @@ def test_take_nth():
     assert list(c.take_nth(2, c.interleave(ls, range(20)))) == ls
 
 
+def test_take_fast_paths():
+    assert list(c.take(3, range(10 ** 18))) == [0, 1, 2]
+    assert list(c.take(-3, range(10))) == []
+    assert list(c.take_nth(2, "abcde")) == ["a", "c", "e"]
+    assert list(c.take_nth(0, [])) == []
+
+
 def test_take_while():
     assert c.take_while(lambda _: True, infinite_range_fn()) is not None
     assert list(c.take_while(lambda _: True, [])) == []
@@ -209,6 +275,23 @@ def test_butlast():
     assert list(c.butlast([1, 2, 3, 4])) == [1, 2, 3]
 
 
+def test_butlast_fast_paths():
+    assert c.first(c.butlast(range(10 ** 18))) == 0
+    assert list(c.butlast("abc")) == ["a", "b"]
+    assert list(c.butlast(range(0))) == []
+    assert list(c.butlast({1: 2, 3: 4})) == [1]
+
+
+def test_drop_last_fast_paths():
+    assert c.last(c.drop_last(5, range(10 ** 6))) == 10 ** 6 - 6
+    assert list(c.drop_last(2, "abcd")) == ["a", "b"]
+    assert list(c.drop_last(2, (1, 2, 3))) == [1]
+    assert list(c.drop_last(2, iter([1, 2, 3]))) == [1]
+    assert list(c.drop_last(0, iter([1, 2, 3]))) == [1, 2, 3]
+    assert list(c.drop_last(-1, (1, 2, 3))) == [1, 2, 3]
+    assert list(c.drop_last(5, (1, 2, 3))) == []
+
+
 def test_drop_last():
     assert list(c.drop_last(0, [])) == []
     assert list(c.drop_last(1, [])) == []
@@ -256,6 +339,37 @@ def test_flatten_deep_list():
     assert list(c.flatten(deep_list)) == ["foo"]
 
 
+@pytest.mark.parametrize("depth, expected", [
+    (0, [1, [2, [3, [4]]], (5,)]),
+    (1, [1, 2, [3, [4]], 5]),
+    (2, [1, 2, 3, [4], 5]),
+    (3, [1, 2, 3, 4, 5]),
+    (None, [1, 2, 3, 4, 5]),
+])
+def test_flatten_depth(depth, expected):
+    assert list(c.flatten([1, [2, [3, [4]]], (5,)], depth=depth)) == expected
+
+
+def test_flatten_atomic():
+    class Point(tuple):
+        pass
+
+    xs = [{"a": 1}, [b"xy", Point((1, 2))], {3}]
+    assert list(c.flatten(xs)) == ["a", b"xy", 1, 2, 3]
+    assert list(c.flatten(xs, atomic=(bytes, dict, Point))) == [{"a": 1}, b"xy", Point((1, 2)), 3]
+    assert list(c.flatten(xs, atomic=())) == ["a", 120, 121, 1, 2, 3]
+    # strings are never flattened
+    assert list(c.flatten(["ab", ["c"]], atomic=())) == ["ab", "c"]
+
+
+def test_flatten_mixed_types():
+    class Seq(list):
+        pass
+
+    assert list(c.flatten([(1, 2.5, None), [True, "a", Seq([1j, [b"b"]])], [[]]])) \
+        == [1, 2.5, None, True, "a", 1j, b"b"]
+
+
 def test_reverse():
     assert list(c.reverse([])) == []
     assert list(c.reverse([1, 2, 3])) == [3, 2, 1]
@@ -300,6 +414,13 @@ def test_split_with():
                              infinite_range_fn())[0]) == [0, 1]
 
 
+def test_reductions():
+    assert list(c.reductions(operator.add, [1, 2, 3])) == [1, 3, 6]
+    assert list(c.reductions(operator.add, range(4), 10)) == [10, 10, 11, 13, 16]
+    assert list(c.reductions(operator.add, iter([1, 2]))) == [1, 3]
+    assert list(c.reductions(operator.add, [])) == [None]
+
+
 def test_replace():
     assert c.replace({0: 1}, infinite_range_fn()) is not None
     assert list(c.replace({}, [])) == []
@@ -357,6 +478,8 @@ def test_nth():
     assert c.nth([42, 1, 2, 3], 6, 7) == 7
 
     assert c.nth(infinite_range_fn(), 20) == 20
+    assert c.nth(iter([1, 2]), 2, nope) == nope
+    assert c.nth(range(10 ** 18), 10 ** 17) == 10 ** 17
 
 
 def test_last():
@@ -365,6 +488,19 @@ def test_last():
     assert c.last([1, 2]) == 2
 
 
+def test_last_fast_paths():
+    assert c.last(range(10 ** 18)) == 10 ** 18 - 1
+    assert c.last("abc") == "c"
+    assert c.last("") is None
+    assert c.last((1, 2)) == 2
+    assert c.last(deque([1, 2, 3])) == 3
+    assert c.last({"a": 1, "b": 2}) == "b"
+    assert c.last({}) is None
+    assert c.last({3}) == 3
+    assert c.last(iter([1, 2, 3])) == 3
+    assert c.last(x for x in range(0)) is None
+
+
 def test_zipmap():
     assert c.zipmap([], []) == {}
     assert c.zipmap([], infinite_range_fn()) == {}
@@ -381,6 +517,28 @@ def test_group_by():
            == {1: [1, 5001], 3: [3]}
 
 
+def test_frequencies():
+    assert c.frequencies([]) == {}
+    assert c.frequencies("abracadabra") == {"a": 5, "b": 2, "r": 2, "c": 1, "d": 1}
+    assert c.frequencies(range(10), c.is_even) == {True: 5, False: 5}
+    assert c.frequencies("abracadabra").most_common(1) == [("a", 5)]
+
+    sketch = SpaceSaving(10)
+    assert c.frequencies("abracadabra", sketch=sketch) is sketch
+    assert sketch.top(2) == [("a", 5), ("b", 2)]
+    assert c.frequencies(range(10), c.is_even, sketch=CountMinSketch())[True] == 5
+
+
+@pytest.mark.parametrize("max_items", [1, 2, 7, 1000])
+def test_group_by_max_items(max_items, tmp_path):
+    coll = [(i * 7) % 23 for i in range(100)]
+    expected = c.group_by(c.is_even, coll)
+    with c.group_by(c.is_even, coll, max_items, spill_dir=tmp_path) as groups:
+        assert list(groups) == list(expected)
+        assert {k: list(v) for k, v in groups.items()} == expected
+        assert {k: len(v) for k, v in groups.items()} == {k: len(v) for k, v in expected.items()}
+
+
 def test_some():
     assert c.some(lambda e: True, []) is None
     assert c.some(lambda e: False, []) is None
@@ -504,6 +662,72 @@ def test_count():
     assert c.count(NotIterable()) == 42
 
 
+def test_count_sized_results():
+    def boom(*_):
+        raise RuntimeError("boom!")
+
+    coll = list(range(10))
+    # the length is computed without realizing the items
+    assert c.count(c.map(boom, coll)) == 10
+    assert c.count(c.map(boom, coll, "abc")) == 3
+    assert c.count(c.map_indexed(boom, coll)) == 10
+    assert c.count(c.interpose(0, c.map(boom, coll))) == 19
+    assert c.count(c.interpose(0, [])) == 0
+    assert c.count(c.take(3, c.map(boom, coll))) == 3
+    assert c.count(c.take(30, coll)) == 10
+    assert c.count(c.drop(3, coll)) == 7
+    assert c.count(c.drop(8, range(10))) == 2
+    assert c.count(c.drop(30, coll)) == 0
+    assert c.count(c.rest(coll)) == 9
+    assert c.count(c.butlast(coll)) == 9
+    assert c.count(c.drop_last(3, coll)) == 7
+    assert c.count(c.cons(1, c.map(boom, coll))) == 11
+    assert c.count(c.concat(coll, "ab", c.map(boom, coll))) == 22
+
+    # the length is what's left
+    s = c.map(c.inc, coll)
+    assert next(s) == 1
+    assert c.count(s) == 9
+    assert list(c.take(2, s)) == [2, 3]
+    assert c.count(s) == 7
+    assert list(s) == [4, 5, 6, 7, 8, 9, 10]
+    assert c.count(s) == 0
+
+    assert c.seq_gen(c.map(boom, [])) is None
+    s = c.map(c.inc, coll)
+    assert c.seq_gen(s) is s
+    e = c.empty(s)
+    assert e is not None and c.count(e) == 0 and list(e) == []
+
+    # the length follows the input
+    queue = [1]
+    s = c.map(c.inc, queue)
+    assert c.count(s) == 1
+    queue.extend([2, 3])
+    assert c.count(s) == 3
+    assert list(s) == [2, 3, 4]
+
+    queue = [1]
+    for x in c.map(c.identity, queue):
+        if x < 5:
+            queue.append(x + 1)
+    assert queue == [1, 2, 3, 4, 5]
+
+    s = c.interpose(0, c.drop(1, c.PersistentVector(range(5))))
+    for n in range(7, -1, -1):
+        assert c.count(s) == n
+        next(s, None)
+
+    # they are still iterators
+    strings = c.map(str, [])
+    assert iter(strings) is strings
+    assert strings
+
+    # unsized inputs are not affected
+    assert not hasattr(c.map(c.inc, iter(coll)), "__len__")
+    assert c.count(c.interpose(0, iter(coll))) == 19
+
+
 def test_tree_seq_no_children():
     def boom(_):
         raise RuntimeError("boom!")
@@ -527,6 +751,45 @@ def test_tree_seq2():
            == ["C", "l", "o", "j", "u", "r", "e"]
 
 
+@pytest.mark.parametrize("order, max_depth, expected", [
+    ("pre", None, ["C", "l", "o", "j", "u", "r", "e"]),
+    ("post", None, ["o", "j", "l", "r", "u", "e", "C"]),
+    ("breadth", None, ["C", "l", "u", "e", "o", "j", "r"]),
+    ("pre", 1, ["C", "l", "u", "e"]),
+    ("post", 1, ["l", "u", "e", "C"]),
+    ("breadth", 1, ["C", "l", "u", "e"]),
+    ("pre", 0, ["C"]),
+    ("post", 0, ["C"]),
+    ("breadth", 0, ["C"]),
+])
+def test_tree_seq_order_max_depth(order, max_depth, expected):
+    t: StrNode = ["C", ["l", ["o"], ["j"]], ["u", ["r"]], ["e"]]
+    assert list(map(c.first, c.tree_seq(c.rest, c.rest, t, order, max_depth))) == expected
+
+
+def test_tree_seq_deep():
+    # A linked list of 100k nodes: (0, (1, (2, ...)))
+    t: Any = None
+    for i in reversed(range(100000)):
+        t = (i, t)
+
+    for order in ("pre", "post", "breadth"):
+        nodes = c.tree_seq(c.second, lambda node: (node[1],), t, order=order)
+        assert c.count(nodes) == 100000
+
+
+def test_tree_seq_is_lazy():
+    def get_children(n):
+        assert n < 5
+        return [n + 1, n + 1]
+
+    assert list(c.take(6, c.tree_seq(c.constantly(True), get_children, 0))) == [0, 1, 2, 3, 4, 5]
+    assert list(c.take(3, c.tree_seq(c.constantly(True), get_children, 0, order="breadth"))) == [0, 1, 1]
+
+    with pytest.raises(ValueError):
+        c.tree_seq(c.constantly(True), get_children, 0, order="in")  # type: ignore
+
+
 def test_dedupe():
     assert list(c.dedupe([])) == []
     assert list(c.dedupe([1])) == [1]
@@ -579,6 +842,85 @@ def test_partition():
     assert list((c.partition([1, 2, 3, 4], 3, pad=[5, 6]))) == [[1, 2, 3], [4, 5, 6]]
 
 
+def _clojure_partition(coll, n, step, pad=None, all_=False):
+    # Naive port of Clojure's partition and partition-all
+    coll = list(coll)
+    result = []
+    while coll:
+        p = coll[:n]
+        if len(p) == n or all_:
+            result.append(p)
+            coll = coll[step:]
+        else:
+            if pad is not None:
+                result.append(p + list(pad)[:n - len(p)])
+            break
+    return result
+
+
+@pytest.mark.parametrize("n, step", [(1, 1), (2, 1), (3, 1), (3, 2), (4, 3), (2, 3), (1, 4), (3, 7), (5, 5)])
+@pytest.mark.parametrize("size", [0, 1, 2, 5, 10, 11])
+def test_partition_step(n, step, size):
+    def inputs():
+        return [list(range(size)), tuple(range(size)), range(size), iter(range(size)), (x for x in range(size))]
+
+    for coll in inputs():
+        assert list(c.partition(coll, n, step)) == _clojure_partition(range(size), n, step)
+    for coll in inputs():
+        assert list(c.partition(coll, n, step, pad=["a", "b"])) \
+               == _clojure_partition(range(size), n, step, pad=["a", "b"])
+    for coll in inputs():
+        assert list(c.partition_all(coll, n, step)) == _clojure_partition(range(size), n, step, all_=True)
+
+
+def test_partition_step_examples():
+    # From https://clojuredocs.org/clojure.core/partition
+    # (partition 4 6 ["a" "b" "c" "d"] (range 20))
+    # => ((0 1 2 3) (6 7 8 9) (12 13 14 15) (18 19 "a" "b"))
+    assert list(c.partition(range(20), 4, 6, ["a", "b", "c", "d"])) \
+           == [[0, 1, 2, 3], [6, 7, 8, 9], [12, 13, 14, 15], [18, 19, "a", "b"]]
+    # (partition 3 1 [:a] [1 2 3 4]) => ((1 2 3) (2 3 4) (3 4 :a))
+    assert list(c.partition(iter([1, 2, 3, 4]), 3, 1, ["a"])) == [[1, 2, 3], [2, 3, 4], [3, 4, "a"]]
+    assert list(c.take(3, c.partition(infinite_range_fn(), 3, 1))) == [[0, 1, 2], [1, 2, 3], [2, 3, 4]]
+    assert list(c.partition("abcd", 2, 1)) == [["a", "b"], ["b", "c"], ["c", "d"]]
+
+    with pytest.raises(ValueError):
+        list(c.partition([1, 2], 2, 0))
+
+
+def test_partition_pad_too_long():
+    assert list(c.partition([1, 2, 3, 4], 3, pad=[5, 6, 7])) == [[1, 2, 3], [4, 5, 6]]
+
+
+def test_partition_all():
+    assert c.partition_all(infinite_range_fn(), 3) is not None
+    assert list(c.partition_all([], 2)) == []
+    assert list(c.partition_all([1, 2, 3], 0)) == []
+    assert list(c.partition_all([1, 2, 3], 2)) == [[1, 2], [3]]
+    assert list(c.partition_all(iter([1, 2, 3]), 2)) == [[1, 2], [3]]
+    # (partition-all 4 2 [0 1 2 3 4 5 6 7 8 9]) => ((0 1 2 3) (2 3 4 5) (4 5 6 7) (6 7 8 9) (8 9))
+    assert list(c.partition_all(range(10), 4, 2)) \
+           == [[0, 1, 2, 3], [2, 3, 4, 5], [4, 5, 6, 7], [6, 7, 8, 9], [8, 9]]
+
+
+def test_partition_views():
+    import array
+
+    data = array.array("i", range(6))
+    windows = list(c.partition(data, 3, 1, views=True))
+    assert all(isinstance(w, memoryview) for w in windows)
+    assert [list(w) for w in windows] == [[0, 1, 2], [1, 2, 3], [2, 3, 4], [3, 4, 5]]
+
+    # zero-copy: the views share the memory of the input
+    data[2] = 42
+    assert list(windows[0]) == [0, 1, 42]
+
+    assert [bytes(w) for w in c.partition_all(b"abcde", 2, views=True)] == [b"ab", b"cd", b"e"]
+    assert list(c.partition([1, 2, 3, 4], 2, 1, views=True)) == [(1, 2), (2, 3), (3, 4)]
+    assert list(c.partition(iter([1, 2, 3, 4]), 3, 1, pad=[0], views=True)) == [(1, 2, 3), (2, 3, 4), (3, 4, 0)]
+    assert list(c.partition_all((x for x in range(3)), 2, views=True)) == [(0, 1), (2,)]
+
+
 def test_partition_by():
     assert list(c.partition_by(c.is_odd, [])) == []
     assert list(c.partition_by(c.identity, [{"a": 2}, False])) == [[{"a": 2}], [False]]
@@ -625,3 +967,157 @@ def test_seq_gen():
         it = c.seq_gen(coll)
         assert it is not None
         assert list(it) == expected
+
+
+def test_split_at_lazy_prefix():
+    consumed = []
+
+    def gen():
+        for x in range(10):
+            consumed.append(x)
+            yield x
+
+    taken, dropped = c.split_at(3, gen())
+    assert consumed == []
+    assert list(dropped) == [3, 4, 5, 6, 7, 8, 9]
+    assert list(taken) == [0, 1, 2]
+
+    taken, dropped = c.split_at(3, c.range())
+    assert list(taken) == [0, 1, 2]
+    assert list(c.take(2, dropped)) == [3, 4]
+
+    assert c.split_at(2, iter([1, 2, 3]))[0] == [1, 2]
+    # the rest of a sequence is iterated over lazily rather than copied
+    head, tail = c.split_at(2, "abcd")
+    assert head == ["a", "b"]
+    assert isinstance(tail, Iterator)
+    assert list(tail) == ["c", "d"]
+    coll = [1, 2, 3]
+    taken_list, dropped_list = c.split_at(2, coll)
+    coll.append(4)
+    assert taken_list == [1, 2]
+    assert list(dropped_list) == [3, 4]
+
+
+def test_split_with_lazy_prefix():
+    calls = []
+
+    def pred(x):
+        calls.append(x)
+        return x < 3
+
+    taken, dropped = c.split_with(pred, iter(range(6)))
+    assert calls == []
+    assert list(dropped) == [3, 4, 5]
+    assert list(taken) == [0, 1, 2]
+    assert calls == [0, 1, 2, 3]
+
+    assert c.split_with(c.is_odd, iter([1, 3, 4]))[0] == [1, 3]
+    head, tail = c.split_with(lambda x: x < "c", "abcd")
+    assert head == ["a", "b"]
+    assert isinstance(tail, Iterator)
+    assert list(tail) == ["c", "d"]
+
+
+def test_lazy_seq():
+    consumed = []
+
+    def gen():
+        for x in range(100):
+            consumed.append(x)
+            yield x
+
+    s = c.LazySeq(gen(), chunk_size=10)
+    assert consumed == []
+    assert not c.is_realized(s)
+
+    assert c.first(s) == 0
+    assert len(consumed) == 10
+    assert c.nth(s, 15) == 15
+    assert len(consumed) == 20
+    assert list(c.rest(c.take(3, s))) == [1, 2]
+    assert c.second(s) == 1
+    assert s[2:5] == [2, 3, 4]
+    assert len(consumed) == 20
+
+    assert list(s) == list(range(100))
+    assert list(s) == list(range(100))
+    assert consumed == list(range(100))
+    assert c.is_realized(s)
+    assert s[-1] == 99
+
+
+def test_lazy_seq_equality():
+    s = c.LazySeq(iter([1, 2, 3]))
+    assert s == [1, 2, 3]
+    assert [1, 2, 3] == s
+    assert s == (1, 2, 3)
+    assert s == c.LazySeq(range(1, 4))
+    assert s != [1, 2]
+    assert s != [1, 2, 4]
+    assert s != "abc"
+    assert c.LazySeq("abc") != "abc"
+    assert hash(s) == hash((1, 2, 3))
+
+
+def test_lazy_seq_infinite():
+    s = c.LazySeq(infinite_range_fn())
+    assert list(c.take(3, s)) == [0, 1, 2]
+    assert c.nth(s, 100) == 100
+    assert s
+    assert "..." in repr(s)
+
+
+def test_lazy_seq_empty():
+    assert list(c.LazySeq()) == []
+    assert list(c.LazySeq([])) == []
+    assert not c.LazySeq([])
+    assert c.seq_gen(c.LazySeq([])) is None
+    assert c.first(c.LazySeq([])) is None
+    assert c.nth(c.LazySeq([]), 3, "nope") == "nope"
+
+    s = c.LazySeq([1, 2])
+    assert repr(s) == "LazySeq([...])"
+    s.realize()
+    assert repr(s) == "LazySeq([1, 2])"
+
+
+def test_lazy_seq_concurrent_iteration():
+    import threading
+
+    def gen():
+        for x in range(10000):
+            yield x
+
+    s = c.LazySeq(gen(), chunk_size=7)
+    results = [None] * 8
+
+    def consume(i):
+        results[i] = list(s)
+
+    threads = [threading.Thread(target=consume, args=(i,)) for i in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert all(r == list(range(10000)) for r in results)
+
+
+def test_lazy_seq_exception():
+    def gen():
+        yield 1
+        yield 2
+        raise RuntimeError("boom!")
+
+    s = c.LazySeq(gen())
+    with pytest.raises(RuntimeError):
+        list(s)
+    assert s[:2] == [1, 2]
+
+
+def test_is_realized():
+    assert c.is_realized([])
+    assert c.is_realized([1, 2, 3])
+    assert not c.is_realized(iter([]))
+    assert not c.is_realized(infinite_range_fn())
@@ -0,0 +1,183 @@
+import collections
+import random
+
+import pytest
+
+from clj.sketches import BloomFilter, CountMinSketch, LRUWindow, SpaceSaving
+
+
+def test_lru_window():
+    w = LRUWindow(3)
+    assert len(w) == 0
+    for x in [1, 2, 3]:
+        w.add(x)
+    assert 4 not in w
+    assert 1 in w
+
+    # 1 was seen most recently by `in`, so 2 is evicted
+    w.add(4)
+    assert 2 not in w
+    assert 1 in w and 3 in w and 4 in w
+    assert len(w) == 3
+    assert w.stats()["evictions"] == 1
+    assert w.stats()["items"] == 3
+    assert w.stats()["size"] == 3
+    assert w.stats()["bytes"] > 0
+
+    with pytest.raises(ValueError):
+        LRUWindow(0)
+
+
+def test_bloom_filter_has_no_false_negative():
+    b = BloomFilter(1000, 0.01)
+    for x in range(1000):
+        b.add(x)
+        b.add("s%d" % x)
+    assert all(x in b for x in range(1000))
+    assert all("s%d" % x in b for x in range(1000))
+    assert len(b) == 2000
+
+
+def test_bloom_filter_error_rate():
+    b = BloomFilter(10000, 0.01)
+    for x in range(10000):
+        b.add(x)
+
+    false_positives = sum(1 for x in range(10000, 110000) if x in b)
+    assert false_positives / 100000 < 0.02
+    assert 0.005 < b.estimated_error_rate() < 0.015
+
+
+def test_bloom_filter_stats():
+    b = BloomFilter(1000, 0.01)
+    stats = b.stats()
+    assert stats["items"] == 0
+    assert stats["capacity"] == 1000
+    assert stats["hashes"] == 7
+    # ~9.6 bits per item for 1%
+    assert 9000 < stats["bits"] < 10000
+    assert stats["bytes"] == (stats["bits"] + 7) // 8
+    assert stats["error_rate"] == 0
+
+
+def test_bloom_filter_positions_are_distinct():
+    for x in range(1000):
+        b = BloomFilter(1, 0.01)
+        b.add(x)
+        # each hash function sets its own bit
+        assert sum(bin(byte).count("1") for byte in b._array) == b.hashes
+
+
+@pytest.mark.parametrize("capacity, error_rate", [(0, 0.1), (10, 0), (10, 1), (10, -0.1)])
+def test_bloom_filter_invalid(capacity, error_rate):
+    with pytest.raises(ValueError):
+        BloomFilter(capacity, error_rate)
+
+
+def zipf_stream(n, seed=0):
+    """
+    Return a list of ``n`` items whose frequencies follow a Zipf-like distribution.
+    """
+    rng = random.Random(seed)
+    return [int(1 / rng.random()) for _ in range(n)]
+
+
+def test_space_saving_exact_when_few_items():
+    s = SpaceSaving(10)
+    s.update("abracadabra")
+    assert s.top() == [("a", 5), ("b", 2), ("r", 2), ("c", 1), ("d", 1)]
+    assert s["a"] == 5
+    assert s["z"] == 0
+    assert s.error("a") == 0
+    assert s.error("z") == 0
+    assert len(s) == 5
+    assert s.stats()["total"] == 11
+
+
+def test_space_saving_error_bounds():
+    stream = zipf_stream(20000)
+    actual = collections.Counter(stream)
+    k = 50
+    s = SpaceSaving(k)
+    s.update(stream)
+
+    assert len(s) == k
+    bound = len(stream) / k
+    for item, count in s.top():
+        assert actual[item] <= count <= actual[item] + bound
+        assert count - s.error(item) <= actual[item]
+    # all the items whose count is above n / k are tracked
+    for item, count in actual.items():
+        if count > bound:
+            assert s[item] >= count
+    # the most frequent items are found
+    assert [item for item, _ in s.top(3)] == [item for item, _ in actual.most_common(3)]
+
+
+def test_space_saving_merge():
+    stream = zipf_stream(20000)
+    actual = collections.Counter(stream)
+    k = 50
+    left, right = SpaceSaving(k), SpaceSaving(k)
+    left.update(stream[:12000])
+    right.update(stream[12000:])
+
+    merged = left.merge(right)
+    assert merged.total == len(stream)
+    assert len(merged) == k
+    for item, count in merged.top():
+        assert actual[item] <= count <= actual[item] + len(stream) / k
+        assert count - merged.error(item) <= actual[item]
+    assert [item for item, _ in merged.top(3)] == [item for item, _ in actual.most_common(3)]
+
+    small = SpaceSaving(5)
+    small.update("aab")
+    other = SpaceSaving(5)
+    other.update("bc")
+    assert small.merge(other).top() == [("a", 2), ("b", 2), ("c", 1)]
+
+
+def test_count_min_sketch():
+    stream = zipf_stream(20000)
+    actual = collections.Counter(stream)
+    s = CountMinSketch(0.001, 0.99)
+    assert s.width == 2719
+    assert s.depth == 5
+    s.update(stream)
+
+    assert s.total == len(stream)
+    for item, count in actual.items():
+        assert count <= s[item] <= count + 0.001 * len(stream)
+    assert s.stats()["bytes"] == 8 * 2719 * 5
+
+
+def test_count_min_sketch_rows_use_distinct_positions():
+    s = CountMinSketch(0.5, 0.999)
+    assert s.width == 7
+    assert s.depth == 7
+    for item in range(1000):
+        # with step=0 all rows would count the item in the same column, so they'd have the same collisions
+        assert len({pos for _, pos in s._positions(item)}) == s.depth
+
+
+def test_count_min_sketch_merge():
+    stream = [str(x) for x in zipf_stream(10000)]
+    left, right = CountMinSketch(0.01), CountMinSketch(0.01)
+    left.update(stream[:3000])
+    right.update(stream[3000:])
+    whole = CountMinSketch(0.01)
+    whole.update(stream)
+
+    merged = left.merge(right)
+    assert merged.total == whole.total
+    assert all(merged[x] == whole[x] for x in set(stream))
+
+    with pytest.raises(ValueError):
+        left.merge(CountMinSketch(0.1))
+
+
+@pytest.mark.parametrize("make_sketch", [lambda: SpaceSaving(0), lambda: CountMinSketch(0),
+                                         lambda: CountMinSketch(0.1, 1)])
+def test_sketches_invalid(make_sketch):
+    with pytest.raises(ValueError):
+        make_sketch()
@@ -0,0 +1,168 @@
+import operator
+import random
+
+import pytest
+
+import clj as c
+from clj import sorted as srt
+
+
+@pytest.fixture(autouse=True)
+def small_sublists(monkeypatch):
+    # Exercise the splitting and removal of sublists with small collections
+    monkeypatch.setattr(srt, "_LOAD", 4)
+
+
+def test_sorted_set():
+    rng = random.Random(42)
+    s: c.SortedSet[int] = c.SortedSet()
+    expected: set[int] = set()
+    for _ in range(2000):
+        x = rng.randrange(300)
+        if rng.random() < 0.6:
+            s.add(x)
+            expected.add(x)
+        else:
+            s.discard(x)
+            expected.discard(x)
+        assert len(s) == len(expected)
+
+    assert list(s) == sorted(expected)
+    assert list(reversed(s)) == sorted(expected, reverse=True)
+    assert all(x in s for x in expected)
+    assert not any(x in s for x in set(range(300)) - expected)
+    assert [s[i] for i in range(len(s))] == sorted(expected)
+    assert s[-1] == max(expected)
+    with pytest.raises(IndexError):
+        s[len(s)]
+
+
+def test_sorted_set_init():
+    assert list(c.SortedSet([3, 1, 2, 3, 1])) == [1, 2, 3]
+    assert list(c.SortedSet(x for x in range(100, 0, -1))) == list(range(1, 101))
+    assert list(c.SortedSet()) == []
+    assert not c.SortedSet()
+    assert repr(c.sorted_set(2, 1)) == "SortedSet([1, 2])"
+
+
+def test_sorted_set_key():
+    s = c.sorted_set_by(len, "ccc", "a", "bb", "dd")
+    # "dd" has the same key as "bb", so it's the same item
+    assert list(s) == ["a", "bb", "ccc"]
+    assert "xx" in s
+    s.add("zz")
+    assert list(s) == ["a", "bb", "ccc"]
+    s.remove("yy")
+    assert list(s) == ["a", "ccc"]
+
+    # items don't need to be hashable
+    lists = c.SortedSet([[3], [1], [2]], key=c.first)
+    assert list(lists) == [[1], [2], [3]]
+
+
+def test_sorted_set_operators():
+    s = c.sorted_set_by(operator.neg, 1, 2, 3)
+    union = s | {4}
+    assert isinstance(union, c.SortedSet)
+    assert list(union) == [4, 3, 2, 1]
+    assert list(s & {2, 3, 5}) == [3, 2]
+    assert s == {1, 2, 3}
+
+
+def test_sorted_map():
+    rng = random.Random(0)
+    m: c.SortedMap[int, float] = c.SortedMap()
+    expected: dict[int, float] = {}
+    for _ in range(2000):
+        k = rng.randrange(300)
+        if rng.random() < 0.6:
+            m[k] = expected[k] = rng.random()
+        elif k in expected:
+            del m[k]
+            del expected[k]
+        else:
+            with pytest.raises(KeyError):
+                del m[k]
+            with pytest.raises(KeyError):
+                m[k]
+
+    assert len(m) == len(expected)
+    assert list(m) == sorted(expected)
+    assert list(m.items()) == sorted(expected.items())
+    assert list(reversed(m.items())) == sorted(expected.items(), reverse=True)
+    assert list(m.values()) == [v for _, v in sorted(expected.items())]
+    assert m == expected
+    assert m.get(-1) is None
+
+
+def test_sorted_map_init():
+    assert list(c.SortedMap({2: "b", 1: "a"}).items()) == [(1, "a"), (2, "b")]
+    # the last value of a key wins, like in a dict
+    assert list(c.sorted_map(2, "b", 1, "a", 2, "c").items()) == [(1, "a"), (2, "c")]
+    assert list(c.SortedMap([([2], "b"), ([1], "a"), ([2], "c")]).items()) == [([1], "a"), ([2], "c")]
+    assert list(c.sorted_map_by(operator.neg, 1, "a", 2, "b", 1, "c").items()) == [(2, "b"), (1, "c")]
+    assert repr(c.sorted_map(1, 2)) == "SortedMap([(1, 2)])"
+    with pytest.raises(ValueError):
+        c.sorted_map(1, 2, 3)
+
+
+@pytest.mark.parametrize("tests, expected", [
+    ((operator.gt, 10), [x for x in range(0, 50, 2) if x > 10]),
+    ((operator.ge, 10), [x for x in range(0, 50, 2) if x >= 10]),
+    ((operator.lt, 10), [x for x in range(0, 50, 2) if x < 10]),
+    ((operator.le, 10), [x for x in range(0, 50, 2) if x <= 10]),
+    ((operator.gt, 11), [x for x in range(0, 50, 2) if x > 11]),
+    ((operator.ge, 10, operator.lt, 30), [x for x in range(0, 50, 2) if 10 <= x < 30]),
+    ((operator.gt, 10, operator.le, 30), [x for x in range(0, 50, 2) if 10 < x <= 30]),
+    ((operator.gt, 11, operator.lt, 13), [12]),
+    ((operator.gt, 12, operator.lt, 12), []),
+    ((operator.ge, 30, operator.le, 10), []),
+    ((operator.gt, 100), []),
+    ((operator.lt, -1), []),
+    ((operator.ge, -100, operator.le, 100), list(range(0, 50, 2))),
+])
+def test_subseq_rsubseq(tests, expected):
+    s = c.sorted_set(*range(0, 50, 2))
+    assert list(c.subseq(s, *tests)) == expected
+    assert list(c.rsubseq(s, *tests)) == expected[::-1]
+
+    m = c.SortedMap((x, str(x)) for x in range(0, 50, 2))
+    assert list(c.subseq(m, *tests)) == [(x, str(x)) for x in expected]
+    assert list(c.rsubseq(m, *tests)) == [(x, str(x)) for x in expected[::-1]]
+
+
+def test_subseq_key():
+    s = c.SortedSet(["a", "bbb", "cc", "dddd"], key=len)
+    assert list(c.subseq(s, operator.ge, 2)) == ["cc", "bbb", "dddd"]
+    assert list(c.rsubseq(s, operator.lt, 3)) == ["cc", "a"]
+
+
+def test_subseq_invalid():
+    s = c.sorted_set(1, 2)
+    with pytest.raises(ValueError):
+        c.subseq(s, operator.eq, 1)
+    with pytest.raises(ValueError):
+        c.subseq(s, operator.lt, 1, operator.gt, 2)
+
+
+def test_clj_functions():
+    s = c.sorted_set(3, 1, 2)
+    assert c.count(s) == 3
+    assert c.first(s) == 1
+    assert c.last(s) == 3
+    assert c.nth(s, 1) == 2
+    assert list(c.take(2, s)) == [1, 2]
+    assert list(c.drop(2, s)) == [3]
+
+    by = c.sorted_set_by(operator.neg, 1, 2)
+    empty = c.empty(by)
+    assert isinstance(empty, c.SortedSet)
+    assert len(empty) == 0
+    for x in [1, 2, 3]:
+        empty.add(x)
+    assert list(empty) == [3, 2, 1]
+
+    m = c.sorted_map(2, "b", 1, "a")
+    assert c.first(m) == 1
+    assert c.last(m) == 2
+    assert isinstance(c.empty(m), c.SortedMap)
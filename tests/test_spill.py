@@ -0,0 +1,71 @@
+import os
+
+import pytest
+
+import clj as c
+from clj import spill
+
+
+def test_spilled_groups(tmp_path):
+    words = ["apple", "bob", "avocado", "cat", "banana", "cherry", "apricot"]
+    with c.group_by(c.first, words, 2, spill_dir=tmp_path) as groups:
+        assert isinstance(groups, spill.SpilledGroups)
+        assert list(groups) == ["a", "b", "c"]
+        assert len(groups) == 3
+        assert groups.spills == 3
+        assert list(groups["a"]) == ["apple", "avocado", "apricot"]
+        # groups can be iterated over several times, and concurrently
+        assert list(zip(groups["a"], groups["b"], groups["a"])) == [("apple", "bob", "apple"),
+                                                                    ("avocado", "banana", "avocado")]
+        assert len(groups["c"]) == 2
+        assert "d" not in groups
+        with pytest.raises(KeyError):
+            groups["d"]
+
+    # the temporary file is deleted
+    assert os.listdir(tmp_path) == []
+    with pytest.raises(ValueError):
+        list(groups["a"])
+
+
+def test_spilled_groups_in_memory(tmp_path):
+    groups = c.group_by(c.is_even, range(5), 100, spill_dir=tmp_path)
+    assert groups.spills == 0
+    assert dict((k, list(v)) for k, v in groups.items()) == {True: [0, 2, 4], False: [1, 3]}
+    assert os.listdir(tmp_path) == []
+
+
+def test_spilled_groups_invalid():
+    with pytest.raises(ValueError):
+        c.group_by(c.identity, [1], 0)
+
+
+def test_spilled_groups_error(tmp_path):
+    def gen():
+        yield from range(10)
+        raise RuntimeError()
+
+    with pytest.raises(RuntimeError):
+        c.group_by(c.is_even, gen(), 3, spill_dir=tmp_path)
+    assert os.listdir(tmp_path) == []
+
+
+def test_spilled_groups_many_spills(tmp_path):
+    # a few groups that span all the spills, and many groups of one item
+    items = [(i % 3, i) if i % 2 else ("k%d" % i, i) for i in range(1000)]
+    with c.group_by(c.first, items, 10, spill_dir=tmp_path) as groups:
+        assert groups.spills == 100
+        for k in (0, 1, 2):
+            assert list(groups[k]) == [item for item in items if item[0] == k]
+        assert list(groups["k10"]) == [("k10", 10)]
+        # the in-memory index has one offset per group, not one per group and spill
+        assert len(groups._last) == len(groups)
+
+
+def test_spilled_groups_add(tmp_path):
+    groups: spill.SpilledGroups[str, str] = spill.SpilledGroups(2, spill_dir=tmp_path)
+    with groups:
+        for word in ["apple", "bob", "avocado"]:
+            groups.add(word[0], word)
+        assert groups.spills == 1
+        assert dict((k, list(v)) for k, v in groups.items()) == {"a": ["apple", "avocado"], "b": ["bob"]}
@@ -0,0 +1,163 @@
+import operator
+from array import array
+from collections import deque
+
+import pytest
+
+import clj as c
+from clj import transducers as xf
+
+
+def infinite_range_fn():
+    """
+    Test generator that fails if its 10k-th element is consumed.
+    """
+    n = 0
+    while True:
+        yield n
+        n += 1
+        assert n <= 10000
+
+
+def test_transduce():
+    assert c.transduce(xf.map(c.inc), operator.add, [], 0) == 0
+    assert c.transduce(xf.map(c.inc), operator.add, [1, 2, 3], 0) == 9
+    assert c.transduce(xf.map(c.inc), operator.add, [1, 2, 3], 10) == 19
+    assert c.transduce(c.comp(xf.map(c.inc), xf.filter(c.is_even)), operator.add, range(10), 0) == 30
+
+
+def test_transduce_no_init():
+    assert c.transduce(xf.map(c.inc), operator.add, []) is None
+    assert c.transduce(xf.map(c.inc), operator.add, [1]) == 2
+    assert c.transduce(xf.filter(c.is_even), operator.add, [1, 3, 4, 6]) == 10
+    assert c.transduce(xf.filter(c.is_even), operator.add, [1, 3, 5]) is None
+
+
+def test_transduce_early_termination():
+    assert c.transduce(xf.take(3), operator.add, infinite_range_fn(), 0) == 3
+    assert c.transduce(c.comp(xf.filter(c.is_odd), xf.take(2)), operator.add, infinite_range_fn(), 0) == 4
+
+    def add_until_10(acc, x):
+        acc += x
+        return xf.reduced(acc) if acc >= 10 else acc
+
+    assert c.transduce(xf.map(c.identity), add_until_10, infinite_range_fn(), 0) == 10
+
+
+def test_reduced():
+    r = xf.reduced(42)
+    assert xf.is_reduced(r)
+    assert not xf.is_reduced(42)
+    assert xf.unreduced(r) == 42
+    assert xf.unreduced(42) == 42
+    assert xf.ensure_reduced(r) is r
+    assert xf.unreduced(xf.ensure_reduced(3)) == 3
+
+
+@pytest.mark.parametrize("xform, seq_fn", [
+    (xf.map(c.inc), lambda coll: c.map(c.inc, coll)),
+    (xf.filter(c.is_even), lambda coll: c.filter(c.is_even, coll)),
+    (xf.remove(c.is_even), lambda coll: c.remove(c.is_even, coll)),
+    (xf.keep(lambda x: x if x % 3 else None), lambda coll: c.keep(lambda x: x if x % 3 else None, coll)),
+    (xf.keep_indexed(lambda i, x: x if i % 2 else None),
+     lambda coll: c.keep_indexed(lambda i, x: x if i % 2 else None, coll)),
+    (xf.map_indexed(operator.add), lambda coll: c.map_indexed(operator.add, coll)),
+    (xf.mapcat(lambda x: [x, x]), lambda coll: c.mapcat(lambda x: [x, x], coll)),
+    (xf.take(3), lambda coll: c.take(3, coll)),
+    (xf.take(0), lambda coll: c.take(0, coll)),
+    (xf.take_while(lambda x: x < 4), lambda coll: c.take_while(lambda x: x < 4, coll)),
+    (xf.take_nth(3), lambda coll: c.take_nth(3, coll)),
+    (xf.drop(3), lambda coll: c.drop(3, coll)),
+    (xf.drop_while(lambda x: x < 4), lambda coll: c.drop_while(lambda x: x < 4, coll)),
+    (xf.distinct, c.distinct),
+    (xf.dedupe, c.dedupe),
+    (xf.replace({1: "one"}), lambda coll: c.replace({1: "one"}, coll)),
+    (xf.interpose(","), lambda coll: c.interpose(",", coll)),
+    (xf.partition_by(c.is_odd), lambda coll: c.partition_by(c.is_odd, coll)),
+])
+@pytest.mark.parametrize("coll", [[], [1], [1, 1, 2, 3, 3, 3, 8, 4, 1, 2, 7, 5, 6, 6]])
+def test_xforms_match_seqs(xform, seq_fn, coll):
+    assert list(c.eduction(xform, coll)) == list(seq_fn(coll))
+    assert c.into([], xform, coll) == list(seq_fn(coll))
+
+
+def test_cat():
+    assert list(c.eduction(xf.cat, [[1, 2], [], [3]])) == [1, 2, 3]
+    assert list(c.eduction(c.comp(xf.cat, xf.take(2)), [[1], [2, 3, 4], infinite_range_fn()])) == [1, 2]
+
+
+def test_partition_all():
+    assert list(c.eduction(xf.partition_all(2), [])) == []
+    assert list(c.eduction(xf.partition_all(2), [1, 2, 3])) == [[1, 2], [3]]
+    assert list(c.eduction(xf.partition_all(3), [1, 2, 3])) == [[1, 2, 3]]
+    assert list(c.eduction(c.comp(xf.partition_all(2), xf.take(2)), infinite_range_fn())) == [[0, 1], [2, 3]]
+
+    with pytest.raises(ValueError):
+        xf.partition_all(0)
+
+
+def test_stateful_xforms_flush_after_early_termination():
+    assert list(c.eduction(c.comp(xf.take(3), xf.partition_by(c.is_odd)), [1, 3, 2, 4, 5])) == [[1, 3], [2]]
+
+
+def test_eduction():
+    assert c.eduction(xf.map(c.inc), infinite_range_fn()) is not None
+    assert list(c.take(3, c.eduction(xf.map(c.inc), infinite_range_fn()))) == [1, 2, 3]
+
+    ed = c.eduction(c.comp(xf.filter(c.is_odd), xf.distinct), [1, 2, 3, 1, 5])
+    assert list(ed) == [1, 3, 5]
+    # eductions are re-iterable over re-iterable collections
+    assert list(ed) == [1, 3, 5]
+
+
+def test_into():
+    assert c.into([], []) == []
+    assert c.into([1], [2, 3]) == [1, 2, 3]
+    assert c.into(set(), [1, 2, 1]) == {1, 2}
+    assert c.into({}, [("a", 1), ("b", 2)]) == {"a": 1, "b": 2}
+    assert c.into(deque(), (x for x in range(3))) == deque([0, 1, 2])
+
+    assert c.into([], xf.map(c.inc), [1, 2]) == [2, 3]
+    assert c.into(set(), xf.map(c.is_odd), [1, 2, 3]) == {True, False}
+    assert c.into({}, xf.map(lambda x: (x, x * 2)), [1, 2]) == {1: 2, 2: 4}
+    assert c.into([], xf.take(2), infinite_range_fn()) == [0, 1]
+
+    ls = [0]
+    assert c.into(ls, [1]) is ls
+
+
+def test_into_targets():
+    a = c.into(array("i", [1]), [2, 3])
+    assert a == array("i", [1, 2, 3])
+    assert c.into(a, (x for x in [4])) is a
+    assert c.into(a, array("i", [5])) == array("i", [1, 2, 3, 4, 5])
+    assert c.into(array("d"), xf.map(float), [1, 2]) == array("d", [1.0, 2.0])
+    assert c.into(bytearray(b"a"), b"bc") == bytearray(b"abc")
+
+    v = c.vector(1)
+    assert c.into(v, [2, 3]) == c.vector(1, 2, 3)
+    assert c.into(v, xf.map(c.inc), [2]) == c.vector(1, 3)
+    assert v == c.vector(1)
+    assert c.into(c.hash_set(1), [1, 2]) == c.hash_set(1, 2)
+    m = c.into(c.hash_map(), [("a", 1)])
+    assert isinstance(m, c.PersistentHashMap)
+    assert m == {"a": 1}
+
+    s = c.SortedSet([3])
+    assert c.into(s, [2, 1]) is s
+    assert list(s) == [1, 2, 3]
+    assert list(c.into(c.SortedSet(), xf.map(c.dec), [3, 2])) == [1, 2]
+    assert list(c.into(c.SortedMap(), xf.map(lambda x: (x, x)), [2, 1]).items()) == [(1, 1), (2, 2)]
+
+
+def test_into_key_value():
+    words = ["a", "bb", "ccc"]
+    assert c.into({}, words, key=len) == {1: "a", 2: "bb", 3: "ccc"}
+    assert c.into({}, words, value=len) == {"a": 1, "bb": 2, "ccc": 3}
+    assert c.into({}, iter(words), key=len, value=str.upper) == {1: "A", 2: "BB", 3: "CCC"}
+    assert c.into({}, (w for w in words), value=len) == {"a": 1, "bb": 2, "ccc": 3}
+    assert c.into({}, xf.filter(lambda w: len(w) > 1), words, key=len) == {2: "bb", 3: "ccc"}
+    assert c.into(c.hash_map(), words, value=len) == c.hash_map("a", 1, "bb", 2, "ccc", 3)
+
+    with pytest.raises(TypeError):
+        c.into([], words, key=len)
@@ -0,0 +1,126 @@
+import array
+import operator
+
+import pytest
+
+import clj as c
+from clj import vectorized
+
+
+PIPELINES = [
+    lambda p: p.map(c.inc),
+    lambda p: p.map(c.dec).map(c.identity),
+    lambda p: p.map(c.constantly(3)),
+    lambda p: p.filter(c.is_even),
+    lambda p: p.remove(c.is_even).map(c.inc),
+    lambda p: p.filter(c.identity),
+    lambda p: p.map(c.inc).filter(c.is_even).then(c.reductions, operator.add),
+    lambda p: p.filter(c.is_odd).take(5),
+    lambda p: p.drop(3).take(10).drop(2),
+    lambda p: p.take(0).then(c.reductions, operator.add),
+    lambda p: p.then(c.reductions, operator.add).filter(c.is_odd),
+    # not vectorized, or only partially
+    lambda p: p.map(str),
+    lambda p: p.map(c.inc).map(lambda x: x * 2).filter(c.is_even),
+    lambda p: p.map(c.constantly("a")),
+    lambda p: p.then(c.reductions, operator.mul),
+]
+
+SOURCES = [
+    lambda: range(0),
+    lambda: range(1),
+    lambda: range(100),
+    lambda: range(-50, 300, 7),
+    lambda: range(10, -10, -1),
+    lambda: array.array("i", range(100)),
+    lambda: array.array("d", [1.0, 2.0]),
+    lambda: [1, 2, 3],
+]
+
+
+@pytest.mark.parametrize("make_pipeline", PIPELINES)
+@pytest.mark.parametrize("make_source", SOURCES)
+@pytest.mark.parametrize("block_size", [1, 3, 64])
+def test_vectorized_pipelines_give_the_same_results(make_pipeline, make_source, block_size):
+    pipeline = make_pipeline(c.Pipeline(make_source()))
+    vectorized_pipeline = make_pipeline(c.Pipeline(make_source()).vectorize(block_size))
+    try:
+        expected = list(pipeline)
+    except TypeError:
+        # e.g. is_even on floats, or on the None that reductions yields for an empty source: the vectorized pipeline
+        # must fail the same way
+        with pytest.raises(TypeError):
+            list(vectorized_pipeline)
+        return
+
+    assert list(vectorized_pipeline) == expected
+    assert vectorized_pipeline.count() == len(expected)
+    assert vectorized_pipeline.first() == (expected[0] if expected else None)
+
+
+def test_thread_last_vectorize():
+    assert c.thread_last(range(10), (map, c.inc), (filter, c.is_even), (c.reductions, operator.add), list,
+                         vectorize=True) == [2, 6, 12, 20, 30]
+    assert c.thread_last(range(10), (map, c.inc), (filter, c.is_even), (c.reductions, operator.add), c.count,
+                         vectorize=True) == 5
+    # reductions is recorded in the pipeline instead of being called right away, and the result is an iterator
+    it = c.thread_last(range(10), (map, c.inc), (c.reductions, operator.add))
+    assert not isinstance(it, c.Pipeline)
+    assert next(it) == 1
+    assert list(it) == [3, 6, 10, 15, 21, 28, 36, 45, 55]
+
+
+@pytest.mark.skipif(vectorized.is_available(), reason="NumPy is installed")
+def test_explain_without_numpy():
+    assert "not vectorized: NumPy is not installed" in c.Pipeline(range(10)).map(c.inc).vectorize().explain()
+
+
+def test_explain_not_vectorized():
+    pytest.importorskip("numpy")
+    assert "not vectorized: the source is not a range" in c.Pipeline([1, 2]).map(c.inc).vectorize().explain()
+    assert "not vectorized: the first stage" in c.Pipeline(range(3)).map(str).vectorize().explain()
+    assert "not vectorized" not in c.Pipeline(range(3)).map(c.inc).explain()
+
+
+def test_explain_vectorized():
+    pytest.importorskip("numpy")
+    p = c.Pipeline(range(100)).map(c.inc).filter(c.is_even).map(str).vectorize(1000)
+    assert p.explain() == "\n".join([
+        "source: range",
+        "vectorized with NumPy, in blocks of 1000 items:",
+        "  map(inc)",
+        "  filter(is_even)",
+        "fused loop:",
+        "  map(str)",
+    ])
+
+
+def test_vectorized_numpy_sources():
+    numpy = pytest.importorskip("numpy")
+    for dtype in (numpy.int8, numpy.uint16, numpy.int64):
+        arr = numpy.arange(100, dtype=dtype)
+        assert list(c.Pipeline(arr).map(c.inc).filter(c.is_even).vectorize(7)) == list(range(2, 101, 2))
+
+    # floats are not vectorized
+    assert isinstance(vectorized.plan(numpy.arange(3.0), []), str)
+
+
+def test_vectorized_items_are_python_ints():
+    pytest.importorskip("numpy")
+    items = list(c.Pipeline(range(3)).map(c.inc).vectorize())
+    assert [type(x) for x in items] == [int, int, int]
+
+
+def test_vectorized_overflow():
+    pytest.importorskip("numpy")
+    big = 2 ** 62
+    p = c.Pipeline(range(big, big + 10)).then(c.reductions, operator.add).vectorize()
+    assert "not vectorized" in p.explain()
+    assert c.last(p) == sum(range(big, big + 10))
+    assert isinstance(vectorized.plan(range(2 ** 63, 2 ** 63 + 1), []), str)
+
+
+def test_vectorized_take_stops_early():
+    pytest.importorskip("numpy")
+    assert list(c.Pipeline(range(10 ** 15)).map(c.inc).take(3).vectorize()) == [1, 2, 3]
+    assert c.Pipeline(range(10 ** 15)).filter(c.is_odd).vectorize().first() == 1